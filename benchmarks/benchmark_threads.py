@@ -0,0 +1,74 @@
+"""
+Measure how rendering scales with the number of threads.
+
+Renders a document made of many copies of the petstore paths, with the thread executor. Meaningful on free-threaded
+python builds only, with the GIL threads don't run in parallel.
+
+Usage: python benchmarks/benchmark_threads.py [--copies N] [--threads 1,4,16]
+"""
+
+import argparse
+import copy
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from lapidary.render.main import RenderOptions, render_project
+from lapidary.render.yaml import yaml
+
+petstore = Path(__file__).parent.parent / 'tests/e2e/render/initial/petstore'
+
+
+def mk_document(copies: int) -> dict:
+    document = yaml.load((petstore / 'lapidary/openapi/openapi.yaml').read_text())
+    paths = {}
+    for idx in range(copies):
+        for path, path_item in document['paths'].items():
+            path_item = copy.deepcopy(path_item)
+            for operation in path_item.values():
+                if isinstance(operation, dict) and 'operationId' in operation:
+                    operation['operationId'] += f'_{idx}'
+            paths[f'/v{idx}{path}'] = path_item
+    document['paths'] = paths
+    return document
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--copies', type=int, default=50)
+    parser.add_argument('--threads', default='1,4,16')
+    args = parser.parse_args()
+
+    gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+    with tempfile.TemporaryDirectory() as tmp:
+        project_root = Path(tmp, 'project')
+        shutil.copytree(petstore, project_root)
+        with (project_root / 'lapidary/openapi/openapi.yaml').open('w') as file:
+            yaml.dump(mk_document(args.copies), file)
+
+        results = []
+        for threads in map(int, args.threads.split(',')):
+            start = time.perf_counter()
+            render_project(project_root, RenderOptions(force=True, jobs=threads, executor='thread'))
+            results.append((threads, time.perf_counter() - start))
+
+    version = sys.version.split()[0]
+    lines = [
+        f'Rendering {args.copies} copies of petstore paths, python {version}, GIL enabled: {gil_enabled}',
+        '',
+        '| threads | time [s] | speedup |',
+        '|--------:|---------:|--------:|',
+        *(f'| {threads} | {elapsed:.2f} | {results[0][1] / elapsed:.2f} |' for threads, elapsed in results),
+    ]
+    report = '\n'.join(lines)
+    print(report)
+    if summary := os.environ.get('GITHUB_STEP_SUMMARY'):
+        with open(summary, 'a') as file:
+            file.write(report + '\n')
+
+
+if __name__ == '__main__':
+    main()
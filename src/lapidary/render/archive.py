@@ -0,0 +1,229 @@
+"""
+Outputs writing rendered files to a single archive: a zip file, a wheel or a tar stream.
+
+Archives only depend on the names and contents of the files, in the order they're written: timestamps, owners and
+modes are fixed.
+"""
+
+import abc
+import base64
+import contextlib
+import dataclasses as dc
+import gzip
+import hashlib
+import io
+import logging
+import os
+import re
+import sys
+import tarfile
+import tempfile
+import tomllib
+import zipfile
+from collections.abc import Collection, Iterable, Iterator, Sequence
+from pathlib import Path, PurePath
+from typing import IO
+
+from .output import Output
+
+logger = logging.getLogger(__name__)
+
+ZIP_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+"""The earliest date zip supports."""
+STDOUT = Path('-')
+
+# setting the umask is the only way to read it, do it once rather than race with threads creating files
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+
+def replace_file(temp_path: str, path: Path) -> None:
+    """
+    Move the complete temporary file to the path.
+
+    Temporary files are only readable by their owner, give the file the default permissions of new files first.
+    """
+    os.chmod(temp_path, 0o666 & ~_UMASK)
+    os.replace(temp_path, path)
+
+
+def tar_entry(name: str, size: int) -> tarfile.TarInfo:
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mode = 0o644
+    info.mtime = 0
+    return info
+
+
+def zip_entry(name: str) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, ZIP_TIMESTAMP)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    # unix, regular file, rw-r--r--
+    info.create_system = 3
+    info.external_attr = 0o100644 << 16
+    return info
+
+
+class ArchiveOutput(Output):
+    """
+    Write files to an archive, at their path relative to the source root.
+
+    Files of the extras package aren't rendered, they're copied from the source root once rendered files are written.
+    """
+
+    def __init__(self, source_root: Path, package_extras: PurePath) -> None:
+        self.extras = source_root / package_extras
+        self.package_extras = package_extras
+
+    def write(self, path: PurePath, code: Iterable[str]) -> str:
+        content = b''.join(chunk.encode() for chunk in code)
+        self.add(path.as_posix(), content)
+        return hashlib.sha256(content).hexdigest()
+
+    def close(self, written: Collection[PurePath]) -> None:
+        if self.extras.is_dir():
+            for path in sorted(self.extras.iterdir()):
+                if path.is_file():
+                    self.add((self.package_extras / path.name).as_posix(), path.read_bytes())
+        self.finish()
+
+    @abc.abstractmethod
+    def add(self, name: str, content: bytes) -> None:
+        pass
+
+    @abc.abstractmethod
+    def finish(self) -> None:
+        pass
+
+
+class ZipOutput(ArchiveOutput):
+    """Write files to a zip file, importable with zipimport."""
+
+    def __init__(self, file: IO[bytes], source_root: Path, package_extras: PurePath) -> None:
+        super().__init__(source_root, package_extras)
+        self.zip = zipfile.ZipFile(file, 'w')
+
+    def add(self, name: str, content: bytes) -> None:
+        self.zip.writestr(zip_entry(name), content)
+
+    def finish(self) -> None:
+        self.zip.close()
+
+
+class WheelOutput(ZipOutput):
+    """Write files to a pure python wheel, with metadata from the project's pyproject.toml."""
+
+    def __init__(self, file: IO[bytes], source_root: Path, package_extras: PurePath, metadata: 'WheelMetadata') -> None:
+        super().__init__(file, source_root, package_extras)
+        self.metadata = metadata
+        self.record: list[str] = []
+
+    def add(self, name: str, content: bytes) -> None:
+        super().add(name, content)
+        digest = base64.urlsafe_b64encode(hashlib.sha256(content).digest()).rstrip(b'=').decode()
+        self.record.append(f'{name},sha256={digest},{len(content)}')
+
+    def finish(self) -> None:
+        from .fingerprint import version
+
+        dist_info = self.metadata.dist_info()
+        self.add(f'{dist_info}/METADATA', self.metadata.metadata().encode())
+        wheel = (
+            f'Wheel-Version: 1.0\nGenerator: lapidary-render {version()}\nRoot-Is-Purelib: true\nTag: py3-none-any\n'
+        )
+        self.add(f'{dist_info}/WHEEL', wheel.encode())
+        record = f'{dist_info}/RECORD'
+        self.record.append(f'{record},,')
+        super().add(record, ''.join(line + '\n' for line in self.record).encode())
+        super().finish()
+
+
+@dc.dataclass(frozen=True)
+class WheelMetadata:
+    name: str
+    version: str
+    summary: str | None = None
+    requires_python: str | None = None
+    dependencies: Sequence[str] = ()
+
+    @classmethod
+    def from_pyproject(cls, project_root: Path) -> 'WheelMetadata':
+        """Read metadata from the [project] table, or from [tool.poetry] in older projects."""
+        pyproject = tomllib.loads((project_root / 'pyproject.toml').read_text())
+        if project := pyproject.get('project'):
+            return cls(
+                project['name'],
+                project['version'],
+                project.get('description'),
+                project.get('requires-python'),
+                project.get('dependencies', ()),
+            )
+        poetry = pyproject['tool']['poetry']
+        logger.warning('Dependencies in [tool.poetry] are not included in the wheel metadata')
+        return cls(poetry['name'], poetry['version'], poetry.get('description'))
+
+    def dist_info(self) -> str:
+        name = re.sub(r'[-_.]+', '_', self.name).lower()
+        return f'{name}-{self.version}.dist-info'
+
+    def metadata(self) -> str:
+        lines = ['Metadata-Version: 2.1', f'Name: {self.name}', f'Version: {self.version}']
+        if self.summary:
+            lines.append(f'Summary: {self.summary}')
+        if self.requires_python:
+            lines.append(f'Requires-Python: {self.requires_python}')
+        lines.extend(f'Requires-Dist: {dependency}' for dependency in self.dependencies)
+        return ''.join(line + '\n' for line in lines)
+
+
+class TarOutput(ArchiveOutput):
+    """Write files to a tar stream, optionally gzipped. The file doesn't need to be seekable, e.g. stdout."""
+
+    def __init__(self, file: IO[bytes], source_root: Path, package_extras: PurePath, compress: bool = False) -> None:
+        super().__init__(source_root, package_extras)
+        # empty file name, otherwise gzip stores the name of the file object
+        self.gzip = gzip.GzipFile(filename='', fileobj=file, mode='wb', mtime=0) if compress else None
+        self.tar = tarfile.open(fileobj=self.gzip or file, mode='w|')
+
+    def add(self, name: str, content: bytes) -> None:
+        self.tar.addfile(tar_entry(name, len(content)), io.BytesIO(content))
+
+    def finish(self) -> None:
+        self.tar.close()
+        if self.gzip:
+            self.gzip.close()
+
+
+@contextlib.contextmanager
+def open_archive(path: Path, project_root: Path, package: str) -> Iterator[ArchiveOutput]:
+    """
+    Open an archive output of the type given by the file name: .zip, .whl, .tar, .tar.gz or .tgz, or - for tar on
+    stdout. Archive files are replaced once complete.
+    """
+    source_root = project_root / 'src'
+    package_extras = PurePath(package) / 'extras'
+    if path == STDOUT:
+        yield TarOutput(sys.stdout.buffer, source_root, package_extras)
+        sys.stdout.buffer.flush()
+        return
+
+    def mk_output(file: IO[bytes]) -> ArchiveOutput:
+        if path.suffix == '.zip':
+            return ZipOutput(file, source_root, package_extras)
+        if path.suffix == '.whl':
+            return WheelOutput(file, source_root, package_extras, WheelMetadata.from_pyproject(project_root))
+        if path.suffix == '.tar':
+            return TarOutput(file, source_root, package_extras)
+        if path.name.endswith(('.tar.gz', '.tgz')):
+            return TarOutput(file, source_root, package_extras, compress=True)
+        raise ValueError('Unsupported archive type', path)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix='.', delete=False) as file:
+        try:
+            yield mk_output(file)
+            file.close()
+            replace_file(file.name, path)
+        except BaseException:
+            os.unlink(file.name)
+            raise
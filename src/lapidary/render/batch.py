@@ -0,0 +1,216 @@
+"""
+Rendering of many projects in one process, sharing the interpreter start-up, imports and document models.
+
+Projects are rendered by a pool of workers, one project at a time per worker. Projects rendered from the same document
+are given to the same worker, which parses and validates the document once for all of them.
+"""
+
+from __future__ import annotations
+
+import dataclasses as dc
+import glob
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable, Hashable, Iterable, Mapping, Sequence
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal, TypeAlias
+
+from .config import PYPROJ_TOML, Config, load_config
+from .load import document_handler_for
+from .main import RenderOptions, render_project
+from .progress import mk_progress
+
+if TYPE_CHECKING:
+    from .model import openapi, python
+
+logger = logging.getLogger(__name__)
+
+Status: TypeAlias = Literal['rendered', 'restored', 'up to date', 'failed']
+
+
+class LruCache[K: Hashable, V]:
+    """Values by key. Beyond maxsize values, the least recently used ones are evicted."""
+
+    def __init__(self, maxsize: int | None = None) -> None:
+        self.maxsize = maxsize
+        self._values: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: K) -> V | None:
+        with self._lock:
+            value = self._values.get(key)
+            if value is not None:
+                self._values.move_to_end(key)
+        return value
+
+    def put(self, key: K, value: V) -> V:
+        """Store the value, unless one is already stored under the key. Return the stored value."""
+        with self._lock:
+            value = self._values.setdefault(key, value)
+            self._values.move_to_end(key)
+            while self.maxsize is not None and len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+        return value
+
+    def get(self, key: K, make: Callable[[], V]) -> V:
+        """Return the value stored under the key, or make and store it."""
+        value = self.lookup(key)
+        return self.put(key, make()) if value is None else value
+
+
+class DocumentCache(LruCache[Hashable, 'openapi.OpenAPI']):
+    """
+    Document models by document text and the options they were parsed with.
+
+    Models are kept as long as they're cached, they're not released once converted.
+    """
+
+    @staticmethod
+    def key(document_text: str, config: Config, lazy: bool) -> Hashable:
+        # only lazy models depend on selected operations
+        selection = (config.include, config.exclude) if lazy else None
+        return hashlib.sha256(document_text.encode()).digest(), lazy, repr(selection)
+
+    def get(self, key: Hashable, make: Callable[[], openapi.OpenAPI]) -> openapi.OpenAPI:
+        """Return the model parsed before with the same key, or parse it."""
+        model = self.lookup(key)
+        if model is None:
+            return self.put(key, make())
+        logger.info('Reusing parsed OpenAPI document')
+        return model
+
+
+@dc.dataclass(frozen=True)
+class RenderedModel:
+    modules: Sequence[python.AbstractModule]
+    """Modules of the python model, in the order they were rendered."""
+    files: Mapping[str, str]
+    """Hashes of files rendered from the modules, by path relative to the source root."""
+
+
+ModelCache: TypeAlias = LruCache[str, RenderedModel]
+"""Rendered python models by render fingerprint."""
+
+
+@dc.dataclass(frozen=True)
+class ProjectResult:
+    project_root: Path
+    status: Status
+    elapsed: float
+    """Seconds spent rendering the project."""
+    error: str | None = None
+
+
+def expand_project_roots(patterns: Iterable[str]) -> list[Path]:
+    """Return project roots matching glob patterns, like clients/*, and other paths as they are."""
+    roots: list[Path] = []
+    for pattern in patterns:
+        if glob.escape(pattern) == pattern:
+            roots.append(Path(pattern))
+            continue
+        matches = sorted(Path(path) for path in glob.glob(pattern) if (Path(path) / PYPROJ_TOML).is_file())
+        if not matches:
+            raise ValueError('No projects match pattern', pattern)
+        roots.extend(matches)
+    return list(dict.fromkeys(roots))
+
+
+def render_projects(project_roots: Sequence[Path], options: RenderOptions = RenderOptions()) -> list[ProjectResult]:
+    """
+    Render projects in parallel, like render_project. Return their results in the same order.
+
+    Failures are reported in the results, and don't stop other projects from rendering.
+
+    :param options: options of every project. Jobs are the number of workers rendering projects, each project is
+    rendered by a single worker. Progress reports rendered projects
+    """
+    if options.cost_report is not None or options.output is not None:
+        raise ValueError('Cost report and output take a single project')
+    if options.max_memory is not None and options.jobs > 1 and options.executor == 'thread':
+        # tracemalloc traces the whole process, projects rendered in threads would count each other's memory
+        raise ValueError('Memory limit is not supported with thread workers')
+    jobs = options.jobs
+    progress = mk_progress(options.progress)
+    project_options = dc.replace(options, jobs=1, progress='none')
+
+    results: dict[Path, ProjectResult] = {}
+    groups: dict[Hashable, list[Path]] = defaultdict(list)
+    for project_root in project_roots:
+        try:
+            groups[_document_key(project_root, load_config(project_root))].append(project_root)
+        except Exception as e:
+            results[project_root] = ProjectResult(project_root, 'failed', 0.0, _format_error(e))
+
+    # split groups of projects with the same document, so that all workers get some
+    chunk_size = max(1, -(-sum(map(len, groups.values())) // jobs))
+    chunks = [group[idx : idx + chunk_size] for group in groups.values() for idx in range(0, len(group), chunk_size)]
+
+    with progress.stage('projects', len(project_roots), label='Rendering projects') as update:
+        if update:
+            for result in results.values():
+                update(result.project_root)
+
+        def collect(chunk_results: Iterable[ProjectResult]) -> None:
+            for result in chunk_results:
+                results[result.project_root] = result
+                if update:
+                    update(result.project_root)
+
+        if jobs == 1 or len(chunks) == 1:
+            for chunk in chunks:
+                collect(_render_chunk(chunk, project_options))
+        else:
+            from concurrent.futures import Executor as Pool, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+            pool: Pool = ThreadPoolExecutor(jobs) if options.executor == 'thread' else ProcessPoolExecutor(jobs)
+            with pool:
+                futures = [pool.submit(_render_chunk, chunk, project_options) for chunk in chunks]
+                for future in as_completed(futures):
+                    collect(future.result())
+
+    return [results[project_root] for project_root in project_roots]
+
+
+def _document_key(project_root: Path, config: Config) -> Hashable:
+    handler = document_handler_for(project_root, config.document_path)
+    if handler.is_url:
+        return handler.path
+    return hashlib.sha256((project_root / config.document_path).read_bytes()).digest()
+
+
+def _render_chunk(project_roots: Sequence[Path], options: RenderOptions) -> list[ProjectResult]:
+    documents = DocumentCache()
+    results = []
+    for project_root in project_roots:
+        start = time.perf_counter()
+        try:
+            status: Status = render_project(project_root, options, documents=documents)
+            error = None
+        except Exception as e:
+            logger.debug('Rendering %s failed', project_root, exc_info=True)
+            status, error = 'failed', _format_error(e)
+        results.append(ProjectResult(project_root, status, time.perf_counter() - start, error))
+    return results
+
+
+def _format_error(error: Exception) -> str:
+    return f'{type(error).__name__}: {error}'
+
+
+def format_summary(results: Sequence[ProjectResult], elapsed: float) -> list[str]:
+    """Return a line per project with its status and time, and a line with totals."""
+    width = max((len(result.status) for result in results), default=0)
+    lines = [
+        f'{result.status:<{width}} {result.elapsed:8.2f}s  {result.project_root}'
+        + (f': {result.error}' if result.error else '')
+        for result in results
+    ]
+    counts: dict[str, int] = defaultdict(int)
+    for result in results:
+        counts[result.status] += 1
+    totals = ', '.join(f'{count} {status}' for status, count in counts.items())
+    lines.append(f'{len(results)} projects in {elapsed:.2f}s: {totals}')
+    return lines
@@ -0,0 +1,126 @@
+"""
+Compilation of rendered modules to bytecode, so the generated package isn't compiled on its first import.
+
+Bytecode is hash-based: it's valid as long as the source has the same content, regardless of file timestamps, so
+modules rewritten with the same code keep their bytecode, and the same code always compiles to the same file.
+Python checks the hash on import, so modified sources are recompiled as usual.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+import py_compile
+import sys
+from collections.abc import Iterable
+from concurrent.futures import Executor, Future
+from pathlib import Path, PurePath
+from typing import TYPE_CHECKING, Self
+
+if TYPE_CHECKING:
+    from .main import Executor as ExecutorType
+
+logger = logging.getLogger(__name__)
+
+_FLAG_HASH_BASED = 0b01
+
+
+def pyc_path(path: PurePath) -> PurePath:
+    """Return the path of bytecode of the module for the running python version, like a/__pycache__/b.cpython-313.pyc"""
+    return path.parent / '__pycache__' / f'{path.stem}.{sys.implementation.cache_tag}.pyc'
+
+
+def source_path(path: PurePath) -> PurePath | None:
+    """Return the path of the module compiled to the bytecode file, for any python version, or None if it isn't one."""
+    if path.parent.name != '__pycache__' or path.suffix != '.pyc':
+        return None
+    return path.parent.parent / f'{path.name.split(".", 1)[0]}.py'
+
+
+def is_current(pyc: Path, source: bytes) -> bool:
+    """Return True if the bytecode file is hash-based and compiled from the source by this python version."""
+    try:
+        with pyc.open('rb') as file:
+            header = file.read(16)
+    except FileNotFoundError:
+        return False
+    return (
+        header[:4] == importlib.util.MAGIC_NUMBER
+        and bool(int.from_bytes(header[4:8], 'little') & _FLAG_HASH_BASED)
+        and header[8:16] == importlib.util.source_hash(source)
+    )
+
+
+def compile_module(target_root: Path, path: PurePath) -> bool:
+    """Compile the module, unless its bytecode is current. Return True if it was compiled."""
+    source = target_root / path
+    cfile = target_root / pyc_path(path)
+    if is_current(cfile, source.read_bytes()):
+        return False
+    py_compile.compile(
+        str(source),
+        str(cfile),
+        # the relative path keeps bytecode independent of the project location, import fixes it anyway
+        dfile=path.as_posix(),
+        doraise=True,
+        invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH,
+    )
+    return True
+
+
+class NoBytecode:
+    """Bytecode compiler used without --compile. Written modules are left for python to compile on import."""
+
+    def compile(self, path: PurePath) -> None:
+        pass
+
+
+class Bytecode(NoBytecode):
+    """
+    Compile modules to bytecode in worker processes or threads, as soon as they're written.
+
+    Use as a context manager, it waits for all modules to be compiled. Modules with current bytecode are skipped.
+    """
+
+    def __init__(self, target_root: Path, jobs: int = 1, executor: ExecutorType = 'process') -> None:
+        self.target_root = target_root
+        self.jobs = jobs
+        self.executor = executor
+        self.compiled = 0
+        self._pool: Executor | None = None
+        self._pending: list[Future[bool]] = []
+
+    def __enter__(self) -> Self:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        if self.executor == 'thread':
+            self._pool = ThreadPoolExecutor(self.jobs)
+        else:
+            # workers need nothing from this process, and forking it while it renders in threads isn't safe
+            self._pool = ProcessPoolExecutor(self.jobs, mp_context=multiprocessing.get_context('spawn'))
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *_) -> None:
+        assert self._pool is not None
+        try:
+            if exc_type is None:
+                self.compiled += sum(future.result() for future in self._pending)
+                logger.info('Compiled %d modules', self.compiled)
+        finally:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+            self._pending.clear()
+
+    def compile(self, path: PurePath) -> None:
+        if path.suffix != '.py':
+            return
+        assert self._pool is not None
+        self._pending.append(self._pool.submit(compile_module, self.target_root, path))
+
+    def compile_all(self, paths: Iterable[PurePath]) -> None:
+        for path in paths:
+            self.compile(path)
+
+
+NO_BYTECODE = NoBytecode()
@@ -0,0 +1,108 @@
+"""
+Shared cache of rendered projects.
+
+Rendered files are stored in a tar archive named after the render fingerprint, so projects rendered from the same
+document, configuration and lapidary-render version can be restored instead of rendered, also on other machines
+that share the cache directory.
+"""
+
+import gzip
+import hashlib
+import io
+import logging
+import os
+import tarfile
+import tempfile
+from collections.abc import Mapping
+from pathlib import Path, PurePosixPath
+from typing import IO
+
+import pydantic
+
+from .archive import replace_file, tar_entry
+from .fingerprint import MANIFEST_FILE, Manifest
+
+logger = logging.getLogger(__name__)
+
+
+def archive_path(cache_dir: Path, fingerprint: str) -> Path:
+    return cache_dir / fingerprint[:2] / f'{fingerprint}.tar.gz'
+
+
+def store(cache_dir: Path, target_root: Path, manifest: Manifest) -> None:
+    """Archive rendered files listed in the manifest. The archive is written atomically."""
+    path = archive_path(cache_dir, manifest.fingerprint)
+    if path.exists():
+        return
+    files = {name: (target_root / name).read_bytes() for name in manifest.files}
+    files[MANIFEST_FILE] = manifest.model_dump_json().encode()
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix='.', delete=False) as file:
+        try:
+            write_tar(file, files)
+            file.close()
+            replace_file(file.name, path)
+        except BaseException:
+            os.unlink(file.name)
+            raise
+    logger.info('Stored rendered project in %s', path)
+
+
+def restore(cache_dir: Path, fingerprint: str, target_root: Path) -> Manifest | None:
+    """Extract files rendered with the fingerprint into target_root. Return their manifest, or None on cache miss."""
+    path = archive_path(cache_dir, fingerprint)
+    try:
+        manifest, files = read_tar(path, fingerprint)
+    except FileNotFoundError:
+        return None
+    except (OSError, tarfile.TarError, pydantic.ValidationError, ValueError) as e:
+        logger.warning('Ignoring invalid cache entry %s: %s', path, e)
+        return None
+
+    for name, content in files.items():
+        file_path = target_root / name
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(content)
+    logger.info('Restored rendered project from %s', path)
+    return manifest
+
+
+def read_tar(path: Path, fingerprint: str) -> tuple[Manifest, Mapping[str, bytes]]:
+    """Read and verify the archive. Raise ValueError if it doesn't match its manifest."""
+    with tarfile.open(path, 'r:gz') as tar:
+
+        def read(name: str) -> bytes:
+            if (member := tar.extractfile(name)) is None:
+                raise ValueError('Not a file', name)
+            return member.read()
+
+        manifest = Manifest.model_validate_json(read(MANIFEST_FILE))
+        if manifest.fingerprint != fingerprint:
+            raise ValueError('Fingerprint mismatch', manifest.fingerprint)
+
+        files = {}
+        for name, hash_ in manifest.files.items():
+            # cache may be shared, don't write outside of the target directory
+            pure_path = PurePosixPath(name)
+            if pure_path.is_absolute() or '..' in pure_path.parts:
+                raise ValueError('Invalid path', name)
+            content = read(name)
+            if hashlib.sha256(content).hexdigest() != hash_:
+                raise ValueError('Hash mismatch', name)
+            files[name] = content
+    return manifest, files
+
+
+def write_tar(file: IO[bytes], files: Mapping[str, bytes]) -> None:
+    """
+    Write files to a gzipped tar archive.
+
+    The archive only depends on the file names and contents: entries are sorted by name, timestamps, owners and modes
+    are fixed.
+    """
+    # empty file name, otherwise gzip stores the name of the file object
+    with gzip.GzipFile(filename='', fileobj=file, mode='wb', mtime=0) as gz, tarfile.open(fileobj=gz, mode='w') as tar:
+        for name in sorted(files):
+            content = files[name]
+            tar.addfile(tar_entry(name, len(content)), io.BytesIO(content))
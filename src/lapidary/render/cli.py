@@ -1,8 +1,12 @@
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING, Literal
 
 import click
 
+if TYPE_CHECKING:
+    from .main import RenderOptions
+
 
 @click.group()
 @click.version_option(package_name='lapidary.render', prog_name='lapidary')
@@ -48,16 +52,266 @@ def init(
 
 
 @app.command()
-@click.argument(
-    'project_root', type=click.Path(path_type=Path, exists=True, file_okay=False, dir_okay=True), default='.'
+@click.argument('project_roots', nargs=-1)
+@click.option(
+    '--max-memory',
+    help='Trace memory used by each stage and abort when it exceeds the limit, e.g. 3G or 512M. '
+    'The peak is checked when a stage ends, and after each path or module.',
+    callback=lambda _ctx, _param, value: _parse_size(value),
+)
+@click.option(
+    '--check',
+    is_flag=True,
+    help='Check that the generated code is up to date and unmodified, without writing anything.',
+    default=False,
+)
+@click.option('--force', is_flag=True, help='Render even if the project is up to date.', default=False)
+@click.option(
+    '--cache-dir',
+    type=click.Path(path_type=Path, file_okay=False, dir_okay=True),
+    envvar='LAPIDARY_CACHE_DIR',
+    help='Shared cache of rendered projects, keyed by document, configuration and lapidary-render version.',
+)
+@click.option(
+    '--jobs',
+    '-j',
+    type=click.IntRange(min=1),
+    default=1,
+    help='Number of workers converting paths in parallel, or rendering projects if there are many.',
+)
+@click.option(
+    '--executor',
+    type=click.Choice(['process', 'thread']),
+    help='Run workers in processes or threads. Default is threads on free-threaded python, processes otherwise.',
+)
+@click.option(
+    '--cost-report',
+    type=click.Path(path_type=Path, file_okay=True, dir_okay=False),
+    help='Write conversion time, model size and generated code by document location to this JSON file.',
+)
+@click.option(
+    '--lazy-document',
+    is_flag=True,
+    default=False,
+    help='Validate path items and components only when they are rendered.',
+)
+@click.option(
+    '--output',
+    '-o',
+    type=click.Path(path_type=Path, dir_okay=False, allow_dash=True),
+    help='Write the package to a .zip, .whl, .tar or .tar.gz archive instead of src, or - for a tar on stdout.',
+)
+@click.option(
+    '--compile',
+    'compile_bytecode',
+    is_flag=True,
+    default=False,
+    help='Compile changed modules to hash-based bytecode, in --jobs workers.',
+)
+@click.option(
+    '--progress',
+    type=click.Choice(['bar', 'json', 'none']),
+    default='bar',
+    help='Show progress bars, write newline-delimited JSON events with timings, or nothing.',
+)
+@click.option(
+    '--socket',
+    'socket_path',
+    type=click.Path(path_type=Path, dir_okay=False),
+    help='Send render requests to the server listening on this socket, see the serve command.',
 )
 def render(
-    project_root: Path = Path(),
+    project_roots: tuple[str, ...] = (),
+    max_memory: int | None = None,
+    check: bool = False,
+    force: bool = False,
+    cache_dir: Path | None = None,
+    jobs: int = 1,
+    executor: Literal['process', 'thread'] | None = None,
+    cost_report: Path | None = None,
+    lazy_document: bool = False,
+    output: Path | None = None,
+    compile_bytecode: bool = False,
+    progress: Literal['bar', 'json', 'none'] = 'bar',
+    socket_path: Path | None = None,
 ) -> None:
-    """Generate Python code"""
-    from .main import render_project
+    """Generate Python code
 
-    render_project(project_root)
+    PROJECT_ROOTS: Project directories or glob patterns, like 'clients/*'. The default is the current directory
+    """
+    from .batch import expand_project_roots
+    from .main import RenderOptions, check_project, default_executor, render_project
+    from .memory import MemoryLimitExceeded
+
+    try:
+        roots = expand_project_roots(project_roots or ['.'])
+    except ValueError as e:
+        raise click.BadParameter(f'No projects match {e.args[1]}', param_hint='PROJECT_ROOTS')
+    for root in roots:
+        if not root.is_dir():
+            raise click.BadParameter(f'Directory {root} does not exist', param_hint='PROJECT_ROOTS')
+
+    if check:
+        problems = [
+            f'{root}: {problem}' if len(roots) > 1 else problem for root in roots for problem in check_project(root)
+        ]
+        if problems:
+            raise click.ClickException('\n'.join(['Project is not up to date', *problems]))
+        return
+
+    if socket_path is not None:
+        if max_memory is not None or cache_dir is not None or jobs != 1 or executor is not None:
+            raise click.UsageError('--max-memory, --cache-dir, --jobs and --executor are options of the server')
+        if cost_report is not None or output is not None or progress != 'bar':
+            raise click.UsageError('--cost-report, --output and --progress are not supported with --socket')
+        _request_render(socket_path, roots, force, lazy_document, compile_bytecode)
+        return
+
+    options = RenderOptions(
+        max_memory=max_memory,
+        force=force,
+        cache_dir=cache_dir,
+        jobs=jobs,
+        executor=executor or default_executor(),
+        cost_report=cost_report,
+        lazy_document=lazy_document,
+        output=output,
+        compile_bytecode=compile_bytecode,
+        progress=progress,
+    )
+    if len(roots) > 1:
+        if cost_report is not None or output is not None:
+            raise click.UsageError('--cost-report and --output take a single project')
+        if max_memory is not None and jobs > 1 and options.executor == 'thread':
+            raise click.UsageError('--max-memory takes a single project or process workers')
+        _render_projects(roots, options)
+        return
+
+    try:
+        render_project(roots[0], options)
+    except MemoryLimitExceeded as e:
+        raise click.ClickException(str(e))
+
+
+def _render_projects(roots: list[Path], options: 'RenderOptions') -> None:
+    import time
+
+    from .batch import format_summary, render_projects
+
+    start = time.perf_counter()
+    results = render_projects(roots, options)
+    # keep stdout for JSON events
+    for line in format_summary(results, time.perf_counter() - start):
+        click.echo(line, err=options.progress == 'json')
+    if failed := sum(result.status == 'failed' for result in results):
+        raise click.ClickException(f'{failed} of {len(results)} projects failed')
+
+
+def _request_render(
+    socket_path: Path,
+    roots: list[Path],
+    force: bool,
+    lazy_document: bool,
+    compile_bytecode: bool,
+) -> None:
+    from .server import request_render
+
+    failed = 0
+    for root in roots:
+        try:
+            response = request_render(
+                socket_path,
+                root,
+                force=force,
+                lazy_document=lazy_document,
+                compile_bytecode=compile_bytecode,
+            )
+        except OSError as e:
+            raise click.ClickException(f'Cannot connect to the server on {socket_path}: {e}')
+        if response['status'] == 'failed':
+            failed += 1
+            click.echo(f'{root}: {response["error"]}', err=True)
+        elif len(roots) > 1:
+            click.echo(f'{response["status"]} {response["elapsed"]:8.2f}s  {root}')
+    if failed:
+        raise click.ClickException(f'{failed} of {len(roots)} projects failed')
+
+
+@app.command()
+@click.option(
+    '--socket',
+    'socket_path',
+    type=click.Path(path_type=Path, dir_okay=False),
+    required=True,
+    help='Unix socket to listen on.',
+)
+@click.option(
+    '--cache-size',
+    type=click.IntRange(min=1),
+    default=8,
+    help='Number of documents and python models kept in memory.',
+)
+@click.option(
+    '--cache-dir',
+    type=click.Path(path_type=Path, file_okay=False, dir_okay=True),
+    envvar='LAPIDARY_CACHE_DIR',
+    help='Shared cache of rendered projects, keyed by document, configuration and lapidary-render version.',
+)
+@click.option(
+    '--max-memory',
+    help='Trace memory used by each stage of every render and fail it when it exceeds the limit, e.g. 3G or 512M.',
+    callback=lambda _ctx, _param, value: _parse_size(value),
+)
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=1, help='Number of workers converting paths.')
+@click.option(
+    '--executor',
+    type=click.Choice(['process', 'thread']),
+    help='Run workers in processes or threads. Default is threads on free-threaded python, processes otherwise.',
+)
+def serve(
+    socket_path: Path,
+    cache_size: int = 8,
+    cache_dir: Path | None = None,
+    max_memory: int | None = None,
+    jobs: int = 1,
+    executor: Literal['process', 'thread'] | None = None,
+) -> None:
+    """Serve render requests on a Unix socket, keeping recent documents and models in memory.
+
+    Render projects with `lapidary render --socket SOCKET`, or by sending JSON requests like
+    {"project_root": "/path/to/project"}, one per line.
+    """
+    import logging
+    import signal
+
+    from .main import RenderOptions, default_executor
+    from .server import serve as serve_
+
+    # stop like on Ctrl-C, removing the socket
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    logging.basicConfig()
+    logging.getLogger('lapidary.render.server').setLevel(logging.INFO)
+    try:
+        serve_(
+            socket_path,
+            cache_size,
+            RenderOptions(
+                cache_dir=cache_dir, max_memory=max_memory, jobs=jobs, executor=executor or default_executor()
+            ),
+        )
+    except FileExistsError:
+        raise click.ClickException(f'Server already running on {socket_path}')
+
+
+def _parse_size(value: str | None) -> int | None:
+    from .memory import parse_size
+
+    if value is None:
+        return None
+    try:
+        return parse_size(value)
+    except ValueError:
+        raise click.BadParameter(f'Invalid size: {value}')
 
 
 @app.command(hidden=True)
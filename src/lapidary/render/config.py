@@ -1,17 +1,48 @@
+import fnmatch
 import tomllib
+from collections.abc import Iterable
 from pathlib import Path
+from typing import Literal
 
 import pydantic
 
 PYPROJ_TOML = 'pyproject.toml'
 
 
+class OperationFilter(pydantic.BaseModel):
+    model_config = pydantic.ConfigDict(extra='forbid')
+
+    operation_ids: list[str] = []
+    """operationId glob patterns"""
+    tags: list[str] = []
+    paths: list[str] = []
+    """Path prefixes, matching whole path segments"""
+
+    def matches(self, path: str, operation_id: str | None, tags: Iterable[str]) -> bool:
+        return (
+            (operation_id is not None and any(fnmatch.fnmatchcase(operation_id, pat) for pat in self.operation_ids))
+            or any(tag in self.tags for tag in tags)
+            or any(path == prefix or path.startswith(prefix + '/') for prefix in (p.rstrip('/') for p in self.paths))
+        )
+
+
 class Config(pydantic.BaseModel):
     document_path: str
     """URL or path relative to ./openapi/"""
     origin: pydantic.AnyHttpUrl | None = None
     """Origin URL in case"""
     package: str
+    emitter: Literal['libcst', 'text'] = 'libcst'
+    """Code emitter backend. 'text' writes code directly, without building libcst trees."""
+    include: OperationFilter | None = None
+    """Render only matching operations and models they use."""
+    exclude: OperationFilter | None = None
+    """Don't render matching operations."""
+
+    def selects_operation(self, path: str, operation_id: str | None, tags: Iterable[str]) -> bool:
+        return (self.include is None or self.include.matches(path, operation_id, tags)) and not (
+            self.exclude is not None and self.exclude.matches(path, operation_id, tags)
+        )
 
 
 def load_config(project_root: Path) -> Config:
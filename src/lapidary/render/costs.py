@@ -0,0 +1,187 @@
+"""Attribution of conversion time, model size and generated code to locations in the document."""
+
+from __future__ import annotations
+
+import contextlib
+import dataclasses as dc
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, MutableMapping, MutableSequence
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .hooks import NULL_CONTEXT
+from .model.stack import Stack
+
+if TYPE_CHECKING:
+    from .model import python
+    from .model.metamodel import MetaModel
+
+logger = logging.getLogger(__name__)
+
+
+def location(stack: Stack) -> Stack:
+    """Return the component or operation containing the pointer, like #/components/schemas/Order or #/paths/~1a/get."""
+    path = stack.path
+    return Stack(path[:4]) if len(path) > 4 else stack
+
+
+@dc.dataclass(kw_only=True)
+class Cost:
+    time: float = 0.0
+    """Seconds spent converting schemas, excluding nested schemas from other locations."""
+    nodes: int = 0
+    """MetaModel nodes of the converted schemas."""
+    classes: int = 0
+    lines: int = 0
+
+
+@dc.dataclass(slots=True)
+class _Frame:
+    location: Stack
+    nested: float = 0.0
+    """Seconds spent in nested schemas from other locations."""
+
+
+class NoCostReport:
+    """Cost report used unless one is requested. Schemas aren't timed, and rendered code passes through unchanged."""
+
+    def schema(self, stack: Stack) -> contextlib.AbstractContextManager[None]:
+        return NULL_CONTEXT
+
+    def normalized(self, model: MetaModel | None) -> None:
+        pass
+
+    def module(self, module_path: python.ModulePath, stack: Stack) -> None:
+        pass
+
+    def rendered(self, module: python.AbstractModule, code: Iterable[str]) -> Iterable[str]:
+        return code
+
+
+class CostReport(NoCostReport):
+    """
+    Collect costs by location in the document.
+
+    Schema conversion is timed by the converters, rendered classes and lines are attributed to the location of the
+    first schema, operation or metadata that placed them in their module. Conversion may run in multiple threads.
+    """
+
+    def __init__(self) -> None:
+        self.costs: MutableMapping[str, Cost] = defaultdict(Cost)
+        self._modules: MutableMapping[python.ModulePath, Stack] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def _frames(self) -> MutableSequence[_Frame]:
+        """Locations of schemas being converted in this thread."""
+        try:
+            return self._local.frames
+        except AttributeError:
+            frames: MutableSequence[_Frame] = []
+            self._local.frames = frames
+            return frames
+
+    @contextlib.contextmanager
+    def schema(self, stack: Stack) -> Iterator[None]:
+        frames = self._frames
+        frame = _Frame(location(stack))
+        frames.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            frames.pop()
+            if frames:
+                frames[-1].nested += elapsed
+            with self._lock:
+                self.costs[str(frame.location)].time += elapsed - frame.nested
+
+    def normalized(self, model: MetaModel | None) -> None:
+        """Count nodes of the normalized model, once for the outermost schema in its location."""
+        frames = self._frames
+        loc = frames[-1].location
+        if model is None or (len(frames) > 1 and frames[-2].location is loc):
+            return
+        nodes = count_nodes(model, loc)
+        with self._lock:
+            self.costs[str(loc)].nodes += nodes
+
+    def module(self, module_path: python.ModulePath, stack: Stack) -> None:
+        with self._lock:
+            self._modules.setdefault(module_path, location(stack))
+
+    def rendered(self, module: python.AbstractModule, code: Iterable[str]) -> Iterator[str]:
+        from .model import python
+
+        match module:
+            case python.ClientModule():
+                # the header, then one chunk per method
+                locations = [
+                    str(module.path),
+                    *(str(Stack(('#', 'paths', method.path, method.method))) for method in module.body.methods),
+                ]
+                classes = 1
+            case python.SchemaModule():
+                locations = [self._module_location(module.path)]
+                classes = len(module.body)
+            case python.MetadataModule():
+                locations = [self._module_location(module.path)]
+                classes = len(module.body)
+            case _:
+                locations = [str(module.path)]
+                classes = 0
+
+        with self._lock:
+            self.costs[locations[0]].classes += classes
+        for idx, chunk in enumerate(code):
+            lines = chunk.count('\n')
+            with self._lock:
+                self.costs[locations[min(idx, len(locations) - 1)]].lines += lines
+            yield chunk
+
+    def _module_location(self, module_path: python.ModulePath) -> str:
+        with self._lock:
+            loc = self._modules.get(module_path)
+        # modules converted in worker processes aren't known
+        return str(loc) if loc is not None else str(module_path)
+
+    def top(self, count: int | None = None) -> list[tuple[str, Cost]]:
+        """Return locations by time spent, then by lines of code."""
+        with self._lock:
+            items = sorted(self.costs.items(), key=lambda item: (-item[1].time, -item[1].lines, item[0]))
+        return items[:count]
+
+    def write(self, path: Path) -> None:
+        report = [{'location': loc, **dc.asdict(cost)} for loc, cost in self.top()]
+        path.write_text(json.dumps(report, indent=2) + '\n')
+        for loc, cost in self.top(10):
+            logger.info(
+                '%s: %.3fs, %d nodes, %d classes, %d lines', loc, cost.time, cost.nodes, cost.classes, cost.lines
+            )
+
+
+NO_COST_REPORT = NoCostReport()
+
+
+def count_nodes(model: MetaModel, loc: Stack) -> int:
+    """Count distinct models in the graph that belong to the location."""
+    from .model.metamodel import MetaModel
+
+    seen: set[int] = set()
+    pending = [model]
+    while pending:
+        node = pending.pop()
+        if id(node) in seen or location(node.stack) is not loc:
+            continue
+        seen.add(id(node))
+        pending.extend(node.properties.values())
+        pending.extend(sub for sub in (node.items, node.additional_props) if isinstance(sub, MetaModel))
+        for subs in (node.any_of, node.one_of, node.all_of):
+            pending.extend(subs or ())
+    return len(seen)
@@ -0,0 +1,92 @@
+"""Fingerprint of render inputs and hashes of the rendered files, stored in the output directory."""
+
+import hashlib
+import logging
+from collections.abc import Mapping
+from pathlib import Path, PurePath
+
+import pydantic
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = '.lapidary-render.json'
+
+
+class Manifest(pydantic.BaseModel):
+    fingerprint: str
+    """Hash of the document, configuration and lapidary-render version used to render the files."""
+    files: Mapping[str, str]
+    """Hashes of rendered files, by path relative to the output directory."""
+
+
+def version() -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version('lapidary.render')
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+def fingerprint(config: Config, document: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (version().encode(), config.model_dump_json().encode(), document):
+        # length prefix keeps the parts apart
+        digest.update(len(part).to_bytes(8))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def read_manifest(target_root: Path) -> Manifest | None:
+    try:
+        return Manifest.model_validate_json((target_root / MANIFEST_FILE).read_bytes())
+    except FileNotFoundError:
+        return None
+    except pydantic.ValidationError:
+        logger.warning('Ignoring invalid %s', MANIFEST_FILE)
+        return None
+
+
+def write_manifest(target_root: Path, manifest: Manifest) -> None:
+    (target_root / MANIFEST_FILE).write_text(manifest.model_dump_json(indent=2) + '\n')
+
+
+def is_current(target_root: Path, fingerprint_: str) -> bool:
+    """Return True if the files were rendered from the same inputs and still exist. Doesn't read the files."""
+    manifest = read_manifest(target_root)
+    return (
+        manifest is not None
+        and manifest.fingerprint == fingerprint_
+        and all((target_root / path).is_file() for path in manifest.files)
+    )
+
+
+def check(target_root: Path, fingerprint_: str, package_extras: PurePath) -> list[str]:
+    """Compare rendered files with the manifest, return a list of problems."""
+    manifest = read_manifest(target_root)
+    if manifest is None:
+        return [f'{MANIFEST_FILE} not found, project was not rendered']
+    if manifest.fingerprint != fingerprint_:
+        return ['Document, configuration or lapidary-render version changed since the project was rendered']
+
+    problems = []
+    for path, expected in manifest.files.items():
+        try:
+            if hashlib.sha256((target_root / path).read_bytes()).hexdigest() != expected:
+                problems.append(f'Modified: {path}')
+        except FileNotFoundError:
+            problems.append(f'Missing: {path}')
+
+    for file in sorted(target_root.rglob('*')):
+        relative = file.relative_to(target_root)
+        if (
+            file.is_file()
+            and relative.as_posix() not in manifest.files
+            and relative != PurePath(MANIFEST_FILE)
+            and not relative.is_relative_to(package_extras)
+            and '__pycache__' not in relative.parts
+        ):
+            problems.append(f'Unexpected: {relative.as_posix()}')
+    return problems
@@ -0,0 +1,6 @@
+"""Pieces shared by the optional rendering hooks: memory accounting, cost report and progress."""
+
+import contextlib
+
+NULL_CONTEXT = contextlib.nullcontext()
+"""Context of stages that aren't accounted, timed or reported. Reused, so entering it allocates nothing."""
@@ -3,19 +3,23 @@ import logging
 from collections.abc import Mapping
 from pathlib import Path
 
-import httpx
-
 from .config import Config
 
 logger = logging.getLogger(__name__)
 
 
 def load_document(root: Path, config: Config) -> Mapping:
-    from .yaml import yaml
+    return parse_document_text(load_document_text(root, config))
 
+
+def load_document_text(root: Path, config: Config) -> str:
     logger.info('Load OpenAPI document')
+    return document_handler_for(root, config.document_path).load()
+
+
+def parse_document_text(text: str) -> Mapping:
+    from .yaml import yaml
 
-    text = document_handler_for(root, config.document_path).load()
     return yaml.load(text)
 
 
@@ -66,6 +70,8 @@ class FileDocumentHandler(DocumentHandler):
 
 class HttpDocumentHandler(DocumentHandler):
     def __init__(self, path: str) -> None:
+        import httpx
+
         super().__init__(path)
         self._client = httpx.Client(timeout=30.0)
         self._cache: str | None = None
@@ -1,20 +1,31 @@
 from __future__ import annotations
 
+import contextlib
+import dataclasses as dc
 import logging
-from collections.abc import Mapping
+import sys
+from collections.abc import Callable, Iterable, Iterator, Mapping
 from pathlib import Path, PurePath
-from typing import TextIO
+from typing import TYPE_CHECKING, Any, Literal, TextIO, TypeAlias
 
-import click
 import pydantic
 
 from .config import Config, load_config
-from .load import document_handler_for, load_document
-from .model import python
+from .costs import NO_COST_REPORT, CostReport, NoCostReport
+from .load import document_handler_for, load_document, load_document_text, parse_document_text
+from .memory import NO_ACCOUNTING, MemoryAccounting, NoAccounting
+from .progress import NO_PROGRESS, BarProgress, Mode as ProgressMode, NoProgress, mk_progress
 from .yaml import yaml
 
+if TYPE_CHECKING:
+    from .batch import DocumentCache, ModelCache
+    from .model import conv_openapi, openapi, python
+
 logger = logging.getLogger(__name__)
 
+Executor: TypeAlias = Literal['process', 'thread']
+RenderStatus: TypeAlias = Literal['rendered', 'restored', 'up to date']
+
 
 def init_project(
     document_path: str,
@@ -69,32 +80,239 @@ def init_project(
     init_project(project_root, config, document)
 
 
-def render_project(project_root: Path) -> None:
-    from .writer import update_project
+def default_executor() -> Executor:
+    gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+    return 'process' if gil_enabled else 'thread'
+
+
+@dc.dataclass(frozen=True, kw_only=True)
+class RenderOptions:
+    """Options of render_project."""
+
+    max_memory: int | None = None
+    """Trace memory used by each stage, and abort with MemoryLimitExceeded if the peak exceeds this many bytes."""
+    force: bool = False
+    """Render even if the project is up to date."""
+    cache_dir: Path | None = None
+    """Restore the rendered project from this directory if available, store it otherwise."""
+    jobs: int = 1
+    """Number of workers converting paths in parallel."""
+    executor: Executor = dc.field(default_factory=default_executor)
+    """
+    Run workers in processes or threads. Threads also render modules in parallel. The default is threads on
+    free-threaded python builds, processes otherwise.
+    """
+    cost_report: Path | None = None
+    """Write conversion time, model size and generated code by document location to this JSON file."""
+    lazy_document: bool = False
+    """
+    Validate path items and components only when they're first used, so parts of the document that aren't rendered
+    cost nothing.
+    """
+    output: Path | None = None
+    """
+    Write the package to this archive, .zip, .whl, .tar, .tar.gz or - for tar on stdout, instead of the src directory.
+    Archives are always rendered, and don't use the cache.
+    """
+    compile_bytecode: bool = False
+    """Write hash-based bytecode of changed modules, also when the project is up to date."""
+    progress: ProgressMode = 'bar'
+    """Show progress bars, write JSON events or nothing, to stdout or to stderr if the archive is written to stdout."""
+
+
+def render_project(
+    project_root: Path,
+    options: RenderOptions = RenderOptions(),
+    documents: DocumentCache | None = None,
+    models: ModelCache | None = None,
+) -> RenderStatus:
+    """
+    Render the client, unless it was already rendered from the same document and configuration.
+    Return whether it was rendered, restored from the cache or up to date.
+
+    :param documents: reuse document models of other projects rendered from the same document
+    :param models: reuse python models rendered before from the same document and configuration, and skip rendering
+    files that still have the content they were rendered with
+    """
+    if options.compile_bytecode and options.output is not None:
+        raise ValueError('Bytecode is only compiled in the src directory')
+    from .archive import STDOUT
+
+    # keep stdout for the archive
+    progress = mk_progress(options.progress, sys.stderr if options.output == STDOUT else None)
+
+    costs = NO_COST_REPORT
+    if options.cost_report is not None:
+        costs = CostReport()
+        if options.jobs > 1 and options.executor == 'process':
+            logger.warning('Conversion costs are not collected in worker processes')
+
+    memory_: contextlib.AbstractContextManager[NoAccounting] = (
+        contextlib.nullcontext(NO_ACCOUNTING) if options.max_memory is None else MemoryAccounting(options.max_memory)
+    )
+    with memory_ as memory:
+        status = _render_project(project_root, options, memory, costs, progress, documents, models)
+
+    if isinstance(costs, CostReport):
+        assert options.cost_report is not None
+        costs.write(options.cost_report)
+    return status
+
+
+def _render_project(
+    project_root: Path,
+    options: RenderOptions,
+    memory: NoAccounting,
+    costs: NoCostReport,
+    progress: NoProgress,
+    documents: DocumentCache | None,
+    models: ModelCache | None,
+) -> RenderStatus:
+    from . import fingerprint
+    from .bytecode import NO_BYTECODE, Bytecode, NoBytecode
 
     config = load_config(project_root)
+    target_root = project_root / 'src'
+    package_extras = PurePath(config.package) / 'extras'
 
-    logger.info('Parse OpenAPI document')
-    oa_doc = load_document(project_root, config)
-    model = prepare_python_model(oa_doc, config)
+    with memory.stage('document'):
+        document_text = load_document_text(project_root, config)
+    fingerprint_ = fingerprint.fingerprint(config, document_text.encode())
+    if options.output is None and not options.force and fingerprint.is_current(target_root, fingerprint_):
+        logger.info('Project is up to date')
+        if options.compile_bytecode and (manifest := fingerprint.read_manifest(target_root)):
+            with Bytecode(target_root, options.jobs, options.executor) as bytecode:
+                bytecode.compile_all(PurePath(path) for path in manifest.files)
+        return 'up to date'
+
+    from .archive import open_archive
+    from .output import DirectoryOutput, Output, remove_stale_files
+    from .writer import RENDERERS, update_project
+
+    if options.output is None and options.cache_dir is not None and not options.force:
+        from . import cache
+
+        if manifest := cache.restore(options.cache_dir, fingerprint_, target_root):
+            remove_stale_files(target_root, {Path(path) for path in manifest.files}, package_extras, progress)
+            fingerprint.write_manifest(target_root, manifest)
+            if options.compile_bytecode:
+                with Bytecode(target_root, options.jobs, options.executor) as bytecode:
+                    bytecode.compile_all(PurePath(path) for path in manifest.files)
+            return 'restored'
+
+    def parse() -> openapi.OpenAPI:
+        nonlocal document_text
+        logger.info('Parse OpenAPI document')
+        with memory.stage('document'):
+            oa_doc = parse_document_text(document_text)
+        document_text = ''
+        with memory.stage('openapi'):
+            return parse_document(oa_doc, options.lazy_document, _select_operation(config))
+
+    rendered = models.lookup(fingerprint_) if models is not None else None
+    oa_model: openapi.OpenAPI | None = None
+    if rendered is not None:
+        logger.info('Reusing python model')
+    elif documents is None:
+        oa_model = parse()
+    else:
+        oa_model = documents.get(documents.key(document_text, config, options.lazy_document), parse)
+    del document_text, parse
+
+    output_: contextlib.AbstractContextManager[Output] = (
+        contextlib.nullcontext(DirectoryOutput(target_root, package_extras, progress))
+        if options.output is None
+        else open_archive(options.output, project_root, config.package)
+    )
+
+    bytecode_: contextlib.AbstractContextManager[NoBytecode] = (
+        Bytecode(target_root, options.jobs, options.executor)
+        if options.compile_bytecode
+        else contextlib.nullcontext(NO_BYTECODE)
+    )
 
     logger.info('Render project')
-    with click.progressbar(
-        model.modules,
-        label='Rendering modules',
-        item_show_func=lambda module: str(module.path) if module else '',
-        show_pos=True,
-    ) as progressbar:
-
-        def progress(module: python.AbstractModule) -> None:
-            progressbar.update(1, module)
-
-        update_project(
-            model.modules,
-            project_root / 'src',
+    # modules are written as soon as they're complete, while the following paths are processed
+    with (
+        output_ as writer,
+        bytecode_ as compiler,
+        progress.stage('paths', len(oa_model.paths.paths) if oa_model else 0, label='Rendering paths') as path_progress,
+        progress.stage('modules') as module_progress,
+    ):
+
+        def update_progress(module: python.AbstractModule) -> None:
+            logger.debug('Render %s', module.path)
+            if module_progress:
+                module_progress(module.path)
+
+        modules: Iterable[python.AbstractModule]
+        converted: list[python.AbstractModule] = []
+        if rendered is not None:
+            modules = rendered.modules
+        else:
+            assert oa_model is not None
+            converter = mk_converter(
+                oa_model,
+                config,
+                path_progress=path_progress,
+                memory=memory,
+                jobs=options.jobs,
+                executor=options.executor,
+                costs=costs,
+            )
+            # the converter releases the document once it's processed
+            del oa_model
+            modules = memory.iter_stage('python model', converter.iter_modules())
+            if models is not None:
+                modules = _collect(modules, converted)
+        files = update_project(
+            modules,
+            writer,
             config.package,
-            progress,
+            update_progress,
+            RENDERERS[config.emitter],
+            memory,
+            threads=options.jobs if options.executor == 'thread' else 1,
+            costs=costs,
+            bytecode=compiler,
+            previous={PurePath(path): hash_ for path, hash_ in rendered.files.items()} if rendered else None,
         )
+    if models is not None and rendered is None:
+        from .batch import RenderedModel
+
+        models.put(fingerprint_, RenderedModel(converted, files))
+    if options.output is not None:
+        return 'rendered'
+
+    # written last, so an interrupted render isn't taken for a complete one
+    manifest = fingerprint.Manifest(fingerprint=fingerprint_, files=files)
+    fingerprint.write_manifest(target_root, manifest)
+
+    if options.cache_dir is not None:
+        from . import cache
+
+        try:
+            cache.store(options.cache_dir, target_root, manifest)
+        except OSError as e:
+            logger.warning('Failed to store rendered project in cache: %s', e)
+    return 'rendered'
+
+
+def _collect[T](items: Iterable[T], collected: list[T]) -> Iterator[T]:
+    for item in items:
+        collected.append(item)
+        yield item
+
+
+def check_project(project_root: Path) -> list[str]:
+    """Check that rendered files are up to date and unmodified, without rendering. Return a list of problems."""
+    from . import fingerprint
+
+    config = load_config(project_root)
+    document = load_document_text(project_root, config).encode()
+    return fingerprint.check(
+        project_root / 'src', fingerprint.fingerprint(config, document), PurePath(config.package) / 'extras'
+    )
 
 
 def dump_model(project_root: Path, process: bool, output: TextIO):
@@ -105,25 +323,64 @@ def dump_model(project_root: Path, process: bool, output: TextIO):
         yaml.dump(oa_doc, output)
 
     else:
-        py_model = prepare_python_model(oa_doc, config)
+        py_model = prepare_python_model(oa_doc, config, BarProgress())
+        from .model import python
+
         doc = pydantic.TypeAdapter(python.ClientModel).dump_python(py_model, mode='json', exclude_none=True)
         yaml.dump(doc, output)
 
 
-def prepare_python_model(oa_doc: Mapping, config: Config) -> python.ClientModel:
-    from .model import conv_openapi, openapi
+def parse_document(
+    oa_doc: Mapping,
+    lazy: bool = False,
+    select_operation: Callable[[str, str | None, Iterable[str]], bool] | None = None,
+) -> openapi.OpenAPI:
+    """
+    Validate the document.
+
+    :param lazy: validate path items and components when they're first accessed
+    :param select_operation: in lazy mode, leave out operations for which it returns False
+    """
+    from .model import openapi
+    from .model.openapi.base import SHARED
+
+    if lazy:
+        from .model.openapi.lazy import parse_lazy
+
+        return parse_lazy(oa_doc, select_operation)
+    return openapi.OpenAPI.model_validate(oa_doc, context={SHARED: {}})
+
+
+def mk_converter(
+    oa_model: openapi.OpenAPI,
+    config: Config,
+    path_progress: Callable[[Any], None] | None = None,
+    memory: NoAccounting = NO_ACCOUNTING,
+    jobs: int = 1,
+    executor: Executor = 'process',
+    costs: NoCostReport = NO_COST_REPORT,
+) -> conv_openapi.OpenApi30Converter:
+    from .model import conv_openapi, python
+
+    return conv_openapi.OpenApi30Converter(
+        python.ModulePath(config.package),
+        oa_model,
+        str(config.origin) if config.origin else None,
+        path_progress=path_progress,
+        memory=memory,
+        select_operation=_select_operation(config),
+        jobs=jobs,
+        executor=executor,
+        costs=costs,
+    )
+
+
+def _select_operation(config: Config) -> Callable[[str, str | None, Iterable[str]], bool] | None:
+    return config.selects_operation if config.include or config.exclude else None
+
 
-    oa_model = openapi.OpenAPI.model_validate(oa_doc)
-    with click.progressbar(
-        length=len(oa_model.paths.paths),
-        label='Processing paths',
-        item_show_func=str,
-        show_pos=True,
-    ) as pbar:
+def prepare_python_model(oa_doc: Mapping, config: Config, progress: NoProgress = NO_PROGRESS) -> python.ClientModel:
+    oa_model = parse_document(oa_doc)
+    with progress.stage('paths', len(oa_model.paths.paths), label='Processing paths') as path_progress:
         logger.info('Prepare python model')
-        return conv_openapi.OpenApi30Converter(
-            python.ModulePath(config.package),
-            oa_model,
-            str(config.origin) if config.origin else None,
-            path_progress=lambda item: pbar.update(1, item),
-        ).process()
+        return mk_converter(oa_model, config, path_progress=path_progress).process()
@@ -0,0 +1,143 @@
+"""Memory accounting of rendering stages, based on tracemalloc."""
+
+import contextlib
+import logging
+import re
+import threading
+import tracemalloc
+from collections.abc import Iterable, Iterator, Mapping, MutableMapping, MutableSequence
+from typing import Self
+
+from .hooks import NULL_CONTEXT
+
+logger = logging.getLogger(__name__)
+
+_UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+_RE_SIZE = re.compile(r'(\d+)\s*([KMG]?)(?:i?B)?', re.IGNORECASE)
+
+
+class MemoryLimitExceeded(Exception):
+    def __init__(self, limit: int, peak: int, stage: str, stages: Mapping[str, int]) -> None:
+        super().__init__(limit, peak, stage, dict(stages))
+        self.limit = limit
+        self.peak = peak
+        self.stage = stage
+        self.stages = dict(stages)
+
+    def __str__(self) -> str:
+        return '\n'.join(
+            [
+                f'Memory limit of {format_size(self.limit)} exceeded in stage {self.stage}: '
+                f'{format_size(self.peak)} used at peak',
+                *format_stages(self.stages),
+            ]
+        )
+
+
+class NoAccounting:
+    """Memory accounting used without a memory limit. Stages and their items are left as they are, untraced."""
+
+    def stage(self, name: str) -> contextlib.AbstractContextManager[None]:
+        return NULL_CONTEXT
+
+    def iter_stage[T](self, name: str, items: Iterable[T]) -> Iterable[T]:
+        return items
+
+
+class MemoryAccounting(NoAccounting):
+    """
+    Trace memory allocated in each rendering stage and abort when the peak usage exceeds the limit.
+
+    The limit is checked when a stage ends, so a single stage may go past it before rendering is aborted. Iterated
+    stages end after each item.
+
+    Stages count the memory they allocated and haven't released before they ended. Memory allocated in a nested stage
+    counts only towards the nested stage. Only memory allocated by Python is traced.
+
+    Stages may run in multiple threads, but tracemalloc counts memory of all threads, so concurrent stages count
+    each other's allocations.
+    """
+
+    def __init__(self, limit: int | None = None) -> None:
+        self.limit = limit
+        self.stages: MutableMapping[str, int] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started = False
+
+    @property
+    def _nested(self) -> MutableSequence[int]:
+        try:
+            return self._local.nested
+        except AttributeError:
+            nested: MutableSequence[int] = []
+            self._local.nested = nested
+            return nested
+
+    def __enter__(self) -> Self:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        return self
+
+    def __exit__(self, *_) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        logger.info('Memory used: %s, peak %s', format_size(current), format_size(peak))
+        for line in format_stages(self.stages):
+            logger.info('%s', line)
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        nested = self._nested
+        start = tracemalloc.get_traced_memory()[0]
+        nested.append(0)
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            allocated = current - start
+            own = allocated - nested.pop()
+            if nested:
+                nested[-1] += allocated
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0) + own
+        if self.limit is not None and peak > self.limit:
+            with self._lock:
+                stages = dict(self.stages)
+            raise MemoryLimitExceeded(self.limit, peak, name, stages)
+
+    def iter_stage[T](self, name: str, items: Iterable[T]) -> Iterator[T]:
+        """Count memory allocated while producing each item towards the stage."""
+        iterator = iter(items)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+
+NO_ACCOUNTING = NoAccounting()
+
+
+def parse_size(value: str) -> int:
+    """Parse size in bytes, with optional K, M or G binary unit suffix, like 512M or 4GiB."""
+    if not (match := _RE_SIZE.fullmatch(value.strip())):
+        raise ValueError('Invalid size', value)
+    return int(match.group(1)) * _UNITS[match.group(2).upper()]
+
+
+def format_size(value: int) -> str:
+    for unit in 'GMK':
+        if abs(value) >= _UNITS[unit]:
+            return f'{value / _UNITS[unit]:.1f} {unit}iB'
+    return f'{value} B'
+
+
+def format_stages(stages: Mapping[str, int]) -> Iterable[str]:
+    width = max(map(len, stages), default=0)
+    return [f'  {name:<{width}} {format_size(size):>12}' for name, size in stages.items()]
@@ -1,11 +1,14 @@
-from collections.abc import Callable, Iterable, Iterator, Sequence
-from typing import cast
+import functools
+import re
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from typing import Any, cast
 
-import click
 import libcst as cst
 
 from . import openapi, python
 
+# libcst nodes are immutable, so fragments that are the same in every module are built once and shared.
+
 MODULE_HEADER: Sequence[cst.EmptyLine] = (
     cst.EmptyLine(
         comment=cst.Comment('# This file is automatically @generated by Lapidary and should not be changed by hand.')
@@ -14,6 +17,43 @@ MODULE_HEADER: Sequence[cst.EmptyLine] = (
 )
 
 DBL_EMPTY_LINE: Sequence[cst.EmptyLine] = (cst.EmptyLine(), cst.EmptyLine())
+EMPTY_LINE: Sequence[cst.EmptyLine] = (cst.EmptyLine(),)
+NAME_NONE = cst.Name('None')
+
+RE_PLACEHOLDER = re.compile(r'\{(\w+)\}')
+
+
+class StatementTemplate:
+    """
+    Statement template parsed once, when the module is loaded.
+
+    Placeholders in the form of {name} are replaced with nodes on each call.
+    """
+
+    def __init__(self, template: str) -> None:
+        self._names = frozenset(RE_PLACEHOLDER.findall(template))
+        self._statement = cst.parse_statement(RE_PLACEHOLDER.sub(lambda match: _placeholder(match[1]), template))
+
+    def __call__(self, **replacements: cst.BaseExpression) -> cst.BaseStatement:
+        if replacements.keys() != self._names:
+            raise ValueError('Template placeholders mismatch', set(replacements), self._names)
+        return cast(
+            cst.BaseStatement,
+            self._statement.visit(_Substitute({_placeholder(name): node for name, node in replacements.items()})),
+        )
+
+
+def _placeholder(name: str) -> str:
+    return f'__lapidary_template_{name}__'
+
+
+class _Substitute(cst.CSTTransformer):
+    def __init__(self, replacements: Mapping[str, cst.BaseExpression]) -> None:
+        super().__init__()
+        self._replacements = replacements
+
+    def leave_Name(self, original_node: cst.Name, updated_node: cst.Name) -> cst.BaseExpression:
+        return self._replacements.get(updated_node.value, updated_node)
 
 
 def mk_name(*parts: str) -> cst.Name | cst.Attribute:
@@ -121,25 +161,10 @@ def mk_schema_class_body(model: python.SchemaClass) -> Iterable[cst.SimpleStatem
     yield from (mk_model_class_field_stmt(field) for field in model.fields)
 
     if not model.allow_extra:
-        yield cst.SimpleStatementLine(
-            leading_lines=[cst.EmptyLine()],
-            body=[
-                cst.Assign(
-                    targets=[cst.AssignTarget(cst.Name('model_config'))],
-                    value=mk_call(
-                        mk_name('pydantic', 'ConfigDict'),
-                        [
-                            cst.Arg(
-                                keyword=cst.Name('extra'),
-                                value=cst.SimpleString("'forbid'"),
-                            )
-                        ],
-                    ),
-                )
-            ],
-        )
+        yield MODEL_CONFIG_FORBID
 
 
+@functools.lru_cache(maxsize=4096)
 def mk_simple_type_name(typ: python.NameRef) -> cst.Name | cst.Attribute:
     # python can't decide on NoneType module
     # https://github.com/python/cpython/issues/128197
@@ -160,6 +185,27 @@ def mk_annotated_type(
     alias: str | None = None,
     metadata: Sequence[cst.Name | cst.Attribute | cst.Call] = (),
     indent: int = 1,
+) -> cst.Name | cst.Attribute | cst.Subscript:
+    if not metadata:
+        # type hints are interned, so most annotations are shared
+        return _mk_annotated_type_cached(typ, alias, indent)
+    return _mk_annotated_type(typ, alias, metadata, indent)
+
+
+@functools.lru_cache(maxsize=4096)
+def _mk_annotated_type_cached(
+    typ: python.AnnotatedType,
+    alias: str | None,
+    indent: int,
+) -> cst.Name | cst.Attribute | cst.Subscript:
+    return _mk_annotated_type(typ, alias, (), indent)
+
+
+def _mk_annotated_type(
+    typ: python.AnnotatedType,
+    alias: str | None,
+    metadata: Sequence[cst.Name | cst.Attribute | cst.Call],
+    indent: int,
 ) -> cst.Name | cst.Attribute | cst.Subscript:
     result: cst.Name | cst.Attribute | cst.Subscript = mk_simple_type_name(typ.typ)
     if typ.generic_args:
@@ -203,10 +249,10 @@ def mk_model_class_field_stmt(model: python.AnnotatedVariable) -> cst.SimpleStat
                         model.alias,
                     )
                 ),
-                value=cst.Name('None') if not model.required else None,
+                value=NAME_NONE if not model.required else None,
             )
         ],
-        leading_lines=[cst.EmptyLine()],
+        leading_lines=EMPTY_LINE,
     )
 
 
@@ -239,21 +285,26 @@ def mk_indent_factory(
 
         def mk_indentation(idx: int) -> cst.BaseParenthesizableWhitespace:
             last_item = idx == items_len - 1
-            return cst.ParenthesizedWhitespace(
-                first_line=cst.TrailingWhitespace(newline=cst.Newline()),
-                last_line=cst.SimpleWhitespace(' ' * 4 * (depth - (1 if last_item else 0))),
-                indent=True,
-            )
+            return _line_break(depth - (1 if last_item else 0))
 
         return mk_indentation
     else:
 
         def mk_indentation(_: int) -> cst.SimpleWhitespace:  # type: ignore[misc]
-            return cst.SimpleWhitespace('')
+            return NO_WHITESPACE
 
         return mk_indentation
 
 
+@functools.cache
+def _line_break(depth: int) -> cst.ParenthesizedWhitespace:
+    return cst.ParenthesizedWhitespace(
+        first_line=cst.TrailingWhitespace(newline=cst.Newline()),
+        last_line=cst.SimpleWhitespace(' ' * 4 * depth),
+        indent=True,
+    )
+
+
 def mk_function(
     *,
     decorators: Iterable[cst.Name | cst.Attribute | cst.Call] = (),
@@ -313,7 +364,7 @@ def mk_operation_params(operation: python.OperationFunction) -> Iterator[cst.Par
         yield cst.Param(
             cst.Name(param.name),
             cst.Annotation(mk_annotated_type(param.typ, metadata=[mk_in_annotation(param, 1)])),
-            default=cst.Name('None') if not param.required else None,
+            default=NAME_NONE if not param.required else None,
         )
 
 
@@ -335,7 +386,7 @@ def mk_client_init_fn(model: python.ClientInit) -> cst.FunctionDef:
             )
         ],
         param_kwargs=cst.Param(name_kwargs),
-        returns=cst.Name('None'),
+        returns=NAME_NONE,
         body=[
             cst.SimpleStatementLine(
                 [
@@ -458,21 +509,24 @@ def mk_operation_method(operation: python.OperationFunction) -> cst.FunctionDef:
     )
 
 
-def mk_client_module(module: python.ClientModule) -> cst.Module:
+def mk_client_module(
+    module: python.ClientModule, operation_progress: Callable[[Any], None] | None = None
+) -> cst.Module:
     body = [mk_client_init_fn(module.body.init_method)]
-    with click.progressbar(module.body.methods, label='Rendering operations', show_eta=True) as bar:
-        for operation in module.body.methods:
-            bar.update(1, operation)
-            body.append(mk_operation_method(operation))
+    for operation in module.body.methods:
+        body.append(mk_operation_method(operation))
+        if operation_progress:
+            operation_progress(operation.name)
+    return _mk_client_module(module, body)
+
+
+def _mk_client_module(module: python.ClientModule, body: Sequence[cst.FunctionDef]) -> cst.Module:
     return cst.Module(
         header=MODULE_HEADER,
         body=[
             FUTURE_ANNOTATIONS,
             cst.EmptyLine(),
-            cst.helpers.parse_template_statement("""
-__all__ = (
-    'ApiClient',
-)"""),
+            CLIENT_ALL,
             *mk_imports(module),
             mk_class_def(
                 class_name='ApiClient',
@@ -483,6 +537,18 @@ __all__ = (
     )
 
 
+def mk_client_module_code(module: python.ClientModule) -> Iterator[str]:
+    """
+    Serialize the client module method by method, without building the syntax tree of the whole module.
+
+    Yields the same code as mk_client_module().code, in chunks.
+    """
+    yield _mk_client_module(module, [mk_client_init_fn(module.body.init_method)]).code
+    for operation in module.body.methods:
+        # the block adds the indentation of the class body, skip its leading newline
+        yield MODULE_EMPTY.code_for_node(cst.IndentedBlock([mk_operation_method(operation)]))[1:]
+
+
 def mk_scope_slice(scopes: Iterable[str]) -> cst.Subscript:
     return mk_parametrized_type(mk_name('typing', 'Literal'), [str_literal(scope) for scope in scopes], 2)
 
@@ -509,9 +575,8 @@ def mk_security_fn(auth: python.Auth) -> cst.BaseStatement:
             raise TypeError(auth, type(auth))
 
 
-def mk_auth_oauth2_passwd(auth: python.PasswordOAuth2Flow, fn_name: cst.Name) -> cst.BaseStatement:
-    return cst.helpers.parse_template_statement(
-        """def {fn_name}(
+TEMPLATE_AUTH_OAUTH2_PASSWD = StatementTemplate(
+    """def {fn_name}(
     username: str,
     password: str,
     scope: typing.Union[
@@ -528,7 +593,12 @@ def mk_auth_oauth2_passwd(auth: python.PasswordOAuth2Flow, fn_name: cst.Name) ->
         username=username,
         password=password,
         **kwargs,
-    )""",
+    )"""
+)
+
+
+def mk_auth_oauth2_passwd(auth: python.PasswordOAuth2Flow, fn_name: cst.Name) -> cst.BaseStatement:
+    return TEMPLATE_AUTH_OAUTH2_PASSWD(
         fn_name=fn_name,
         scopes=mk_scope_slice(auth.scopes.keys()),
         auth_name=str_literal(auth.name),
@@ -536,9 +606,8 @@ def mk_auth_oauth2_passwd(auth: python.PasswordOAuth2Flow, fn_name: cst.Name) ->
     )
 
 
-def mk_auth_oauth2_implicit(auth: python.ImplicitOAuth2Flow, fn_name: cst.Name) -> cst.BaseStatement:
-    return cst.helpers.parse_template_statement(
-        """def {fn_name}(
+TEMPLATE_AUTH_OAUTH2_IMPLICIT = StatementTemplate(
+    """def {fn_name}(
     scope: typing.Union[
         collections.abc.Iterable[{scopes}],
         None
@@ -552,7 +621,12 @@ def mk_auth_oauth2_implicit(auth: python.ImplicitOAuth2Flow, fn_name: cst.Name)
         authorization_url={authorization_url},
         **kwargs,
     )
-""",
+"""
+)
+
+
+def mk_auth_oauth2_implicit(auth: python.ImplicitOAuth2Flow, fn_name: cst.Name) -> cst.BaseStatement:
+    return TEMPLATE_AUTH_OAUTH2_IMPLICIT(
         fn_name=fn_name,
         scopes=mk_scope_slice(auth.scopes.keys()),
         auth_name=str_literal(auth.name),
@@ -560,9 +634,8 @@ def mk_auth_oauth2_implicit(auth: python.ImplicitOAuth2Flow, fn_name: cst.Name)
     )
 
 
-def mk_auth_oauth2_client_creds(auth: python.ClientCredentialsOAuth2Flow, fn_name: cst.Name) -> cst.BaseStatement:
-    return cst.helpers.parse_template_statement(
-        """def {fn_name}(
+TEMPLATE_AUTH_OAUTH2_CLIENT_CREDS = StatementTemplate(
+    """def {fn_name}(
     client_id: str,
     client_secret: str,
     scope: typing.Union[
@@ -579,7 +652,12 @@ def mk_auth_oauth2_client_creds(auth: python.ClientCredentialsOAuth2Flow, fn_nam
         client_id=client_id,
         client_secret=client_secret,
         **kwargs,
-    )""",
+    )"""
+)
+
+
+def mk_auth_oauth2_client_creds(auth: python.ClientCredentialsOAuth2Flow, fn_name: cst.Name) -> cst.BaseStatement:
+    return TEMPLATE_AUTH_OAUTH2_CLIENT_CREDS(
         fn_name=fn_name,
         scopes=mk_scope_slice(auth.scopes.keys()),
         auth_name=str_literal(auth.name),
@@ -587,9 +665,8 @@ def mk_auth_oauth2_client_creds(auth: python.ClientCredentialsOAuth2Flow, fn_nam
     )
 
 
-def mk_auth_oauth2_auth_code(auth: python.AuthorizationCodeOAuth2Flow, fn_name: cst.Name):
-    return cst.helpers.parse_template_statement(
-        """def {fn_name}(
+TEMPLATE_AUTH_OAUTH2_AUTH_CODE = StatementTemplate(
+    """def {fn_name}(
     scope: typing.Union[
         collections.abc.Iterable[{scopes}],
         None
@@ -604,7 +681,12 @@ def mk_auth_oauth2_auth_code(auth: python.AuthorizationCodeOAuth2Flow, fn_name:
         token_url={token_url},
         **kwargs,
     )
-""",
+"""
+)
+
+
+def mk_auth_oauth2_auth_code(auth: python.AuthorizationCodeOAuth2Flow, fn_name: cst.Name):
+    return TEMPLATE_AUTH_OAUTH2_AUTH_CODE(
         fn_name=fn_name,
         scopes=mk_scope_slice(auth.scopes.keys()),
         auth_name=str_literal(auth.name),
@@ -613,46 +695,58 @@ def mk_auth_oauth2_auth_code(auth: python.AuthorizationCodeOAuth2Flow, fn_name:
     )
 
 
-def mk_auth_http_digest(auth, fn_name):
-    return cst.helpers.parse_template_statement(
-        """def {fn_name}(
+TEMPLATE_AUTH_HTTP_DIGEST = StatementTemplate(
+    """def {fn_name}(
     user_name: str,
     password: str
 ) -> lapidary.runtime.NamedAuth:
     return {auth_name}, httpx.DigestAuth(
         username=user_name,
         password=password,
-    )""",
+    )"""
+)
+
+
+def mk_auth_http_digest(auth, fn_name):
+    return TEMPLATE_AUTH_HTTP_DIGEST(
         fn_name=fn_name,
         auth_name=str_literal(auth.name),
     )
 
 
-def mk_auth_http_basic(auth, fn_name):
-    return cst.helpers.parse_template_statement(
-        """def {fn_name}(
+TEMPLATE_AUTH_HTTP_BASIC = StatementTemplate(
+    """def {fn_name}(
     user_name: str,
     password: str
 ) -> lapidary.runtime.NamedAuth:
     return {auth_name}, httpx.BasicAuth(
         username=user_name,
         password=password,
-    )""",
+    )"""
+)
+
+
+def mk_auth_http_basic(auth, fn_name):
+    return TEMPLATE_AUTH_HTTP_BASIC(
         fn_name=fn_name,
         auth_name=str_literal(auth.name),
     )
 
 
+TEMPLATE_AUTH_API_KEY = StatementTemplate(
+    """def {fn_name}(api_key: str) -> lapidary.runtime.NamedAuth:
+    return {auth_name}, {auth_class}(
+        api_key=api_key,
+        {param_name}={auth_key},
+    )"""
+)
+
+
 def mk_auth_api_key(auth: python.ApiKeyAuth, fn_name: cst.Name):
     param_name = auth.location.value + (
         '_parameter_name' if auth.location == openapi.ParameterLocation.QUERY else '_name'
     )
-    return cst.helpers.parse_template_statement(
-        """def {fn_name}(api_key: str) -> lapidary.runtime.NamedAuth:
-    return {auth_name}, {auth_class}(
-        api_key=api_key,
-        {param_name}={auth_key},
-    )""",
+    return TEMPLATE_AUTH_API_KEY(
         fn_name=fn_name,
         auth_name=str_literal(auth.name),
         auth_class=mk_name('lapidary', 'runtime', 'auth', auth.location.value.capitalize() + 'ApiKey'),
@@ -667,7 +761,7 @@ def mk_security_module(module: python.SecurityModule) -> cst.Module:
         body=[
             FUTURE_ANNOTATIONS,
             *(mk_imports(module)),
-            cst.SimpleStatementLine([cst.Import([cst.ImportAlias(mk_name('lapidary', 'runtime', 'auth'))])]),
+            IMPORT_RUNTIME_AUTH,
             *(mk_security_fn(auth).with_changes(leading_lines=DBL_EMPTY_LINE) for auth in module.body.values()),
         ],
     )
@@ -684,10 +778,10 @@ def mk_metadata_field(model: python.Parameter) -> cst.SimpleStatementLine:
                         metadata=[mk_in_annotation(model, 1)],
                     )
                 ),
-                value=cst.Name('None') if not model.required else None,
+                value=NAME_NONE if not model.required else None,
             )
         ],
-        leading_lines=[cst.EmptyLine()],
+        leading_lines=EMPTY_LINE,
     )
 
 
@@ -704,18 +798,16 @@ def mk_import(module: str) -> cst.Import:
     return cst.Import([cst.ImportAlias(mk_name(*parts))])
 
 
+@functools.lru_cache(maxsize=4096)
+def mk_import_stmt(module: str) -> cst.SimpleStatementLine:
+    return cst.SimpleStatementLine([mk_import(module)])
+
+
 def mk_imports(module: python.AbstractModule) -> Iterator[cst.SimpleStatementLine]:
-    imports = [
-        cst.SimpleStatementLine([cst.Import([cst.ImportAlias(mk_name('lapidary', 'runtime'))])], [cst.EmptyLine()]),
-        cst.Import([cst.ImportAlias(cst.Name('pydantic'))]),
-        cst.Import([cst.ImportAlias(cst.Name('typing_extensions'), cst.AsName(cst.Name('typing')))]),
-        *(
-            mk_import(mod_name)
-            for mod_name in module.imports
-            if mod_name not in ('pydantic', 'typing', 'lapidary.runtime')
-        ),
-    ]
-    return (cst.SimpleStatementLine([imp]) if not isinstance(imp, cst.SimpleStatementLine) else imp for imp in imports)
+    yield from COMMON_IMPORTS
+    for mod_name in module.imports:
+        if mod_name not in ('pydantic', 'typing', 'lapidary.runtime'):
+            yield mk_import_stmt(mod_name)
 
 
 def mk_metadata_module(module: python.MetadataModule) -> cst.Module:
@@ -736,3 +828,38 @@ MODULE_ROOT = cst.Module(
 )
 
 FUTURE_ANNOTATIONS = cst.ImportFrom(cst.Name('__future__'), [cst.ImportAlias(cst.Name('annotations'))])
+
+NO_WHITESPACE = cst.SimpleWhitespace('')
+
+COMMON_IMPORTS: Sequence[cst.SimpleStatementLine] = (
+    cst.SimpleStatementLine([cst.Import([cst.ImportAlias(mk_name('lapidary', 'runtime'))])], [cst.EmptyLine()]),
+    cst.SimpleStatementLine([cst.Import([cst.ImportAlias(cst.Name('pydantic'))])]),
+    cst.SimpleStatementLine(
+        [cst.Import([cst.ImportAlias(cst.Name('typing_extensions'), cst.AsName(cst.Name('typing')))])]
+    ),
+)
+
+IMPORT_RUNTIME_AUTH = cst.SimpleStatementLine([cst.Import([cst.ImportAlias(mk_name('lapidary', 'runtime', 'auth'))])])
+
+MODEL_CONFIG_FORBID = cst.SimpleStatementLine(
+    leading_lines=EMPTY_LINE,
+    body=[
+        cst.Assign(
+            targets=[cst.AssignTarget(cst.Name('model_config'))],
+            value=mk_call(
+                mk_name('pydantic', 'ConfigDict'),
+                [
+                    cst.Arg(
+                        keyword=cst.Name('extra'),
+                        value=cst.SimpleString("'forbid'"),
+                    )
+                ],
+            ),
+        )
+    ],
+)
+
+CLIENT_ALL = cst.helpers.parse_template_statement("""
+__all__ = (
+    'ApiClient',
+)""")
@@ -1,18 +1,30 @@
+import dataclasses as dc
+import functools
 import itertools
 import logging
 from collections import defaultdict
-from collections.abc import Callable, Iterable, Mapping, MutableMapping, Sequence
-from typing import Any
+from collections.abc import Callable, Iterable, Iterator, Mapping, MutableMapping, MutableSequence, Sequence
+from typing import Any, Literal
 
 from mimeparse import parse_media_range
 
-from .. import json_pointer, names
+from .. import json_pointer
+from ..costs import NO_COST_REPORT, NoCostReport
+from ..memory import NO_ACCOUNTING, NoAccounting
 from . import metamodel, openapi, python
-from .conv_schema import OpenApi30SchemaConverter
-from .metamodel import MetaModel, resolve_type_name
+from .conv_schema import (
+    NO_ALIASES,
+    Aliases,
+    OpenApi30SchemaConverter,
+    canonical_stack,
+    find_aliases,
+    precompile_schemas,
+)
+from .metamodel import MetaModel
 from .python import type_hint
-from .refs import resolve_ref
+from .refs import resolve_ref, resolve_ref_memoized
 from .stack import Stack
+from .symbols import SymbolTable
 
 logger = logging.getLogger(__name__)
 
@@ -24,13 +36,37 @@ class OpenApi30Converter:
         source: openapi.OpenAPI,
         origin: str | None,
         path_progress: Callable[[Any], None] | None = None,
+        memory: NoAccounting = NO_ACCOUNTING,
+        select_operation: Callable[[str, str | None, Iterable[str]], bool] | None = None,
+        jobs: int = 1,
+        executor: Literal['process', 'thread'] = 'process',
+        schemas: Mapping[Stack, MetaModel | None] | None = None,
+        costs: NoCostReport = NO_COST_REPORT,
+        aliases: Aliases = NO_ALIASES,
     ):
+        """
+        :param select_operation: called with path, operationId and tags; only operations for which it returns True
+        are converted, and only models they use are rendered
+        :param jobs: number of workers converting paths in parallel
+        :param executor: run workers in processes, or in threads, which scale on free-threaded python builds
+        :param schemas: precompiled models of referenced schemas; by default they're precompiled before paths are
+        processed
+        :param costs: report of conversion time and generated code by document location; not collected in worker
+        processes
+        :param aliases: schemas found at many locations, found with the precompiled schemas by default
+        """
         self.root_package = root_package
         self.global_headers: dict[str, python.Parameter] = {}
         self.global_responses: dict[python.ResponseCode, python.Response]
         self.source = source
         self._origin = origin
         self._path_progress = path_progress
+        self._memory = memory
+        self._costs = costs
+        self._select_operation = select_operation
+        self._jobs = jobs
+        self._executor = executor
+        self.symbols = SymbolTable(str(root_package))
 
         self.target = python.ClientModel(
             client=python.ClientModule(
@@ -40,7 +76,13 @@ class OpenApi30Converter:
             package=str(root_package),
         )
 
-        self._response_cache: MutableMapping[Stack, python.Response] = {}
+        self.ref_cache: MutableMapping[tuple[str, str], Any] = {}
+        """Results of converting referenced objects, by method name and pointer."""
+
+        self._schemas: Mapping[Stack, MetaModel | None] = schemas if schemas is not None else {}
+        """Precompiled models of referenced schemas, read-only and shared with workers."""
+        self._aliases = aliases
+        """Schemas found at many locations, read-only and shared with workers."""
 
         self._models: MutableMapping[Stack, metamodel.MetaModel] = {}
         """
@@ -48,46 +90,213 @@ class OpenApi30Converter:
         Indirectly referred must be accessible via the direct models.
         """
 
+        self._new_models: MutableSequence[metamodel.MetaModel] = []
+        """Models added to _models since the last flush."""
+        self._metadata: MutableMapping[tuple[str, frozenset[python.Parameter]], python.AnnotatedType] = {}
+        """Request and response metadata classes, by name and fields."""
+        self._pending_modules: MutableSequence[python.AbstractModule] = []
+        """Complete modules not yet yielded."""
+        self._emitted_classes: set[tuple[python.ModulePath, str]] = set()
+        self._emitted_modules: MutableMapping[python.ModulePath, None] = {}
+        """Paths of yielded modules, in order."""
+        self._emitted_metadata: MutableMapping[python.ModulePath, python.MetadataModule] = {}
+
     def process(self) -> python.ClientModel:
-        stack = Stack()
+        self.target.model_modules.extend(self._process_document())
+        return self.target
+
+    def iter_modules(self) -> Iterator[python.AbstractModule]:
+        """
+        Convert the document and yield every module as soon as it's complete.
 
+        Schema and metadata modules are yielded after each path, the security and client modules and empty packages
+        are yielded last. Yielded modules are not kept in the target model.
+        """
+        yield from self._process_document()
+        self._release()
+        yield from self.target.closing_modules(list(self._emitted_modules))
+
+    def _release(self) -> None:
+        """Drop the document and intermediate models, once all paths are processed."""
+        del self.source
+        self._models.clear()
+        self._schemas = {}
+        self._aliases = NO_ALIASES
+        self.ref_cache.clear()
+        self._emitted_classes.clear()
+        self._emitted_metadata.clear()
+
+    def _process_document(self) -> Iterator[python.AbstractModule]:
+        paths = [path for path in self.source.paths.paths if path.startswith('/')]
+        if not self._schemas:
+            self._schemas = self._precompile_schemas(paths)
+
+        yield from self._process_globals()
+
+        if self._jobs > 1 and len(paths) > 1:
+            yield from self._process_paths_parallel(paths)
+            return
+
+        paths_stack = Stack().push('paths')
+        for path in paths:
+            self.process_path(self.source.paths.paths[path], paths_stack.push(path))
+            yield from self._flush_modules()
+
+    def _precompile_schemas(self, paths: Iterable[str]) -> Mapping[Stack, MetaModel | None]:
+        """
+        Convert schemas referenced by global responses and headers, and by selected operations.
+
+        Also finds schemas they reach at many locations.
+        """
+        roots: list[tuple[Stack, Any]] = [
+            (Stack().push('x-lapidary-responses-global'), self.source.lapidary_responses_global),
+            (Stack().push('x-lapidary-headers-global'), self.source.lapidary_headers_global),
+        ]
+        for path in paths:
+            path_item = self.source.paths.paths[path]
+            if operations := self._selected_operations(path_item, json_pointer.decode_json_pointer(path)):
+                path_stack = Stack().push('paths', path)
+                roots.append((path_stack.push('parameters'), path_item.parameters))
+                roots.extend((path_stack.push(method), operation) for method, operation in operations)
+        with self._memory.stage('metamodel'):
+            if not self._aliases:
+                self._aliases = find_aliases(self.source, roots)
+            return precompile_schemas(
+                self.source, self.root_package, [root for _, root in roots], self._costs, self._aliases
+            )
+
+    def _process_globals(self) -> Iterator[python.AbstractModule]:
         map_process(
             self.source,
-            stack,
+            Stack(),
             {
                 'servers': self.process_servers,
                 'lapidary_responses_global': self.process_global_responses,
                 'lapidary_headers_global': self.process_global_headers,
                 'security': self.process_global_security,
-                'paths': self.process_paths,
             },
         )
+        return self._flush_modules()
+
+    def _process_paths_parallel(self, paths: Sequence[str]) -> Iterator[python.AbstractModule]:
+        """
+        Convert chunks of paths in worker processes or threads, and merge the results in document order.
+
+        Every chunk is converted from scratch by its own converter, so a worker reports every model it reaches in a
+        chunk the first time it reaches it, regardless of which chunks it converted before. Merging results in document
+        order and skipping already emitted classes and modules yields the same modules as sequential conversion.
+        Workers share no mutable state other than the tables of interned values, which are only changed under locks.
+        """
+        from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+        # more chunks than workers, to even out their load
+        chunk_size = -(-len(paths) // (self._jobs * 4))
+        chunks = [paths[idx : idx + chunk_size] for idx in range(0, len(paths), chunk_size)]
+        args = (self.root_package, self.source, self._origin, self._select_operation, self._schemas, self._aliases)
+        executor: Executor
+        process_chunk: Callable[[Sequence[str]], Sequence[PathResult]]
+        if self._executor == 'thread':
+            executor = ThreadPoolExecutor(self._jobs)
+            process_chunk = functools.partial(_convert_paths_chunk, *args, self._costs)
+        else:
+            executor = ProcessPoolExecutor(self._jobs, initializer=_init_worker, initargs=args)
+            process_chunk = _process_paths_chunk
+        with executor:
+            for results in executor.map(process_chunk, chunks):
+                for result in results:
+                    result = self._merge_metadata(result)
+                    self.target.client.body.methods.extend(result.methods)
+                    for name, scheme in result.security_schemes.items():
+                        self.target.security_schemes.setdefault(name, scheme)
+                    yield from self._emit(result.modules)
+                    if self._path_progress:
+                        self._path_progress(result.path)
+
+    def _merge_metadata(self, result: 'PathResult') -> 'PathResult':
+        """
+        Point methods of a worker result at metadata classes already emitted by other workers.
+
+        Each worker shares metadata classes only among the paths it converted, placing them where it first needed them.
+        """
+        names: MutableMapping[python.NameRef, python.NameRef] = {}
+        modules = []
+        for module in result.modules:
+            if isinstance(module, python.MetadataModule):
+                (model,) = module.body
+                typ = python.AnnotatedType(python.NameRef(str(module.path), model.name))
+                canonical = self._metadata.setdefault((model.name, frozenset(model.fields)), typ)
+                if canonical is not typ:
+                    names[typ.typ] = canonical.typ
+                    continue
+            modules.append(module)
+        if not names:
+            return result
+        return dc.replace(
+            result,
+            methods=[_replace_method_names(method, names) for method in result.methods],
+            modules=modules,
+        )
+
+    def _process_path_result(self, path: str) -> 'PathResult':
+        methods = self.target.client.body.methods
+        methods_count = len(methods)
+        schemes_count = len(self.target.security_schemes)
+        self.process_path(self.source.paths.paths[path], Stack().push('paths', path))
+        return PathResult(
+            path=path,
+            methods=methods[methods_count:],
+            security_schemes=dict(itertools.islice(self.target.security_schemes.items(), schemes_count, None)),
+            modules=list(self._flush_modules()),
+        )
 
+    def _flush_modules(self) -> Iterator[python.AbstractModule]:
+        """Yield metadata modules and schema modules of models processed since the last flush."""
         models: MutableMapping[Stack, python.SchemaClass] = {}
-        for model in self._models.values():
+        for model in self._new_models:
             self._collect_schema_models(model, models)
+        self._new_models.clear()
 
         modules: Mapping[python.ModulePath, list[python.SchemaClass]] = defaultdict(list)
         for stack, class_ in models.items():
-            modules[python.ModulePath(resolve_type_name(str(self.root_package), stack).typ.module)].append(class_)
-
-        self.target.model_modules.extend(
-            (
-                python.SchemaModule(
-                    path=module_path,
-                    body=models,
-                )
-                for module_path, models in modules.items()
-            )
-        )
-
-        return self.target
+            module_path = python.ModulePath(self.symbols.resolve_type_name(stack).typ.module)
+            modules[module_path].append(class_)
+            self._costs.module(module_path, stack)
+
+        pending = [
+            *self._pending_modules,
+            *(python.SchemaModule(path=module_path, body=models) for module_path, models in modules.items()),
+        ]
+        self._pending_modules.clear()
+        return self._emit(pending)
+
+    def _emit(self, modules: Iterable[python.AbstractModule]) -> Iterator[python.AbstractModule]:
+        """Yield modules, skipping schema classes yielded before."""
+        for module in modules:
+            if isinstance(module, python.SchemaModule):
+                body = [class_ for class_ in module.body if (module.path, class_.name) not in self._emitted_classes]
+                if not body:
+                    continue
+                self._emitted_classes.update((module.path, class_.name) for class_ in body)
+                if len(body) != len(module.body):
+                    module = dc.replace(module, body=body)
+            elif isinstance(module, python.MetadataModule):
+                if (emitted := self._emitted_metadata.get(module.path)) is not None:
+                    # headers of a shared response, converted by more than one worker
+                    if module != emitted:
+                        raise ValueError('Conflicting metadata module', module.path)
+                    continue
+                self._emitted_metadata[module.path] = module
+
+            if module.path in self._emitted_modules:
+                raise ValueError('Module already rendered', module.path)
+            self._emitted_modules[module.path] = None
+            yield module
 
     def _collect_schema_models(
         self, model: metamodel.MetaModel, models: MutableMapping[Stack, python.SchemaClass]
     ) -> None:
         try:
-            if class_ := model.as_type(str(self.root_package)):
+            if class_ := model.as_type(self.symbols):
                 models[model.stack] = class_
         except Exception:
             raise
@@ -142,7 +351,7 @@ class OpenApi30Converter:
         if value.param_schema:
             model = self._process_schema(value.param_schema, stack.push('schema'))
             assert model
-            return model.as_annotation(str(self.root_package), value.required), None
+            return model.as_annotation(self.symbols, value.required), None
         elif value.content:
             media_type, media_type_obj = next(iter(value.content.items()))
             # encoding = media_type_obj.encoding
@@ -150,14 +359,14 @@ class OpenApi30Converter:
                 media_type_obj.media_type_schema or openapi.Schema(), stack.push('content', media_type)
             )
             assert model
-            return model.as_annotation(str(self.root_package), value.required), media_type
+            return model.as_annotation(self.symbols, value.required), media_type
         else:
             raise TypeError(f'{stack}: schema or content is required')
 
     # Not providing process_parameters (plural) as each caller calls it in a different context
     # (list, map or map with defaults)
 
-    @resolve_ref
+    @resolve_ref_memoized
     def process_parameter(self, value: openapi.Parameter, stack: Stack) -> python.Parameter:
         logger.debug('process_parameter %s', stack)
 
@@ -165,7 +374,7 @@ class OpenApi30Converter:
             raise TypeError(f'Expected Parameter object at {stack}, got {type(value).__name__}.')
 
         typ, media_type = self._process_schema_or_content(value, stack)
-        python_name = parameter_name(value)
+        python_name = parameter_name(value, self.symbols)
         return python.Parameter(
             name=python_name,
             typ=typ,
@@ -176,33 +385,40 @@ class OpenApi30Converter:
             alias=value.name if value.name != python_name else None,
         )
 
-    def process_paths(self, value: openapi.Paths, stack: Stack) -> None:
-        for path, path_item in value.paths.items():
-            if path.startswith('/'):
-                self.process_path(path_item, stack.push(path))
-
     def process_path(
         self,
         value: openapi.PathItem,
         stack: Stack,
     ) -> None:
-        common_params_stack = stack.push('parameters')
-        common_params = (
-            {
-                param.name: self.process_parameter(param, common_params_stack.push(str(idx)))
-                for idx, param in enumerate(value.parameters)
-            }
-            if value.parameters
-            else {}
-        )
+        path = json_pointer.decode_json_pointer(stack.top())
+        if operations := self._selected_operations(value, path):
+            common_params_stack = stack.push('parameters')
+            common_params = (
+                {
+                    param.name: self.process_parameter(param, common_params_stack.push(str(idx)))
+                    for idx, param in enumerate(value.parameters)
+                }
+                if value.parameters
+                else {}
+            )
 
-        for method in ('get', 'post', 'put', 'delete', 'head', 'patch', 'options', 'trace'):
-            if operation := getattr(value, method):
+            for method, operation in operations:
                 self.process_operation(operation, stack.push(method), common_params)
         if self._path_progress:
-            self._path_progress(json_pointer.decode_json_pointer(stack.top()))
+            self._path_progress(path)
+
+    def _selected_operations(self, value: openapi.PathItem, path: str) -> Sequence[tuple[str, openapi.Operation]]:
+        return [
+            (method, operation)
+            for method in ('get', 'post', 'put', 'delete', 'head', 'patch', 'options', 'trace')
+            if (operation := getattr(value, method))
+            and (
+                self._select_operation is None
+                or self._select_operation(path, operation.operationId, operation.tags or ())
+            )
+        ]
 
-    @resolve_ref
+    @resolve_ref_memoized
     def process_request_body(self, value: openapi.RequestBody, stack: Stack) -> python.MimeMap:
         # TODO handle required
         return self.process_content(value.content, stack.push('content'))
@@ -210,7 +426,7 @@ class OpenApi30Converter:
     def process_responses(self, value: openapi.Responses, stack: Stack) -> python.ResponseMap:
         return {code: self.process_response(response, stack.push(code)) for code, response in value.responses.items()}
 
-    @resolve_ref
+    @resolve_ref_memoized
     def process_response(
         self,
         value: openapi.Response,
@@ -218,38 +434,24 @@ class OpenApi30Converter:
     ) -> python.Response:
         assert isinstance(value, openapi.Response)
 
-        if response := self._response_cache.get(stack):
-            return response
-
-        response = python.Response(
+        return python.Response(
             content=self.process_content(value.content, stack.push('content')),
             headers_type=self.process_headers(value.headers, stack.push('headers')),
         )
-        self._response_cache[stack] = response
-        return response
 
     def process_headers(self, value: Mapping[str, openapi.Header], stack: Stack) -> python.AnnotatedType:
         if not value:
             return python.NoneMetaType
         headers = [self.process_header(header, stack.push(name)) for name, header in value.items()]
-        model = python.MetadataModel('ResponseMetadata', headers)
-        annotation = resolve_type_name(str(self.root_package), stack.push('ResponseMetadata'))
-
-        self.target.model_modules.append(
-            python.MetadataModule(
-                path=python.ModulePath(annotation.typ.module, is_module=True),
-                body=[model],
-            )
-        )
-        return annotation
+        return self._mk_metadata('ResponseMetadata', headers, stack.push('ResponseMetadata'))
 
-    @resolve_ref
+    @resolve_ref_memoized
     def process_header(self, value: openapi.Header, stack: Stack) -> python.Parameter:
         alias = stack.top()
 
         typ, _ = self._process_schema_or_content(value, stack)
 
-        python_name = names.maybe_mangle_name(alias)
+        python_name = self.symbols.mangle(alias)
         return python.Parameter(
             name=python_name,
             typ=typ,
@@ -270,15 +472,23 @@ class OpenApi30Converter:
                 continue
             model = self._process_schema(media_type.media_type_schema or openapi.Schema(), stack.push(mime, 'schema'))
             assert model
-            types[mime] = model.as_annotation(str(self.root_package))
+            types[mime] = model.as_annotation(self.symbols)
         return types
 
     @resolve_ref
     def _process_schema(self, value: openapi.Schema, stack: Stack) -> MetaModel | None:
+        stack = canonical_stack(self._aliases, value, stack)
         if not (model := self._models.get(stack)):
-            converter = OpenApi30SchemaConverter(value, stack, self.root_package, self.source)
-            if (model := converter.process_schema()) is not None:
+            if stack in self._schemas:
+                model = self._schemas[stack]
+            else:
+                with self._memory.stage('metamodel'):
+                    model = OpenApi30SchemaConverter(
+                        value, stack, self.root_package, self.source, self._schemas, self._costs, self._aliases
+                    ).process_schema()
+            if model is not None:
                 self._models[stack] = model
+                self._new_models.append(model)
 
         return model
 
@@ -311,7 +521,7 @@ class OpenApi30Converter:
             return_types.add(type_hint.tuple_of(body_type, response.headers_type))
 
         model = python.OperationFunction(
-            name=names.maybe_mangle_name(value.operationId),
+            name=self.symbols.mangle(value.operationId),
             method=stack.top(),
             path=json_pointer.decode_json_pointer(stack[-2]),
             request_body=request_body,
@@ -364,14 +574,18 @@ class OpenApi30Converter:
         self, value: Iterable[python.Parameter], stack: Stack
     ) -> python.AnnotatedType:
         fields = [field for field in value if field.in_ in ('Cookie', 'Header')]
-        metadata_model = python.MetadataModel('RequestMetadata', fields)
-        typ = resolve_type_name(str(self.root_package), stack.push('meta', 'RequestMetadata'))
-        self.target.model_modules.append(
-            python.MetadataModule(
-                path=python.ModulePath(typ.typ.module, is_module=True),
-                body=[metadata_model],
+        return self._mk_metadata('RequestMetadata', fields, stack.push('meta', 'RequestMetadata'))
+
+    def _mk_metadata(self, name: str, fields: Sequence[python.Parameter], stack: Stack) -> python.AnnotatedType:
+        """Return the metadata class with the same fields, or place a new one at the stack."""
+        key = (name, frozenset(fields))
+        if (typ := self._metadata.get(key)) is None:
+            typ = self._metadata[key] = self.symbols.resolve_type_name(stack)
+            module_path = python.ModulePath(typ.typ.module, is_module=True)
+            self._pending_modules.append(
+                python.MetadataModule(path=module_path, body=[python.MetadataModel(name, fields)])
             )
-        )
+            self._costs.module(module_path, stack)
         return typ
 
     def process_global_security(self, value: Iterable[openapi.SecurityRequirement] | None, stack: Stack) -> None:
@@ -393,13 +607,11 @@ class OpenApi30Converter:
         schemes_root = Stack(('#', 'components', 'securitySchemes'))
         for scheme_name, scopes in value.items():
             scheme_stack = schemes_root.push(scheme_name)
-            self.process_security_scheme(
-                openapi.Reference[openapi.SecurityRequirement](ref=str(scheme_stack)), scheme_stack
-            )
+            self.process_security_scheme(openapi.Reference[openapi.SecurityScheme](ref=str(scheme_stack)), scheme_stack)
         return value
 
     # need separate method to resolve references before calling a single-dispatched method
-    @resolve_ref
+    @resolve_ref_memoized
     def process_security_scheme(self, value: openapi.SecurityScheme, stack: Stack) -> None:
         match value.type:
             case 'apiKey':
@@ -418,7 +630,7 @@ class OpenApi30Converter:
 
         self.target.security_schemes[flow_name] = python.ApiKeyAuth(
             name=auth_name,
-            python_name=names.maybe_mangle_name(auth_name),
+            python_name=self.symbols.mangle(auth_name),
             key=value.name,
             location=openapi.ParameterLocation(value.security_scheme_in),
             format=value.format,
@@ -449,7 +661,7 @@ class OpenApi30Converter:
         auth_name = stack[-3]
         self.target.security_schemes[f'oauth2_implicit_{auth_name}'] = python.ImplicitOAuth2Flow(
             name=auth_name,
-            python_name=names.maybe_mangle_name(auth_name),
+            python_name=self.symbols.mangle(auth_name),
             authorization_url=value.authorizationUrl,
             scopes=value.scopes,
         )
@@ -461,7 +673,7 @@ class OpenApi30Converter:
         auth_name = stack[-3]
         self.target.security_schemes[f'oauth2_password_{auth_name}'] = python.PasswordOAuth2Flow(
             name=auth_name,
-            python_name=names.maybe_mangle_name(auth_name),
+            python_name=self.symbols.mangle(auth_name),
             token_url=value.tokenUrl,
             scopes=value.scopes,
         )
@@ -473,7 +685,7 @@ class OpenApi30Converter:
         auth_name = stack[-3]
         self.target.security_schemes[f'oauth2_auth_code_{auth_name}'] = python.AuthorizationCodeOAuth2Flow(
             name=auth_name,
-            python_name=names.maybe_mangle_name(auth_name),
+            python_name=self.symbols.mangle(auth_name),
             authorization_url=value.authorizationUrl,
             token_url=value.tokenUrl,
             scopes=value.scopes,
@@ -486,7 +698,7 @@ class OpenApi30Converter:
         auth_name = stack[-3]
         self.target.security_schemes[f'oauth2_client_credentials_{auth_name}'] = python.ClientCredentialsOAuth2Flow(
             name=auth_name,
-            python_name=names.maybe_mangle_name(auth_name),
+            python_name=self.symbols.mangle(auth_name),
             token_url=value.tokenUrl,
             scopes=value.scopes,
         )
@@ -502,7 +714,7 @@ class OpenApi30Converter:
         try:
             self.target.security_schemes[flow_name] = HTTP_SCHEMES[value.scheme.lower()](
                 name=auth_name,
-                python_name=names.maybe_mangle_name(auth_name),
+                python_name=self.symbols.mangle(auth_name),
             )
         except KeyError:
             raise NotImplementedError(stack.push('scheme'), value.scheme) from None
@@ -545,8 +757,22 @@ def param_style(
         raise ValueError('Unsupported style', style_name, stack)
 
 
-def parameter_name(value: openapi.Parameter) -> str:
-    return value.lapidary_name or names.maybe_mangle_name(value.name) + '_' + value.param_in.name[0].lower()
+def _replace_method_names(
+    method: python.OperationFunction, names: Mapping[python.NameRef, python.NameRef]
+) -> python.OperationFunction:
+    return dc.replace(
+        method,
+        params=[dc.replace(param, typ=type_hint.replace_names(param.typ, names)) for param in method.params],
+        responses={
+            code: dc.replace(response, headers_type=type_hint.replace_names(response.headers_type, names))
+            for code, response in method.responses.items()
+        },
+        return_type=type_hint.replace_names(method.return_type, names),
+    )
+
+
+def parameter_name(value: openapi.Parameter, symbols: SymbolTable) -> str:
+    return value.lapidary_name or symbols.mangle(value.name) + '_' + value.param_in.name[0].lower()
 
 
 def map_process(
@@ -565,6 +791,55 @@ def map_process(
                 raise
 
 
+@dc.dataclass(frozen=True, kw_only=True)
+class PathResult:
+    """Result of converting a single path in a worker process."""
+
+    path: str
+    methods: Sequence[python.OperationFunction]
+    security_schemes: Mapping[str, python.Auth]
+    modules: Sequence[python.AbstractModule]
+
+
+_worker_args: (
+    tuple[python.ModulePath, openapi.OpenAPI, str | None, Any, Mapping[Stack, MetaModel | None], Aliases] | None
+) = None
+
+
+def _init_worker(*args: Any) -> None:
+    global _worker_args
+    _worker_args = args  # type: ignore[assignment]
+
+
+def _process_paths_chunk(paths: Sequence[str]) -> Sequence[PathResult]:
+    assert _worker_args is not None
+    return _convert_paths_chunk(*_worker_args, NO_COST_REPORT, paths)
+
+
+def _convert_paths_chunk(
+    root_package: python.ModulePath,
+    source: openapi.OpenAPI,
+    origin: str | None,
+    select_operation: Any,
+    schemas: Mapping[Stack, MetaModel | None],
+    aliases: Aliases,
+    costs: NoCostReport,
+    paths: Sequence[str],
+) -> Sequence[PathResult]:
+    converter = OpenApi30Converter(
+        root_package,
+        source,
+        origin,
+        select_operation=select_operation,
+        schemas=schemas,
+        costs=costs,
+        aliases=aliases,
+    )
+    # modules of global responses and headers are emitted by the main process
+    list(converter._process_globals())
+    return [converter._process_path_result(path) for path in paths]
+
+
 HTTP_SCHEMES = {
     'basic': python.HttpBasicAuth,
     'digest': python.HttpDigestAuth,
@@ -1,19 +1,36 @@
 from __future__ import annotations
 
+import graphlib
 import logging
+from collections.abc import Iterable, Iterator, Mapping, Sequence
 from types import NoneType
-from typing import Any
+from typing import Any, TypeAlias
 
+import pydantic
 from openapi_pydantic.v3.v3_1 import schema as schema31
 
+from ..costs import NO_COST_REPORT, NoCostReport
 from . import openapi, python
 from .metamodel import MetaModel
+from .openapi.base import pattern_fields
 from .refs import resolve_ref, resolve_refs_recursive
 from .stack import Stack
 
 logger = logging.getLogger(__name__)
 
 
+Aliases: TypeAlias = Mapping[int, tuple[openapi.Schema, Stack]]
+"""Schemas found at many locations and their canonical location, by the id of the schema."""
+NO_ALIASES: Aliases = {}
+
+
+def canonical_stack(aliases: Aliases, value: Any, stack: Stack) -> Stack:
+    """Return the canonical location of the schema if it's found at many locations, otherwise the stack."""
+    if (alias := aliases.get(id(value))) is not None and alias[0] is value:
+        return alias[1]
+    return stack
+
+
 class OpenApi30SchemaConverter:
     def __init__(
         self,
@@ -21,10 +38,21 @@ class OpenApi30SchemaConverter:
         stack: Stack,
         root_package: python.ModulePath,
         source: openapi.OpenAPI,
+        schemas: Mapping[Stack, MetaModel | None] | None = None,
+        costs: NoCostReport = NO_COST_REPORT,
+        aliases: Aliases = NO_ALIASES,
     ) -> None:
+        """
+        :param schemas: precompiled models of referenced schemas, used instead of converting them again
+        :param costs: report of conversion time and model size by document location
+        :param aliases: schemas found at many locations, converted only at their canonical location
+        """
         self.schema = schema
         self.stack = stack
         self.root_package = root_package
+        self.schemas = schemas if schemas is not None else {}
+        self.costs = costs
+        self.aliases = aliases
 
         self.model = MetaModel(
             stack=stack.push('schema', stack.top()),
@@ -37,7 +65,10 @@ class OpenApi30SchemaConverter:
         self,
     ) -> MetaModel | None:
         """Return MetaModel for schema or None if schema could never validate any values."""
+        with self.costs.schema(self.stack):
+            return self._process_schema()
 
+    def _process_schema(self) -> MetaModel | None:
         logger.debug('Processing schema %s', self.stack)
 
         if self.schema is False or (
@@ -55,9 +86,9 @@ class OpenApi30SchemaConverter:
             except AttributeError:
                 logger.debug('Unsupported property %s', field_stack)
 
-        if model_ := self.model.normalize_model():
-            return model_
-        return None
+        model_ = self.model.normalize_model()
+        self.costs.normalized(model_)
+        return model_ or None
 
     def process_schema_title(self, value: str, _: Stack) -> None:
         self.model.title = value
@@ -142,7 +173,13 @@ class OpenApi30SchemaConverter:
 
     @resolve_ref
     def _process_subschema(self, value: openapi.Schema, stack: Stack) -> MetaModel | None:
-        return OpenApi30SchemaConverter(value, stack, self.root_package, self.source).process_schema()
+        stack = canonical_stack(self.aliases, value, stack)
+        try:
+            return self.schemas[stack]
+        except KeyError:
+            return OpenApi30SchemaConverter(
+                value, stack, self.root_package, self.source, self.schemas, self.costs, self.aliases
+            ).process_schema()
 
     def process_schema_additionalProperties(self, value: openapi.Schema | bool, stack: Stack) -> None:
         self.model.additional_props = self._process_subschema(value, stack) or False
@@ -177,6 +214,208 @@ class OpenApi30SchemaConverter:
         pass
 
 
+SUBSCHEMA_FIELDS = ('items', 'properties', 'additionalProperties', 'allOf', 'oneOf', 'anyOf')
+"""Schema fields with sub-schemas that the converter processes."""
+IGNORED_FIELDS = frozenset(('callbacks', 'links', 'example', 'examples'))
+
+
+def iter_refs(value: Any, aliases: Aliases = NO_ALIASES) -> Iterator[str]:
+    """
+    Yield pointers of references in the document subtree, without following them.
+
+    Only sub-schemas and objects that the converter processes are searched. Nested schemas found at many locations
+    yield the pointer of their canonical location instead of their references.
+    """
+    if isinstance(value, openapi.Reference):
+        yield value.ref
+    elif isinstance(value, openapi.Schema):
+        for name in SUBSCHEMA_FIELDS:
+            yield from _iter_nested_refs(getattr(value, name), aliases)
+    elif isinstance(value, pydantic.BaseModel):
+        for name in type(value).model_fields:
+            if name in value.model_fields_set and name not in IGNORED_FIELDS:
+                yield from _iter_nested_refs(getattr(value, name), aliases)
+    elif isinstance(value, Mapping):
+        for item in value.values():
+            yield from _iter_nested_refs(item, aliases)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _iter_nested_refs(item, aliases)
+
+
+def _iter_nested_refs(value: Any, aliases: Aliases) -> Iterator[str]:
+    if (alias := aliases.get(id(value))) is not None and alias[0] is value:
+        yield str(alias[1])
+    else:
+        yield from iter_refs(value, aliases)
+
+
+def find_aliases(source: openapi.OpenAPI, roots: Iterable[tuple[Stack, Any]]) -> Aliases:
+    """
+    Find schemas reachable at many locations, like ones shared in YAML with anchors and aliases.
+
+    Roots are searched in order, depth-first, following references. The canonical location of a schema is the
+    shortest one, or the first found of the shortest ones, so a shared component schema keeps its own name.
+    """
+    locations: dict[int, tuple[openapi.Schema, Stack]] = {}
+    shared: set[int] = set()
+    refs: set[str] = set()
+    pending = list(reversed(list(roots)))
+    while pending:
+        stack, value = pending.pop()
+        children: Iterable[tuple[Stack, Any]]
+        if isinstance(value, openapi.Reference):
+            if value.ref in refs:
+                continue
+            refs.add(value.ref)
+            try:
+                target, pointer = resolve_refs_recursive(source, value)
+            except (LookupError, AttributeError, ValueError):
+                continue
+            children = [(Stack.from_str(pointer), target)]
+        elif isinstance(value, openapi.Schema):
+            if (known := locations.get(id(value))) is not None:
+                if known[1] is not stack:
+                    shared.add(id(value))
+                    if len(stack.path) < len(known[1].path):
+                        locations[id(value)] = (value, stack)
+                continue
+            locations[id(value)] = (value, stack)
+            children = [(stack.push(name), getattr(value, name)) for name in SUBSCHEMA_FIELDS]
+        elif isinstance(value, pydantic.BaseModel):
+            # pattern properties are properties of the object itself
+            flat = {name for name, _ in pattern_fields(type(value))}
+            children = [
+                (stack if name in flat else stack.push(field_info.alias or name), getattr(value, name))
+                for name, field_info in type(value).model_fields.items()
+                if name in value.model_fields_set and name not in IGNORED_FIELDS
+            ]
+        elif isinstance(value, Mapping):
+            children = [(stack.push(key), item) for key, item in value.items()]
+        elif isinstance(value, list):
+            children = [(stack.push(str(idx)), item) for idx, item in enumerate(value)]
+        else:
+            continue
+        pending.extend(reversed(children))
+    return {key: locations[key] for key in shared}
+
+
+def precompile_schemas(
+    source: openapi.OpenAPI,
+    root_package: python.ModulePath,
+    roots: Iterable[Any],
+    costs: NoCostReport = NO_COST_REPORT,
+    aliases: Aliases = NO_ALIASES,
+) -> Mapping[Stack, MetaModel | None]:
+    """
+    Convert every schema referenced from the roots, directly or through other referenced objects.
+
+    Schemas are converted in topological order of their references, so each is converted once and converting it only
+    looks up the models of schemas it references. Schemas found at many locations are converted like referenced
+    ones, at their canonical location. Returns models by the pointer of their schema. Schemas on circular references
+    aren't precompiled, they're converted on demand.
+    """
+    dependencies: dict[str, list[str]] = {}
+    schemas: dict[str, openapi.Schema] = {}
+    canonical = {str(stack): schema for schema, stack in aliases.values()}
+    pending = [ref for root in roots for ref in iter_refs(root, aliases)]
+    while pending:
+        pointer = pending.pop()
+        if pointer in dependencies:
+            continue
+        if (schema := canonical.get(pointer)) is not None:
+            schemas[pointer] = schema
+            dependencies[pointer] = refs = list(iter_refs(schema, aliases))
+            pending.extend(reversed(refs))
+            continue
+        try:
+            target, resolved = resolve_refs_recursive(source, openapi.Reference[Any].model_validate({'$ref': pointer}))
+        except (LookupError, AttributeError, ValueError):
+            # left for the converter to report, in case it's reached
+            logger.debug('Unresolvable reference %s', pointer)
+            dependencies[pointer] = []
+            continue
+        if resolved != pointer:
+            # reference to a reference
+            dependencies[pointer] = [resolved]
+            pending.append(resolved)
+            continue
+        if (alias := str(canonical_stack(aliases, target, Stack.from_str(pointer)))) != pointer:
+            # a schema also found at another location
+            dependencies[pointer] = [alias]
+            pending.append(alias)
+            continue
+        if isinstance(target, openapi.Schema):
+            schemas[pointer] = target
+        dependencies[pointer] = refs = list(iter_refs(target, aliases))
+        pending.extend(reversed(refs))
+
+    if cyclic := _cyclic_nodes(dependencies):
+        logger.warning('Circular references, schemas are converted on demand: %s', ', '.join(sorted(cyclic)))
+        # without nodes on cycles the graph is acyclic, schemas referencing them convert them on demand
+        dependencies = {
+            pointer: [ref for ref in refs if ref not in cyclic]
+            for pointer, refs in dependencies.items()
+            if pointer not in cyclic
+        }
+    order = list(graphlib.TopologicalSorter(dependencies).static_order())
+
+    models: dict[Stack, MetaModel | None] = {}
+    for pointer in order:
+        if pointer in schemas:
+            stack = Stack.from_str(pointer)
+            models[stack] = OpenApi30SchemaConverter(
+                schemas[pointer], stack, root_package, source, models, costs, aliases
+            ).process_schema()
+    return models
+
+
+def _cyclic_nodes(graph: Mapping[str, Sequence[str]]) -> set[str]:
+    """
+    Return nodes on cycles: those of strongly connected components of many nodes, and nodes referencing themselves.
+
+    Components are found with Tarjan's algorithm, iteratively, since reference chains may be long.
+    """
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    stack: list[str] = []
+    on_stack: set[str] = set()
+    cyclic: set[str] = set()
+
+    def visit(node: str) -> tuple[str, Iterator[str]]:
+        index[node] = low[node] = len(index)
+        stack.append(node)
+        on_stack.add(node)
+        return node, iter(graph.get(node, ()))
+
+    for root in graph:
+        if root in index:
+            continue
+        work = [visit(root)]
+        while work:
+            node, refs = work[-1]
+            for ref in refs:
+                if ref not in index:
+                    work.append(visit(ref))
+                    break
+                if ref in on_stack:
+                    low[node] = min(low[node], index[ref])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while (member := stack.pop()) != node:
+                        on_stack.discard(member)
+                        component.append(member)
+                    on_stack.discard(node)
+                    if component or node in graph.get(node, ()):
+                        cyclic.update(component, [node])
+    return cyclic
+
+
 JSON_TYPE_TO_PY_TYPE = {
     schema31.DataType.STRING: str,
     schema31.DataType.INTEGER: int,
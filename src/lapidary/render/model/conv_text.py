@@ -0,0 +1,627 @@
+"""
+Text emitter, an alternative to conv_cst.
+
+Writes the same code as conv_cst, but directly into strings, without building and serializing libcst trees.
+Expressions are built with line breaks indented relative to the statement they're part of; statements prepend the
+indentation of their block to every line break, same as libcst does with ParenthesizedWhitespace.
+"""
+
+import functools
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from typing import TypeAlias
+
+from . import openapi, python
+
+INDENT = '    '
+
+MODULE_HEADER = '# This file is automatically @generated by Lapidary and should not be changed by hand.\n\n'
+# no newline, statements that follow start with an empty line
+FUTURE_ANNOTATIONS = 'from __future__ import annotations'
+
+MODULE_EMPTY = MODULE_HEADER[:-1]
+MODULE_ROOT = MODULE_HEADER + 'from .client import ApiClient\n'
+
+COMMON_IMPORTS = '\nimport lapidary.runtime\nimport pydantic\nimport typing_extensions as typing\n'
+CLIENT_ALL = "\n__all__ = (\n    'ApiClient',\n)\n"
+MODEL_CONFIG_FORBID = "model_config = pydantic.ConfigDict(extra='forbid',)"
+
+Indenter: TypeAlias = Callable[[int], str]
+
+
+def render_module(module: python.AbstractModule) -> Iterable[str] | None:
+    """Return module code, in chunks, or None if module should not be written."""
+    match module:
+        case python.ClientModule():
+            return mk_client_module_code(module)
+        case _:
+            code = render_module_str(module)
+            return (code,) if code is not None else None
+
+
+def render_module_str(module: python.AbstractModule) -> str | None:
+    match module:
+        case python.SchemaModule():
+            return mk_schema_module(module)
+        case python.ClientModule():
+            return mk_client_module(module)
+        case python.SecurityModule():
+            if not module.body:
+                return None
+            return mk_security_module(module)
+        case python.MetadataModule():
+            return mk_metadata_module(module)
+        case python.EmptyModule():
+            return MODULE_EMPTY
+        case _:
+            raise TypeError(type(module))
+
+
+def indent_lines(text: str, indent: str) -> str:
+    """Indent line breaks within a statement to the level of its block."""
+    return text.replace('\n', '\n' + indent) if indent else text
+
+
+def mk_name(*parts: str) -> str:
+    return '.'.join(parts)
+
+
+def mk_raw_str_literal(value: str) -> str:
+    return f"r'{value}'"
+
+
+def str_literal(value: str) -> str:
+    return f"'{value}'"
+
+
+def mk_literal(value: str | int | float) -> str:
+    if isinstance(value, str):
+        return str_literal(value)
+    elif not isinstance(value, int | float):
+        raise TypeError(value, type(value))
+    if value < 0:
+        return f'-{-value}'
+    return str(value)
+
+
+@functools.cache
+def _line_break(depth: int) -> str:
+    return '\n' + INDENT * depth
+
+
+def mk_indent_factory(items_len: int, depth: int, break_threshold=2) -> Indenter:
+    if items_len >= break_threshold:
+
+        def mk_indentation(idx: int) -> str:
+            return _line_break(depth - (1 if idx == items_len - 1 else 0))
+
+        return mk_indentation
+    else:
+        return _no_indentation
+
+
+def _no_indentation(_: int) -> str:
+    return ''
+
+
+def _join_items(items: Sequence[str], indenter: Indenter) -> str:
+    return ''.join(f'{item},{indenter(idx)}' for idx, item in enumerate(items))
+
+
+def mk_call(fn_name: str, args: Sequence[str] = (), indent: int | Indenter = 1) -> str:
+    indenter = mk_indent_factory(len(args), indent) if isinstance(indent, int) else indent
+    return f'{fn_name}({indenter(-1)}{_join_items(args, indenter)})'
+
+
+def mk_parametrized_type(typ: str, args: Sequence[str], indent=1) -> str:
+    if not args:
+        return typ
+    indenter = mk_indent_factory(len(args), indent)
+    return f'{typ}[{indenter(-1)}{_join_items(args, indenter)}]'
+
+
+def mk_dict(items: Sequence[tuple[str, str]], indenter: Indenter) -> str:
+    return '{' + indenter(-1) + _join_items([f'{key}: {value}' for key, value in items], indenter) + '}'
+
+
+@functools.lru_cache(maxsize=4096)
+def mk_simple_type_name(typ: python.NameRef) -> str:
+    # python can't decide on NoneType module
+    # https://github.com/python/cpython/issues/128197
+    if typ.name == 'NoneType':
+        assert typ.module != 'builtins'
+        if typ.module == 'types':
+            return 'None'
+
+    if typ.module == 'builtins':
+        return typ.name
+    else:
+        return f'{typ.module}.{typ.name}'
+
+
+def mk_annotated_type(
+    typ: python.AnnotatedType,
+    alias: str | None = None,
+    metadata: Sequence[str] = (),
+    indent: int = 1,
+) -> str:
+    if not metadata:
+        return _mk_annotated_type_cached(typ, alias, indent)
+    return _mk_annotated_type(typ, alias, metadata, indent)
+
+
+@functools.lru_cache(maxsize=4096)
+def _mk_annotated_type_cached(typ: python.AnnotatedType, alias: str | None, indent: int) -> str:
+    return _mk_annotated_type(typ, alias, (), indent)
+
+
+def _mk_annotated_type(typ: python.AnnotatedType, alias: str | None, metadata: Sequence[str], indent: int) -> str:
+    result = mk_simple_type_name(typ.typ)
+    if typ.generic_args:
+        result = mk_parametrized_type(
+            result, [mk_annotated_type(arg, indent=indent + 1) for arg in typ.generic_args], indent + 1
+        )
+
+    all_metadata = [
+        *metadata,
+        *(mk_call(mk_simple_type_name(name), [mk_literal(value)]) for name, value in typ.num_constraints()),
+    ]
+
+    field_args = []
+    if typ.pattern:
+        field_args.append(f'pattern={mk_raw_str_literal(typ.pattern)}')
+    if alias:
+        field_args.append(f'alias={str_literal(alias)}')
+    if field_args:
+        all_metadata.append(mk_call('pydantic.Field', field_args))
+
+    if not all_metadata:
+        return result
+
+    return mk_parametrized_type('typing.Annotated', [result, *all_metadata], indent + 1)
+
+
+def mk_class_def(class_name: str, body: Sequence[str], parent: str | None = None) -> str:
+    """
+    :param body: statements, indented to the class body
+    """
+    bases = f'({parent})' if parent else ''
+    return f'\n\nclass {class_name}{bases}:\n' + (''.join(body) or f'{INDENT}pass\n')
+
+
+def mk_field_stmt(name: str, annotation: str, required: bool, indent: str = INDENT) -> str:
+    value = '' if required else ' = None'
+    return f'{indent}\n{indent}{name}: {indent_lines(annotation, indent)}{value}\n'
+
+
+def mk_schema_class_body(model: python.SchemaClass) -> Iterable[str]:
+    if not model.fields and model.allow_extra:
+        yield f'{INDENT}pass\n'
+        return
+
+    for field in model.fields:
+        yield mk_field_stmt(field.name, mk_annotated_type(field.typ, field.alias), field.required)
+
+    if not model.allow_extra:
+        yield f'{INDENT}\n{INDENT}{MODEL_CONFIG_FORBID}\n'
+
+
+def mk_schema_module(model: python.SchemaModule) -> str:
+    return ''.join(
+        [
+            MODULE_HEADER,
+            FUTURE_ANNOTATIONS,
+            mk_imports(model),
+            *(
+                mk_class_def(
+                    class_model.name,
+                    list(mk_schema_class_body(class_model)),
+                    'lapidary.runtime.ModelBase',
+                )
+                for class_model in model.body
+            ),
+        ]
+    )
+
+
+def mk_function(
+    *,
+    decorators: Iterable[str] = (),
+    name: str,
+    params: Iterable[str] = (),
+    params_kwonly: Sequence[str] = (),
+    param_kwargs: str | None = None,
+    body: Iterable[str] = (),
+    returns: str | None = None,
+    method: bool = False,
+    async_: bool = False,
+    indent=1,
+    block_indent: str = INDENT,
+) -> str:
+    """
+    :param body: statements, indented to the function body
+    :param block_indent: indentation of the block containing the function
+    """
+    param_list = list(params)
+    if method:
+        param_list.insert(0, 'self: typing.Self')
+
+    kwonly_start_idx = len(param_list)
+    num_params = kwonly_start_idx + len(params_kwonly) + (1 if param_kwargs else 0)
+    indenter = mk_indent_factory(num_params, indent, 1)
+
+    params_text = ''.join(f'{param},{indenter(idx)}' for idx, param in enumerate(param_list))
+    if params_kwonly:
+        params_text += '*, ' + ''.join(
+            f'{param},{indenter(idx + kwonly_start_idx)}' for idx, param in enumerate(params_kwonly)
+        )
+    if param_kwargs:
+        params_text += f'**{param_kwargs},{indenter(num_params - 1)}'
+
+    signature = ''.join(
+        [
+            'async ' if async_ else '',
+            f'def {name}({indenter(-1)}{params_text})',
+            f' -> {returns}' if returns else '',
+            ':',
+        ]
+    )
+
+    return ''.join(
+        [
+            f'{block_indent}\n',
+            *(f'{block_indent}@{indent_lines(decorator, block_indent)}\n' for decorator in decorators),
+            block_indent,
+            indent_lines(signature, block_indent),
+            '\n',
+            ''.join(body) or f'{block_indent}{INDENT}pass\n',
+        ]
+    )
+
+
+def mk_in_annotation(model: python.Parameter, indent: int) -> str:
+    in_args = []
+    if model.alias:
+        in_args.append(str_literal(model.alias))
+    if model.style:
+        in_args.append(f'style=lapidary.runtime.{model.style.value}')
+    in_ = f'lapidary.runtime.{model.in_}'
+    return mk_call(in_, in_args, indent) if in_args else in_
+
+
+def mk_param(name: str, annotation: str | None = None, default: str | None = None) -> str:
+    text = name
+    if annotation:
+        text += f': {annotation}'
+    if default:
+        text += f' = {default}'
+    return text
+
+
+def mk_operation_params(operation: python.OperationFunction) -> Iterator[str]:
+    for param in operation.params:
+        yield mk_param(
+            param.name,
+            mk_annotated_type(param.typ, metadata=[mk_in_annotation(param, 1)]),
+            'None' if not param.required else None,
+        )
+
+
+def mk_client_init_fn(model: python.ClientInit) -> str:
+    args = ['base_url=base_url', '**kwargs']
+    if model.security:
+        args.insert(0, f'security={mk_security_requirements_expr(model.security, 2)}')
+
+    body_indent = INDENT * 2
+    return mk_function(
+        name='__init__',
+        params=['self'],
+        params_kwonly=[mk_param('base_url', 'str', str_literal(model.base_url) if model.base_url else None)],
+        param_kwargs='kwargs',
+        returns='None',
+        body=[f'{body_indent}{indent_lines(mk_call("super().__init__", args), body_indent)}\n'],
+    )
+
+
+def mk_security_requirements_expr(reqs: python.SecurityRequirements, indent=1) -> str:
+    indenter = mk_indent_factory(len(reqs), indent)
+    return f'({indenter(-1)}' + _join_items([mk_security_requirement(item) for item in reqs], indenter) + ')'
+
+
+def mk_security_requirement(item: Mapping[str, Iterable[str]]) -> str:
+    return (
+        '{' + ', '.join(f'{str_literal(name)}: {mk_tuple(map(str_literal, args))}' for name, args in item.items()) + '}'
+    )
+
+
+def mk_tuple(items: Iterable[str]) -> str:
+    items = list(items)
+    if len(items) == 1:
+        return f'({items[0]},)'
+    return f'({", ".join(items)})'
+
+
+def mk_body_annotation(mime_map: python.MimeMap, indent: int) -> str:
+    indenter = mk_indent_factory(len(mime_map), indent, break_threshold=1)
+    return mk_call(
+        'lapidary.runtime.Body',
+        [
+            mk_dict(
+                [(str_literal(mime), mk_annotated_type(typ, indent=indent)) for mime, typ in mime_map.items()], indenter
+            )
+        ],
+        6,
+    )
+
+
+def mk_response(response: python.Response) -> str:
+    args = [mk_body_annotation(response.content, 5)]
+    if response.headers_type != python.NoneMetaType:
+        args.append(mk_annotated_type(response.headers_type))
+    return mk_call('lapidary.runtime.Response', args, mk_indent_factory(len(args), 4, 1))
+
+
+def mk_operation_method(operation: python.OperationFunction) -> str:
+    decorator_args = [str_literal(operation.path)]
+    if operation.security is not None:
+        decorator_args.append(f'security={mk_security_requirements_expr(operation.security, 2)}')
+    decorator = mk_call(f'lapidary.runtime.{operation.method}', decorator_args)
+
+    indenter = mk_indent_factory(len(operation.responses), 3, 1)
+    responses = mk_call(
+        'lapidary.runtime.Responses',
+        [
+            mk_dict(
+                [
+                    (str_literal(status_code), mk_response(response))
+                    for status_code, response in operation.responses.items()
+                ],
+                indenter,
+            )
+        ],
+    )
+
+    params = []
+    if operation.request_body:
+        params.append(
+            mk_param(
+                'body',
+                mk_annotated_type(
+                    operation.request_body_type, metadata=[mk_body_annotation(operation.request_body, 3)]
+                ),
+            )
+        )
+
+    return mk_function(
+        name=operation.name,
+        params=params,
+        params_kwonly=list(mk_operation_params(operation)),
+        returns=mk_annotated_type(operation.return_type, metadata=[responses]),
+        decorators=[decorator],
+        method=True,
+        async_=True,
+    )
+
+
+def mk_client_module(module: python.ClientModule) -> str:
+    return ''.join(mk_client_module_code(module))
+
+
+def mk_client_module_code(module: python.ClientModule) -> Iterator[str]:
+    """Serialize the client module method by method."""
+    yield ''.join(
+        [
+            MODULE_HEADER,
+            FUTURE_ANNOTATIONS,
+            '\n',
+            CLIENT_ALL,
+            mk_imports(module),
+            mk_class_def('ApiClient', [mk_client_init_fn(module.body.init_method)], 'lapidary.runtime.ClientBase'),
+        ]
+    )
+    for operation in module.body.methods:
+        yield mk_operation_method(operation)
+
+
+def mk_scope_slice(scopes: Iterable[str]) -> str:
+    return mk_parametrized_type('typing.Literal', [str_literal(scope) for scope in scopes], 2)
+
+
+def mk_security_fn(auth: python.Auth) -> str:
+    fn_name = f'{auth.type}_{auth.python_name}'
+
+    match auth:
+        case python.ApiKeyAuth():
+            param_name = auth.location.value + (
+                '_parameter_name' if auth.location == openapi.ParameterLocation.QUERY else '_name'
+            )
+            return TEMPLATE_AUTH_API_KEY.format(
+                fn_name=fn_name,
+                auth_name=str_literal(auth.name),
+                auth_class=f'lapidary.runtime.auth.{auth.location.value.capitalize()}ApiKey',
+                param_name=param_name,
+                auth_key=str_literal(auth.key),
+            )
+        case python.HttpBasicAuth():
+            return TEMPLATE_AUTH_HTTP_BASIC.format(fn_name=fn_name, auth_name=str_literal(auth.name))
+        case python.HttpDigestAuth():
+            return TEMPLATE_AUTH_HTTP_DIGEST.format(fn_name=fn_name, auth_name=str_literal(auth.name))
+        case python.AuthorizationCodeOAuth2Flow():
+            return TEMPLATE_AUTH_OAUTH2_AUTH_CODE.format(
+                fn_name=fn_name,
+                scopes=mk_scope_slice(auth.scopes.keys()),
+                auth_name=str_literal(auth.name),
+                authorization_url=str_literal(auth.authorization_url),
+                token_url=str_literal(auth.token_url),
+            )
+        case python.ClientCredentialsOAuth2Flow():
+            return TEMPLATE_AUTH_OAUTH2_CLIENT_CREDS.format(
+                fn_name=fn_name,
+                scopes=mk_scope_slice(auth.scopes.keys()),
+                auth_name=str_literal(auth.name),
+                token_url=str_literal(auth.token_url),
+            )
+        case python.ImplicitOAuth2Flow():
+            return TEMPLATE_AUTH_OAUTH2_IMPLICIT.format(
+                fn_name=fn_name,
+                scopes=mk_scope_slice(auth.scopes.keys()),
+                auth_name=str_literal(auth.name),
+                authorization_url=str_literal(auth.authorization_url),
+            )
+        case python.PasswordOAuth2Flow():
+            return TEMPLATE_AUTH_OAUTH2_PASSWD.format(
+                fn_name=fn_name,
+                scopes=mk_scope_slice(auth.scopes.keys()),
+                auth_name=str_literal(auth.name),
+                token_url=str_literal(auth.token_url),
+            )
+        case _:
+            raise TypeError(auth, type(auth))
+
+
+def mk_security_module(module: python.SecurityModule) -> str:
+    return ''.join(
+        [
+            MODULE_HEADER,
+            FUTURE_ANNOTATIONS,
+            mk_imports(module),
+            'import lapidary.runtime.auth\n',
+            *(f'\n\n{mk_security_fn(auth)}' for auth in module.body.values()),
+        ]
+    )
+
+
+def mk_metadata_class(model: python.MetadataModel) -> str:
+    return mk_class_def(
+        model.name,
+        [
+            mk_field_stmt(
+                field.name,
+                mk_annotated_type(field.typ, metadata=[mk_in_annotation(field, 1)]),
+                field.required,
+            )
+            for field in model.fields
+        ],
+        'pydantic.BaseModel',
+    )
+
+
+def mk_imports(module: python.AbstractModule) -> str:
+    return COMMON_IMPORTS + ''.join(
+        f'import {mod_name}\n'
+        for mod_name in module.imports
+        if mod_name not in ('pydantic', 'typing', 'lapidary.runtime')
+    )
+
+
+def mk_metadata_module(module: python.MetadataModule) -> str:
+    return ''.join(
+        [
+            MODULE_HEADER,
+            FUTURE_ANNOTATIONS,
+            mk_imports(module),
+            *(mk_metadata_class(class_model) for class_model in module.body),
+        ]
+    )
+
+
+# Same as the templates in conv_cst, in str.format syntax. Each ends with a newline.
+
+TEMPLATE_AUTH_OAUTH2_PASSWD = """def {fn_name}(
+    username: str,
+    password: str,
+    scope: typing.Union[
+        collections.abc.Iterable[{scopes}],
+        None
+    ] = None,
+    **kwargs,
+) -> lapidary.runtime.NamedAuth:
+    if scope is not None:
+        kwargs['scope'] = ' '.join(scope)
+
+    return {auth_name}, httpx_auth.OAuth2ResourceOwnerPasswordCredentials(
+        token_url={token_url},
+        username=username,
+        password=password,
+        **kwargs,
+    )
+"""
+
+TEMPLATE_AUTH_OAUTH2_IMPLICIT = """def {fn_name}(
+    scope: typing.Union[
+        collections.abc.Iterable[{scopes}],
+        None
+    ] = None,
+    **kwargs,
+) -> lapidary.runtime.NamedAuth:
+    if scope is not None:
+        kwargs['scope'] = ' '.join(scope)
+
+    return {auth_name}, httpx_auth.OAuth2Implicit(
+        authorization_url={authorization_url},
+        **kwargs,
+    )
+"""
+
+TEMPLATE_AUTH_OAUTH2_CLIENT_CREDS = """def {fn_name}(
+    client_id: str,
+    client_secret: str,
+    scope: typing.Union[
+        collections.abc.Iterable[{scopes}],
+        None
+    ] = None,
+    **kwargs,
+) -> lapidary.runtime.NamedAuth:
+    if scope is not None:
+        kwargs['scope'] = ' '.join(scope)
+
+    return {auth_name}, httpx_auth.OAuth2ClientCredentials(
+        token_url={token_url},
+        client_id=client_id,
+        client_secret=client_secret,
+        **kwargs,
+    )
+"""
+
+TEMPLATE_AUTH_OAUTH2_AUTH_CODE = """def {fn_name}(
+    scope: typing.Union[
+        collections.abc.Iterable[{scopes}],
+        None
+    ] = None,
+    **kwargs,
+) -> lapidary.runtime.NamedAuth:
+    if scope is not None:
+        kwargs['scope'] = ' '.join(scope)
+
+    return {auth_name}, httpx_auth.OAuth2AuthorizationCode(
+        authorization_url={authorization_url},
+        token_url={token_url},
+        **kwargs,
+    )
+"""
+
+TEMPLATE_AUTH_HTTP_DIGEST = """def {fn_name}(
+    user_name: str,
+    password: str
+) -> lapidary.runtime.NamedAuth:
+    return {auth_name}, httpx.DigestAuth(
+        username=user_name,
+        password=password,
+    )
+"""
+
+TEMPLATE_AUTH_HTTP_BASIC = """def {fn_name}(
+    user_name: str,
+    password: str
+) -> lapidary.runtime.NamedAuth:
+    return {auth_name}, httpx.BasicAuth(
+        username=user_name,
+        password=password,
+    )
+"""
+
+TEMPLATE_AUTH_API_KEY = """def {fn_name}(api_key: str) -> lapidary.runtime.NamedAuth:
+    return {auth_name}, {auth_class}(
+        api_key=api_key,
+        {param_name}={auth_key},
+    )
+"""
@@ -9,9 +9,10 @@ from typing import Any, Self
 from openapi_pydantic.v3.v3_1 import schema as schema31
 from pydantic.alias_generators import to_pascal
 
-from .. import json_pointer, names, runtime
+from .. import runtime
 from . import python
 from .stack import Stack
+from .symbols import SymbolTable, symbol_table
 
 
 def not_none_or[T](a: T | None, b: T | None, fn: Callable[[T, T], T]) -> T | None:
@@ -273,28 +274,28 @@ class MetaModel:
             and all(not sub.properties and sub.additional_props is True for sub in (self.one_of or ()))
         )
 
-    def _as_type(self, package: str) -> python.SchemaClass | None:
+    def _as_type(self, symbols: SymbolTable) -> python.SchemaClass | None:
         """convert current schema model, excluding any sub-schemas"""
         # name = value.lapidary_name or stack.top()
         name = self.stack.top()  # TODO
         fields = [
             _as_class_field(
-                model.as_annotation(package, name in self.props_required), name, name in self.props_required
+                model.as_annotation(symbols, name in self.props_required), name, name in self.props_required, symbols
             )
             for name, model in self.properties.items()
         ]
 
         return python.SchemaClass(
-            name=names.maybe_mangle_name(name),
+            name=symbols.mangle(name),
             base_type=runtime.ModelBase,
             allow_extra=self.additional_props is not False,
             fields=fields,
             docstr=self.description or None,
         )
 
-    def as_type(self, root_package: str) -> python.SchemaClass | None:
+    def as_type(self, root_package: str | SymbolTable) -> python.SchemaClass | None:
         if not self.any_of and self.type_ and schema31.DataType.OBJECT in self.type_ and not self._is_any_obj():
-            return self._as_type(root_package)  # type: ignore[misc]
+            return self._as_type(symbol_table(root_package))  # type: ignore[misc]
         return None
 
     def dependencies(self) -> Iterable[MetaModel]:
@@ -310,7 +311,7 @@ class MetaModel:
         #     yield self.additional_props
 
     def as_annotation(
-        self, root_package: str, required: bool = True, include_object: bool = True
+        self, root_package: str | SymbolTable, required: bool = True, include_object: bool = True
     ) -> python.AnnotatedType:
         """
         Create type hint for the type represented by the source schema.
@@ -318,7 +319,7 @@ class MetaModel:
         In case where object schema with oneOf or anyOf is used, a type hint for the parent schema is created, and the
         items are rendered in as_type() as a synthetic class field.
 
-        :param root_package: root python package for object models
+        :param root_package: root python package for object models, or the symbol table of the conversion
         :param required: if false, make the type a Union with None
         :param include_object: if true and the model type includes schema, include the class FQN in the resulting type hint
         """
@@ -326,8 +327,10 @@ class MetaModel:
         if not self._has_annotations():
             return runtime.JsonValue
 
+        symbols = symbol_table(root_package)
+
         if self.any_of:
-            return python.union_of(*[t.as_annotation(root_package, required) for t in self.any_of])
+            return python.union_of(*[t.as_annotation(symbols, required) for t in self.any_of])
 
         else:
             types: set[python.AnnotatedType] = set()
@@ -350,10 +353,10 @@ class MetaModel:
                     case schema31.DataType.NULL:
                         typ = python.NoneMetaType
                     case schema31.DataType.OBJECT:
-                        typ = self._as_object_anno(root_package)
+                        typ = self._as_object_anno(symbols)
                     case schema31.DataType.ARRAY:
                         typ = python.list_of(
-                            self.items.as_annotation(root_package) if self.items else runtime.JsonValue,
+                            self.items.as_annotation(symbols) if self.items else runtime.JsonValue,
                         )
                     case _:
                         raise TypeError(schema_type)
@@ -383,14 +386,14 @@ class MetaModel:
             **constraints,  # type: ignore[arg-type]
         )
 
-    def _as_object_anno(self, root_package: str) -> python.AnnotatedType:
+    def _as_object_anno(self, symbols: SymbolTable) -> python.AnnotatedType:
         if not self.properties and not (
             any(sub.properties for sub in self.any_of or () if schema31.DataType.OBJECT in (sub.type_ or ()))
             and any(sub.properties for sub in self.one_of or () if schema31.DataType.OBJECT in (sub.type_ or ()))
         ):
             return runtime.JsonObject
         else:
-            return resolve_type_name(root_package, self.stack)
+            return symbols.resolve_type_name(self.stack)
 
     def _has_annotations(self, excluding: Container[str] = ()) -> bool:
         return (
@@ -425,8 +428,10 @@ class MetaModel:
         return dc.replace(self, description=None, title=None, stack=Stack())
 
 
-def _as_class_field(anno: python.AnnotatedType, name: str, required: bool) -> python.AnnotatedVariable:
-    python_name = names.maybe_mangle_name(name)
+def _as_class_field(
+    anno: python.AnnotatedType, name: str, required: bool, symbols: SymbolTable
+) -> python.AnnotatedVariable:
+    python_name = symbols.mangle(name)
     return python.AnnotatedVariable(
         name=python_name,
         typ=anno,
@@ -435,13 +440,8 @@ def _as_class_field(anno: python.AnnotatedType, name: str, required: bool) -> py
     )
 
 
-def resolve_type_name(root_package: str, pointer: Stack) -> python.AnnotatedType:
-    # FIXME all fields should be saved as json ref; all schemas saved in a map with json ref as a key
-
-    parts = [names.maybe_mangle_name(json_pointer.decode_json_pointer(part)) for part in pointer.path[1:]]
-    module_name = '.'.join([root_package, *(part for part in parts[:-1])])
-    top = parts[-1]
-    return python.AnnotatedType(python.NameRef(module_name, top))
+def resolve_type_name(root_package: str | SymbolTable, pointer: Stack) -> python.AnnotatedType:
+    return symbol_table(root_package).resolve_type_name(pointer)
 
 
 FORMAT_ENCODERS = {
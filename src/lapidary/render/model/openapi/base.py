@@ -1,11 +1,15 @@
+import functools
 import re
 import typing
-from collections.abc import Mapping
+from collections.abc import Mapping, Sequence
 
 import pydantic
 
 from ...pydantic_utils import find_annotation_optional
 
+SHARED = 'shared'
+"""Validation context key of a dict for validate_shared."""
+
 
 class BaseModel(pydantic.BaseModel):
     model_config = pydantic.ConfigDict(
@@ -39,24 +43,55 @@ class ModelWithPatternProperties(BaseModel):
     @pydantic.model_validator(mode='before')
     @classmethod
     def validate(cls, value: typing.Any, info: pydantic.ValidationInfo):
-        for field_name, field_info in cls.model_fields.items():
-            pattern_anno = find_annotation_optional(field_info.metadata, PropertyPattern)
-            if not pattern_anno:
-                continue
-
-            pattern = re.compile(pattern_anno.pattern)
-
-            pattern_props = {}
-            for key, item in value.items():
-                if not isinstance(key, str):
-                    raise ValueError(key)
-                if pattern.search(key):
-                    pattern_props[key] = item
-            for key in pattern_props:
-                del value[key]
-            value[field_name] = pattern_props
+        return split_pattern_properties(cls, value)
+
 
+def split_pattern_properties(cls: type[pydantic.BaseModel], value: typing.Any) -> typing.Any:
+    """Move properties matching patterns of the model fields to those fields. Doesn't modify the value."""
+    if not isinstance(value, Mapping):
+        # let pydantic report it
         return value
+    value = dict(value)
+    for field_name, pattern in pattern_fields(cls):
+        pattern_props = {}
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise ValueError(key)
+            if pattern.search(key):
+                pattern_props[key] = item
+        for key in pattern_props:
+            del value[key]
+        value[field_name] = pattern_props
+    return value
+
+
+@functools.cache
+def pattern_fields(cls: type[pydantic.BaseModel]) -> Sequence[tuple[str, re.Pattern]]:
+    """Return names of fields that collect pattern properties, with their compiled patterns."""
+    fields = []
+    for field_name, field_info in cls.model_fields.items():
+        if pattern_anno := find_annotation_optional(field_info.metadata, PropertyPattern):
+            fields.append((field_name, re.compile(pattern_anno.pattern)))
+    return fields
+
+
+def validate_shared(
+    value: typing.Any, handler: pydantic.ModelWrapValidatorHandler, info: pydantic.ValidationInfo
+) -> typing.Any:
+    """
+    Validate an object found at many places in the document, like a YAML alias, to a single model.
+
+    Models are kept in the dict under SHARED key of the validation context, by the id of their source.
+    """
+    shared = info.context.get(SHARED) if info.context else None
+    if shared is None or not isinstance(value, Mapping):
+        return handler(value)
+    if (known := shared.get(id(value))) is not None and known[0] is value:
+        return known[1]
+    model = handler(value)
+    # keep the source, so its id isn't reused
+    shared[id(value)] = (value, model)
+    return model
 
 
 def validate_example_xor_examples(values: Mapping[str, typing.Any]) -> None:
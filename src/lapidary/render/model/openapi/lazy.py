@@ -0,0 +1,146 @@
+"""
+Lazy document model, validating path items and components only when they're first accessed.
+
+Only objects reachable from the rendered operations are validated, so invalid parts of the document that aren't
+rendered aren't reported.
+"""
+
+import functools
+import types
+import typing
+from collections.abc import Callable, Iterator, Mapping
+from typing import Any
+
+import pydantic
+
+from ...json_pointer import encode_json_pointer
+from .base import SHARED, split_pattern_properties
+from .model import Components, OpenAPI, Paths
+
+SelectOperation: typing.TypeAlias = Callable[[str, str | None, typing.Iterable[str]], bool]
+
+METHODS = frozenset(('get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace'))
+
+
+class LazyMapping[V](Mapping[str, V]):
+    """
+    Mapping of raw values of a dict field of the model class, validated on first access and memoized.
+
+    Objects found at many places in the document are validated once, if the mappings share the shared dict.
+    """
+
+    def __init__(
+        self,
+        cls: type[pydantic.BaseModel],
+        field_name: str,
+        raw: Mapping[str, Any],
+        pointer: str,
+        shared: dict[Any, Any],
+    ):
+        self._cls = cls
+        self._field_name = field_name
+        self._raw = raw
+        self._pointer = pointer
+        self._shared = shared
+        self._values: dict[str, V] = {}
+
+    def __getitem__(self, key: str) -> V:
+        try:
+            return self._values[key]
+        except KeyError:
+            pass
+        raw = self._raw[key]
+        validate = _item_validator(self._cls, self._field_name)
+        try:
+            value = validate(raw, context={SHARED: self._shared})
+        except pydantic.ValidationError as e:
+            e.add_note(f'in {self._pointer}/{encode_json_pointer(key)}')
+            raise
+        # another thread may have been faster
+        return self._values.setdefault(key, value)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._raw)
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+
+def parse_lazy(oa_doc: Mapping[str, Any], select_operation: SelectOperation | None = None) -> OpenAPI:
+    """
+    Build the document model with lazy path items and components.
+
+    :param select_operation: leave out operations for which it returns False, so they're never validated
+    """
+    shared: dict[Any, Any] = {}
+
+    def validate(doc: Mapping[str, Any]) -> OpenAPI:
+        return OpenAPI.model_validate(doc, context={SHARED: shared})
+
+    raw_paths = oa_doc.get('paths')
+    raw_components = oa_doc.get('components')
+    if not isinstance(raw_paths, Mapping) or not isinstance(raw_components, Mapping | None):
+        # let validation report it
+        return validate(oa_doc)
+
+    # path items and component dicts are left out of the validated shell, then replaced with lazy mappings
+    raw_paths = split_pattern_properties(Paths, raw_paths)
+    path_items = raw_paths.pop('paths')
+    if select_operation is not None:
+        path_items = {path: _select_operations(path, item, select_operation) for path, item in path_items.items()}
+    doc = {**oa_doc, 'paths': raw_paths}
+    lazy_components = {}
+    if raw_components is not None:
+        lazy_components = {name: raw_components[name] for name in _dict_fields(Components) if raw_components.get(name)}
+        doc['components'] = {key: value for key, value in raw_components.items() if key not in lazy_components}
+
+    model = validate(doc)
+
+    update: dict[str, Any] = {
+        'paths': model.paths.model_copy(
+            update={'paths': LazyMapping(Paths, 'paths', path_items, '#/paths', shared)},
+        ),
+    }
+    if model.components is not None:
+        update['components'] = model.components.model_copy(
+            update={
+                name: LazyMapping(Components, name, raw, f'#/components/{name}', shared)
+                for name, raw in lazy_components.items()
+            }
+        )
+    return model.model_copy(update=update)
+
+
+def _select_operations(path: str, item: Any, select_operation: SelectOperation) -> Any:
+    if not isinstance(item, Mapping):
+        return item
+    return {
+        key: value
+        for key, value in item.items()
+        if key not in METHODS
+        or not isinstance(value, Mapping)
+        or select_operation(path, value.get('operationId'), value.get('tags') or ())
+    }
+
+
+def _dict_fields(cls: type[pydantic.BaseModel]) -> typing.Iterable[str]:
+    return [name for name, field_info in cls.model_fields.items() if _item_type(field_info.annotation) is not None]
+
+
+def _item_type(anno: Any) -> Any:
+    """Return the value type of a dict annotation, possibly optional, or None."""
+    origin = typing.get_origin(anno)
+    if origin is typing.Annotated:
+        return _item_type(typing.get_args(anno)[0])
+    if origin is dict:
+        return typing.get_args(anno)[1]
+    if origin is typing.Union or origin is types.UnionType:
+        members = [member for member in typing.get_args(anno) if member is not types.NoneType]
+        if len(members) == 1:
+            return _item_type(members[0])
+    return None
+
+
+@functools.cache
+def _item_validator(cls: type[pydantic.BaseModel], field_name: str) -> Callable[..., Any]:
+    return pydantic.TypeAdapter(_item_type(cls.model_fields[field_name].annotation)).validate_python
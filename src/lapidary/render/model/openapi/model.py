@@ -28,6 +28,7 @@ from .base import (
     ModelWithPatternProperties,
     PropertyPattern,
     validate_example_xor_examples,
+    validate_shared,
 )
 
 
@@ -63,6 +64,13 @@ class Schema(SchemaBase):
 
     lapidary_name: typing.Annotated[str | None, pydantic.Field(alias='x-lapidary-type-name')] = None
 
+    @pydantic.model_validator(mode='wrap')
+    @classmethod
+    def _validate_shared(
+        cls, value: typing.Any, handler: pydantic.ModelWrapValidatorHandler, info: pydantic.ValidationInfo
+    ) -> typing.Any:
+        return validate_shared(value, handler, info)
+
 
 class ParameterBase(ParameterBaseBase):
     content: typing.Annotated[dict[str, MediaType] | None, pydantic.Field(max_length=1, min_length=1)] = None
@@ -1,7 +1,7 @@
 # ignore: F401
 
 import dataclasses as dc
-from collections.abc import Iterable, MutableMapping, MutableSequence, MutableSet, Sequence
+from collections.abc import Iterable, Mapping, MutableMapping, MutableSequence, MutableSet, Sequence
 from functools import cached_property
 from typing import Self
 
@@ -53,39 +53,54 @@ class ClientModel:
 
     def packages(self: Self) -> Iterable[ModulePath]:
         # Used to create __init__.py files in otherwise empty packages
+        return packages(self.package, (mod.path for mod in self.model_modules))
 
-        known_packages: MutableSet[ModulePath] = {ModulePath(self.package)}
-
-        for mod in self.model_modules:
-            path: ModulePath | None = mod.path
-            while path := path.parent():  # type: ignore[union-attr]
-                if path in known_packages:
-                    break
-                yield path
-                known_packages.add(path)
+    @cached_property
+    def module_index(self) -> Mapping[ModulePath, AbstractModule]:
+        """All modules, including empty packages, by path. Built once the model is complete."""
+        return {module.path: module for module in self._modules()}
 
     @cached_property
     def modules(self) -> Sequence[AbstractModule]:
-        return list(self._modules())
+        return list(self.module_index.values())
 
     def _modules(self) -> Iterable[AbstractModule]:
-        known_modules = set()
+        paths = [mod.path for mod in self.model_modules]
+        assert len(set(paths)) == len(paths), paths
+        yield from self.model_modules
+        yield from self.closing_modules(paths)
+
+    def closing_modules(self, model_module_paths: Sequence[ModulePath]) -> Iterable[AbstractModule]:
+        """
+        Yield modules that can only be created once all model modules are known:
+        security schemes, the client and __init__ modules of otherwise empty packages.
+        """
+        known_modules: MutableSet[ModulePath] = set(model_module_paths)
         if self.security_schemes:
             sm = SecurityModule(
                 path=ModulePath((self.package, 'components', 'securitySchemes'), True),
                 body=self.security_schemes,
             )
+            assert sm.path not in known_modules, sm.path
             known_modules.add(sm.path)
             yield sm
 
-        known_modules.add(self.client.path)
+        assert self.client.path not in known_modules, self.client.path
         yield self.client
 
-        for mod in self.model_modules:
-            assert mod not in known_modules, mod.path
-            known_modules.add(mod.path)
-            yield mod
-
-        for package in self.packages():
+        for package in packages(self.package, model_module_paths):
             if package not in known_modules:
                 yield EmptyModule(path=package)
+
+
+def packages(root_package: str, module_paths: Iterable[ModulePath]) -> Iterable[ModulePath]:
+    """Yield all packages containing the modules, excluding the root package."""
+    known_packages: MutableSet[ModulePath] = {ModulePath(root_package)}
+
+    for module_path in module_paths:
+        path: ModulePath | None = module_path
+        while path := path.parent():  # type: ignore[union-attr]
+            if path in known_packages:
+                break
+            yield path
+            known_packages.add(path)
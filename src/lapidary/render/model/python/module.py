@@ -1,6 +1,7 @@
 import abc
 import dataclasses as dc
-from collections.abc import Iterable, Mapping
+from collections.abc import Iterable, Mapping, Sequence
+from functools import cached_property
 from pathlib import PurePath
 
 from .model import Auth, ClientClass, MetadataModel, SchemaClass
@@ -24,14 +25,12 @@ class AbstractModule[Body](abc.ABC):
     def dependencies(self) -> Iterable[NameRef]:
         pass
 
-    @property
-    def imports(self) -> Iterable[str]:
+    @cached_property
+    def imports(self) -> Sequence[str]:
+        """Modules to import, computed once the module body is complete."""
+        own_module = str(self.path)
         return sorted(
-            {
-                dep.module
-                for dep in self.dependencies()
-                if dep.module not in template_imports and dep.module != str(self.path)
-            }
+            {dep.module for dep in self.dependencies()} - {own_module, *template_imports},
         )
 
     @property
@@ -63,14 +62,14 @@ class EmptyModule(AbstractModule[None]):
 
 
 @dc.dataclass(frozen=True, kw_only=True)
-class MetadataModule(AbstractModule[Iterable[MetadataModel]]):
+class MetadataModule(AbstractModule[Sequence[MetadataModel]]):
     def dependencies(self) -> Iterable[NameRef]:
         for model in self.body:
             yield from model.dependencies()
 
 
 @dc.dataclass(frozen=True, kw_only=True)
-class SchemaModule(AbstractModule[Iterable[SchemaClass]]):
+class SchemaModule(AbstractModule[Sequence[SchemaClass]]):
     """
     One schema module per schema element directly under #/components/schemas, containing that schema and all non-reference schemas.
     One schema module for inline request and for response body for each operation
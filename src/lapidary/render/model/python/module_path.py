@@ -1,14 +1,35 @@
 import dataclasses as dc
+import threading
 import typing
+import weakref
 from collections.abc import Iterable, Sequence
 from pathlib import PurePath
 
+_INTERN_LOCK = threading.Lock()
 
-@dc.dataclass
+
+@dc.dataclass(init=False)
 class ModulePath:
+    """
+    Python module or package path.
+
+    Instances are interned by parts and is_module as long as they're used, under a lock, the hash, string form and
+    parent are computed once.
+    Equality only considers parts.
+    """
+
     _SEP = '.'
+    _instances: typing.ClassVar['weakref.WeakValueDictionary[tuple[tuple[str, ...], bool], ModulePath]'] = (
+        weakref.WeakValueDictionary()
+    )
 
-    def __init__(self, module: str | Iterable[str], is_module: bool = True):
+    parts: tuple[str, ...] = dc.field(init=False)
+    _is_module: bool = dc.field(init=False)
+    _str: str = dc.field(init=False, repr=False, compare=False)
+    _hash: int = dc.field(init=False, repr=False, compare=False)
+    _parent: 'ModulePath | None' = dc.field(init=False, repr=False, compare=False)
+
+    def __new__(cls, module: str | Iterable[str], is_module: bool = True) -> typing.Self:
         if isinstance(module, str):
             module = module.strip()
             if module.strip() != module:
@@ -20,11 +41,27 @@ class ModulePath:
         if isinstance(parts, Sequence):
             if len(parts) == 0:
                 raise ValueError(module)
-            self.parts = parts
+            parts = tuple(parts)
         else:
             raise ValueError(module)
 
+        key = (parts, is_module)
+        try:
+            return cls._instances[key]  # type: ignore[return-value]
+        except KeyError:
+            pass
+
+        self = super().__new__(cls)
+        self.parts = parts
         self._is_module = is_module
+        self._str = ModulePath._SEP.join(parts)
+        self._hash = hash(parts)
+        self._parent = None
+        with _INTERN_LOCK:
+            return cls._instances.setdefault(key, self)  # type: ignore[return-value]
+
+    def __reduce__(self):
+        return ModulePath, (self.parts, self._is_module)
 
     def to_path(self, root: PurePath | None = None) -> PurePath:
         parts = list(self.parts)
@@ -35,7 +72,9 @@ class ModulePath:
     def parent(self) -> typing.Self | None:
         if len(self.parts) == 1:
             return None
-        return ModulePath(self.parts[:-1], False)  # type: ignore[return-value]
+        if self._parent is None:
+            self._parent = ModulePath(self.parts[:-1], False)
+        return self._parent  # type: ignore[return-value]
 
     def __truediv__(self, other: str | Iterable[str]):
         if isinstance(other, str):
@@ -43,15 +82,17 @@ class ModulePath:
         return ModulePath([*self.parts, *other])
 
     def __repr__(self):
-        return ModulePath._SEP.join(self.parts)
+        return self._str
 
     def __eq__(self, other: object):
+        if self is other:
+            return True
         if not isinstance(other, ModulePath):
             return NotImplemented
         return self.parts == other.parts
 
     def __hash__(self) -> int:
-        return hash(self.__str__())
+        return self._hash
 
     def __matmul__(self, other):
         if not isinstance(other, ModulePath):
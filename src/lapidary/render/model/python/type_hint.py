@@ -1,11 +1,76 @@
 from __future__ import annotations
 
 import dataclasses as dc
-from collections.abc import Iterable, Mapping, Sequence
+import threading
+import weakref
+from collections.abc import Hashable, Iterable, Mapping, Sequence
+from typing import Any
 
+_INTERN_LOCK = threading.Lock()
 
-@dc.dataclass(slots=True, frozen=True)
-class NameRef:
+
+class _InternedMeta(type):
+    """
+    Keeps a single canonical instance per distinct value, so equal objects are the same object.
+
+    Instances are kept only as long as they're used elsewhere. Weak dictionaries aren't thread-safe, instances are
+    interned under a lock.
+    """
+
+    _instances: weakref.WeakValueDictionary[Hashable, Any]
+
+    def __init__(cls, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        cls._instances = weakref.WeakValueDictionary()
+
+    def __call__(cls, *args, **kwargs):
+        instance = super().__call__(*args, **kwargs)
+        with _INTERN_LOCK:
+            return cls._instances.setdefault(instance._key, instance)
+
+
+class _Interned(metaclass=_InternedMeta):
+    """
+    Base for interned frozen dataclasses.
+
+    Subclasses call _set_key() in __post_init__ with a hashable tuple of their values. The hash is precomputed and
+    equality is mostly an identity check.
+    """
+
+    __slots__ = ('_key', '_hash', '_sort_key', '__weakref__')
+
+    _key: tuple
+    _hash: int
+    _sort_key: str | None
+
+    def _set_key(self, key: tuple) -> None:
+        object.__setattr__(self, '_key', key)
+        object.__setattr__(self, '_hash', hash(key))
+        object.__setattr__(self, '_sort_key', None)
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._key == other._key  # type: ignore[attr-defined]
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self):
+        # go through the constructor, so that copies and unpickled objects are interned too
+        return type(self), tuple(getattr(self, field.name) for field in dc.fields(self))  # type: ignore[arg-type]
+
+    def sort_key(self) -> str:
+        """Canonical sort key, same order as str() but computed once per distinct object."""
+        if self._sort_key is None:
+            object.__setattr__(self, '_sort_key', repr(self))
+        return self._sort_key  # type: ignore[return-value]
+
+
+@dc.dataclass(slots=True, frozen=True, eq=False)
+class NameRef(_Interned):
     """
     Name used as a reference, usually to a type or a function.
     Used to determine imports and in annotations.
@@ -14,6 +79,9 @@ class NameRef:
     module: str
     name: str
 
+    def __post_init__(self) -> None:
+        self._set_key((self.module, self.name))
+
     def full_name(self) -> str:
         return self.module + ':' + self.name
 
@@ -31,8 +99,8 @@ class NameRef:
         return NameRef(module=module, name=name)
 
 
-@dc.dataclass(slots=True, frozen=True)
-class AnnotatedType:
+@dc.dataclass(slots=True, frozen=True, eq=False)
+class AnnotatedType(_Interned):
     typ: NameRef
     generic_args: Sequence[AnnotatedType] = dc.field(default_factory=tuple)
     gt: int | float | None = None
@@ -46,6 +114,19 @@ class AnnotatedType:
 
     def __post_init__(self):
         assert isinstance(self.typ, NameRef), self.typ
+        if not isinstance(self.generic_args, tuple):
+            object.__setattr__(self, 'generic_args', tuple(self.generic_args))
+        self._set_key(
+            (
+                self.typ,
+                self.generic_args,
+                # keep 1 and 1.0 apart, they're rendered differently
+                *((value, type(value)) for value in (self.gt, self.ge, self.lt, self.le, self.multiple_of)),
+                self.pattern,
+                self.min_length,
+                self.max_length,
+            )
+        )
 
     def num_constraints(self) -> Iterable[tuple[NameRef, int | float]]:
         for key, typ in CONSTRAINTS.items():
@@ -100,7 +181,7 @@ def union_of(*types: AnnotatedType) -> AnnotatedType:
     if len(args) == 1:
         return next(iter(args))
 
-    return AnnotatedType(_UNION, tuple(sorted(args, key=str)))
+    return AnnotatedType(_UNION, tuple(sorted(args, key=AnnotatedType.sort_key)))
 
 
 def tuple_of(*types: AnnotatedType) -> AnnotatedType:
@@ -109,3 +190,11 @@ def tuple_of(*types: AnnotatedType) -> AnnotatedType:
 
 def optional(typ: AnnotatedType) -> AnnotatedType:
     return union_of(typ, NoneMetaType)
+
+
+def replace_names(typ: AnnotatedType, names: Mapping[NameRef, NameRef]) -> AnnotatedType:
+    """Replace referenced names in the type and its arguments, keeping unions sorted."""
+    args = [replace_names(arg, names) for arg in typ.generic_args]
+    if typ.typ == _UNION:
+        return union_of(*args)
+    return dc.replace(typ, typ=names.get(typ.typ, typ.typ), generic_args=args)
@@ -3,13 +3,13 @@ from __future__ import annotations
 import functools
 import logging
 import typing
-from collections.abc import Callable, Mapping, Sequence
+from collections.abc import Callable, Mapping, MutableMapping, Sequence
 from typing import Any, Concatenate
 
 import pydantic
-from openapi_pydantic.v3 import v3_0 as openapi
 
 from ..json_pointer import decode_json_pointer
+from . import openapi
 from .stack import Stack
 
 logger = logging.getLogger(__name__)
@@ -39,6 +39,42 @@ def resolve_ref[Target, R, **P](
     return wrapper
 
 
+class HasRefCache(HasSource, typing.Protocol):
+    ref_cache: MutableMapping[tuple[str, str], Any]
+
+
+def resolve_ref_memoized[Target, R](
+    fn: Callable[[Any, Target, Stack], R],
+) -> Callable[[Any, Target | openapi.Reference[Target], Stack], R]:
+    """
+    Like resolve_ref, but when the value is a reference, memoize the result by the resolved pointer.
+
+    Objects referenced from many places, like shared parameters or security schemes, are resolved and converted once.
+    The decorated method must depend only on the value and its location.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(self: HasRefCache, value: Target | openapi.Reference[Target], stack: Stack) -> R:
+        if not isinstance(value, openapi.Reference):
+            return fn(self, value, stack)
+
+        cache = self.ref_cache
+        try:
+            return cache[fn.__name__, value.ref]
+        except KeyError:
+            pass
+        logger.debug('Resolving ref %s', value.ref)
+        target, pointer = resolve_refs_recursive(self.source, value)
+        try:
+            result = cache[fn.__name__, pointer]
+        except KeyError:
+            result = cache[fn.__name__, pointer] = fn(self, target, Stack.from_str(pointer))
+        cache[fn.__name__, value.ref] = result
+        return result
+
+    return wrapper
+
+
 def resolve_refs_recursive[Target](root: openapi.OpenAPI, ref: openapi.Reference[Target]) -> tuple[Target, str]:
     stack: list[str] = []
     while True:
@@ -46,7 +82,7 @@ def resolve_refs_recursive[Target](root: openapi.OpenAPI, ref: openapi.Reference
         if pointer in stack:
             raise ValueError('Circular references', stack, pointer)
         stack.append(pointer)
-        target = _resolve_ref(root, pointer)
+        target: Target | openapi.Reference[Target] = _resolve_ref(root, pointer)
         if not isinstance(target, openapi.Reference):
             return typing.cast(Target, target), ref.ref
         ref = target
@@ -1,37 +1,107 @@
 import re
+import threading
+import weakref
+from collections.abc import Iterable
 from typing import Self
 
 from .. import json_pointer
 
 RE_SPECIAL = re.compile('/|~(?!0)')
+_INTERN_LOCK = threading.Lock()
 
 
 class Stack:
-    # store parts unescaped, only escape when printing
+    """
+    Persistent JSON pointer, stored as a parent pointer and the unescaped last part.
 
-    __slots__ = ('path',)
+    Stacks are interned: there's only one instance per path, so push() is a dictionary lookup, equality is identity and
+    all stacks share their prefixes. Hash, path tuple and the JSON pointer string are computed once per instance.
+    Interning tables keep stacks only as long as they're used elsewhere, children keep their parents.
 
-    def __init__(self, stack=('#',)) -> None:
-        self.path: tuple[str, ...] = stack
+    Stacks are safe to create from multiple threads: interning tables are only changed under a lock, and the lazily
+    cached values are the same regardless of which thread computes them.
+    """
+
+    __slots__ = ('_parent', '_name', '_hash', '_path', '_pointer', '__weakref__')
+
+    _roots: dict[str, 'Stack'] = {}
+    _children: 'weakref.WeakValueDictionary[tuple[int, str], Stack]' = weakref.WeakValueDictionary()
+    """Children by id of their parent and name. Children keep their parents, so the ids aren't reused."""
+    _by_pointer: 'weakref.WeakValueDictionary[str, Stack]' = weakref.WeakValueDictionary()
+
+    _parent: 'Stack | None'
+    _name: str
+    _hash: int
+    _path: tuple[str, ...] | None
+    _pointer: str | None
+
+    def __new__(cls, stack: Iterable[str] = ('#',)) -> Self:
+        root_name, *names = stack
+        if (root := cls._roots.get(root_name)) is None:
+            with _INTERN_LOCK:
+                root = cls._roots.setdefault(root_name, cls._new(None, root_name))
+        return root.push(*names)  # type: ignore[return-value]
+
+    @classmethod
+    def _new(cls, parent: 'Stack | None', name: str) -> 'Stack':
+        self = object.__new__(cls)
+        self._parent = parent
+        self._name = name
+        self._hash = hash((parent._hash if parent else None, name))
+        self._path = None
+        self._pointer = None
+        return self
 
     @classmethod
     def from_str(cls, pointer: str) -> Self:
-        return cls(tuple([json_pointer.decode_json_pointer(part) for part in pointer.split('/')]))
+        try:
+            return cls._by_pointer[pointer]  # type: ignore[return-value]
+        except KeyError:
+            pass
+        stack = cls([json_pointer.decode_json_pointer(part) for part in pointer.split('/')])
+        with _INTERN_LOCK:
+            return cls._by_pointer.setdefault(pointer, stack)  # type: ignore[return-value]
+
+    @property
+    def path(self) -> tuple[str, ...]:
+        if self._path is None:
+            self._path = (*self._parent.path, self._name) if self._parent else (self._name,)
+        return self._path
 
     def __repr__(self):
-        return '/'.join((self.path[0], *[json_pointer.encode_json_pointer(elem) for elem in self.path[1:]]))
+        if self._pointer is None:
+            self._pointer = (
+                f'{self._parent!r}/{json_pointer.encode_json_pointer(self._name)}' if self._parent else self._name
+            )
+        return self._pointer
+
+    def __reduce__(self):
+        # copies and unpickled stacks are interned too
+        return Stack, (self.path,)
 
-    def push(self, *names: str) -> Self:
-        return Stack(self.path + names)  # type: ignore[return-value]
+    def push(self, *names: str) -> 'Stack':
+        stack: Stack = self
+        children = Stack._children
+        for name in names:
+            key = (id(stack), name)
+            try:
+                stack = children[key]
+            except KeyError:
+                with _INTERN_LOCK:
+                    if (child := children.get(key)) is None:
+                        child = children[key] = Stack._new(stack, name)
+                stack = child
+        return stack
 
     def top(self) -> str:
-        return self.path[-1]
+        return self._name
 
     def __hash__(self) -> int:
-        return hash(self.path)
+        return self._hash
 
-    def __eq__(self, other):
-        return isinstance(other, Stack) and self.path == other.path
+    # Stacks are interned, so default identity-based __eq__ is correct.
 
     def __getitem__(self, item: int) -> str:
+        if item == -1:
+            return self._name
         return self.path[item]
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import MutableMapping
+
+from .. import json_pointer, names
+from . import python
+from .stack import Stack
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolTable:
+    """
+    Python names generated during a single conversion.
+
+    Memoizes mangling of names and resolution of stacks to type names, so every distinct name is mangled only once.
+    Since every newly mangled name is recorded, a mangled name shared by two different source names is detected
+    at no additional cost.
+    """
+
+    def __init__(self, root_package: str) -> None:
+        self.root_package = root_package
+        self._mangled: MutableMapping[str, str] = {}
+        self._sources: MutableMapping[str, str] = {}
+        self._type_names: MutableMapping[Stack, python.AnnotatedType] = {}
+
+    def mangle(self, name: str) -> str:
+        """Memoized names.maybe_mangle_name"""
+        try:
+            return self._mangled[name]
+        except KeyError:
+            pass
+
+        mangled = names.maybe_mangle_name(name)
+        if (source := self._sources.setdefault(mangled, name)) != name:
+            raise ValueError('Name collision', mangled, source, name)
+        self._mangled[name] = mangled
+        return mangled
+
+    def resolve_type_name(self, pointer: Stack) -> python.AnnotatedType:
+        if (typ := self._type_names.get(pointer)) is not None:
+            return typ
+
+        # FIXME all fields should be saved as json ref; all schemas saved in a map with json ref as a key
+        parts = [self.mangle(json_pointer.decode_json_pointer(part)) for part in pointer.path[1:]]
+        module_name = '.'.join([self.root_package, *parts[:-1]])
+        typ = python.AnnotatedType(python.NameRef(module_name, parts[-1]))
+        self._type_names[pointer] = typ
+        return typ
+
+
+def symbol_table(root_package: str | SymbolTable) -> SymbolTable:
+    """Return the symbol table, or a new one if only the root package name is given."""
+    return root_package if isinstance(root_package, SymbolTable) else SymbolTable(root_package)
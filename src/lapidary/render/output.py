@@ -0,0 +1,95 @@
+"""Destinations of rendered files."""
+
+import abc
+import hashlib
+from collections.abc import Collection, Iterable, Mapping
+from pathlib import Path, PurePath
+
+from .bytecode import source_path
+from .progress import NO_PROGRESS, NoProgress
+
+
+class Output(abc.ABC):
+    """Destination of rendered files, by path relative to the source root."""
+
+    concurrent = False
+    """Whether write may be called from many threads. Otherwise files are written in the order of modules."""
+
+    @abc.abstractmethod
+    def write(self, path: PurePath, code: Iterable[str]) -> str:
+        """Write code chunks to the file, return the hash of its content."""
+
+    @abc.abstractmethod
+    def close(self, written: Collection[PurePath]) -> None:
+        """Complete the output, once all files are written."""
+
+    def unchanged(self, files: Mapping[PurePath, str]) -> Mapping[PurePath, str]:
+        """Return the files that the output already has with the same hash, and don't need to be written."""
+        return {}
+
+
+class DirectoryOutput(Output):
+    """Write files under the target root and remove stale ones."""
+
+    concurrent = True
+
+    def __init__(self, target_root: Path, package_extras: PurePath, progress: NoProgress = NO_PROGRESS) -> None:
+        self.target_root = target_root
+        self.package_extras = package_extras
+        self.progress = progress
+        target_root.mkdir(parents=True, exist_ok=True)
+
+    def write(self, path: PurePath, code: Iterable[str]) -> str:
+        return write_code(self.target_root / path, code)
+
+    def close(self, written: Collection[PurePath]) -> None:
+        remove_stale_files(self.target_root, written, self.package_extras, self.progress)
+
+    def unchanged(self, files: Mapping[PurePath, str]) -> Mapping[PurePath, str]:
+        unchanged = {}
+        for path, hash_ in files.items():
+            try:
+                if hashlib.sha256((self.target_root / path).read_bytes()).hexdigest() == hash_:
+                    unchanged[path] = hash_
+            except FileNotFoundError:
+                pass
+        return unchanged
+
+
+def write_code(path: Path, code: Iterable[str]) -> str:
+    """Write code chunks to the file, return the hash of its content."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256()
+    with path.open('wb') as file:
+        for text in code:
+            chunk = text.encode()
+            file.write(chunk)
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def remove_stale_files(
+    target_root: Path, written: Collection[PurePath], package_extras: PurePath, progress: NoProgress = NO_PROGRESS
+) -> None:
+    """
+    Remove files other than written and in the extras package, and empty directories.
+
+    Bytecode of written modules is kept, it's only valid for their current content anyway.
+    """
+    with progress.stage('stale files', label='Removing stale files') as update:
+        for parent, dirs, files in target_root.walk(False):
+            package = parent.relative_to(target_root)
+            files_ = set(files)
+            if package != package_extras:
+                for existing in files:
+                    path = (parent / existing).relative_to(target_root)
+
+                    if path not in written and source_path(path) not in written:
+                        if update:
+                            update(path)
+                        files_.remove(existing)
+                        (parent / existing).unlink()
+            if not files_ and not dirs:
+                if update:
+                    update(parent)
+                parent.rmdir()
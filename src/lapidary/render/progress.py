@@ -0,0 +1,105 @@
+"""Progress of rendering stages, shown as progress bars or reported as newline-delimited JSON events."""
+
+import contextlib
+import json
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from typing import Any, Literal, TextIO, TypeAlias
+
+import click
+
+from .hooks import NULL_CONTEXT
+
+Mode: TypeAlias = Literal['bar', 'json', 'none']
+Update: TypeAlias = Callable[[Any], None]
+"""Report an item processed in a stage."""
+
+
+class NoProgress:
+    """Progress that isn't reported. Stages yield None instead of an update function, so callers skip their items."""
+
+    def stage(
+        self, name: str, length: int | None = None, label: str | None = None
+    ) -> contextlib.AbstractContextManager[Update | None]:
+        """
+        Report progress of a stage. Yield a function to call with each processed item, or None if items aren't reported.
+
+        :param name: stage name in events, like 'paths'
+        :param length: number of items, if known
+        :param label: progress bar label; stages without a label have no progress bar
+        """
+        return NULL_CONTEXT
+
+
+class BarProgress(NoProgress):
+    """Show progress bars of labeled stages."""
+
+    def __init__(self, file: TextIO | None = None) -> None:
+        self.file = file
+
+    @contextlib.contextmanager
+    def stage(self, name: str, length: int | None = None, label: str | None = None) -> Iterator[Update | None]:
+        if label is None:
+            yield None
+            return
+        with click.progressbar(
+            length=length or 0,
+            label=label,
+            item_show_func=str,
+            show_pos=length is not None,
+            file=self.file,
+        ) as bar:
+            yield lambda item: bar.update(1, item)
+
+
+class JsonProgress(NoProgress):
+    """
+    Write a JSON object per line for the start, each item and the end of every stage.
+
+    Events have the stage name, item (if any), number of items processed so far, total if known, and seconds
+    elapsed since the stage started, like:
+    {"event": "item", "stage": "paths", "item": "/pets", "count": 1, "total": 20, "elapsed": 0.012}
+    """
+
+    def __init__(self, file: TextIO) -> None:
+        self.file = file
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name: str, length: int | None = None, label: str | None = None) -> Iterator[Update | None]:
+        start = time.perf_counter()
+        count = 0
+
+        def event(event: str, **fields: Any) -> None:
+            nonlocal count
+            with self._lock:
+                if event == 'item':
+                    count += 1
+                event_ = {'event': event, 'stage': name, **fields, 'count': count, 'total': length}
+                event_['elapsed'] = round(time.perf_counter() - start, 6)
+                self.file.write(json.dumps(event_) + '\n')
+                self.file.flush()
+
+        event('start')
+        try:
+            yield lambda item: event('item', item=str(item))
+        finally:
+            event('end')
+
+
+NO_PROGRESS = NoProgress()
+
+
+def mk_progress(mode: Mode, file: TextIO | None = None) -> NoProgress:
+    """Return progress of the mode, written to the file, stdout by default."""
+    match mode:
+        case 'bar':
+            return BarProgress(file)
+        case 'json':
+            return JsonProgress(file or sys.stdout)
+        case 'none':
+            return NO_PROGRESS
+        case _:
+            raise ValueError('Unsupported progress mode', mode)
@@ -0,0 +1,119 @@
+"""
+Render server, a long-lived process rendering projects on requests received on a Unix socket.
+
+The server keeps document models, python models and hashes of rendered files of recently rendered projects, so
+re-rendering a project doesn't pay for interpreter start-up and imports, nor for validating an unchanged document,
+converting it if the configuration is unchanged too, or rendering files that are still up to date.
+
+Requests and responses are JSON objects, one per line, like:
+{"project_root": "/home/user/client", "force": true}
+{"status": "rendered", "elapsed": 0.125}
+Project roots are relative to the working directory of the server. Failed requests have "failed" status and an error.
+"""
+
+import dataclasses as dc
+import json
+import logging
+import socket
+import socketserver
+import threading
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any
+
+from .batch import DocumentCache, ModelCache
+from .main import RenderOptions, render_project
+
+logger = logging.getLogger(__name__)
+
+REQUEST_OPTIONS = frozenset({'force', 'lazy_document', 'compile_bytecode'})
+
+
+class RenderServer(socketserver.ThreadingUnixStreamServer):
+    """
+    Serve render requests. Clients may keep connections open, requests from all connections are rendered one at a time.
+
+    :param cache_size: number of documents and python models kept in memory
+    :param options: options of every request, some of which requests may override
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, cache_size: int = 8, options: RenderOptions = RenderOptions()) -> None:
+        self.documents = DocumentCache(cache_size)
+        self.models: ModelCache = ModelCache(cache_size)
+        self.options = options
+        self._lock = threading.Lock()
+        _remove_stale_socket(socket_path)
+        super().__init__(str(socket_path), _RequestHandler)
+
+    def render(self, request: Mapping[str, Any]) -> Mapping[str, Any]:
+        start = time.perf_counter()
+        try:
+            if not isinstance(request, Mapping) or not isinstance(request.get('project_root'), str):
+                raise ValueError('Invalid request', request)
+            if unknown := request.keys() - REQUEST_OPTIONS - {'project_root'}:
+                raise ValueError('Unsupported options', sorted(unknown))
+            overrides: dict[str, Any] = {key: bool(request[key]) for key in REQUEST_OPTIONS & request.keys()}
+            options = dc.replace(self.options, progress='none', **overrides)
+            with self._lock:
+                status = render_project(
+                    Path(request['project_root']), options, documents=self.documents, models=self.models
+                )
+        except Exception as e:
+            logger.warning('Rendering failed: %s', e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            return {'status': 'failed', 'error': f'{type(e).__name__}: {e}'}
+        elapsed = time.perf_counter() - start
+        logger.info('%s %s in %.3fs', request['project_root'], status, elapsed)
+        return {'status': status, 'elapsed': round(elapsed, 6)}
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: RenderServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response: Mapping[str, Any] = {'status': 'failed', 'error': f'Invalid JSON: {e}'}
+            else:
+                response = self.server.render(request)
+            self.wfile.write(json.dumps(response).encode() + b'\n')
+            self.wfile.flush()
+
+
+def _remove_stale_socket(socket_path: Path) -> None:
+    """Remove the socket file left by a server that didn't shut down cleanly. Fail if a server is listening."""
+    if not socket_path.is_socket():
+        return
+    with socket.socket(socket.AF_UNIX) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except ConnectionRefusedError:
+            socket_path.unlink()
+            return
+    raise FileExistsError('Server already running', str(socket_path))
+
+
+def serve(socket_path: Path, cache_size: int = 8, options: RenderOptions = RenderOptions()) -> None:
+    """Serve render requests until interrupted."""
+    with RenderServer(socket_path, cache_size, options) as server:
+        logger.info('Listening on %s', socket_path)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+def request_render(socket_path: Path, project_root: Path, **options: bool) -> Mapping[str, Any]:
+    """Ask the server to render the project, return its response."""
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.connect(str(socket_path))
+        with sock.makefile('rwb') as file:
+            file.write(json.dumps({'project_root': str(project_root.absolute()), **options}).encode() + b'\n')
+            file.flush()
+            return json.loads(file.readline())
@@ -1,15 +1,23 @@
+import collections
 import logging
-from collections.abc import Callable, Iterable
+from collections.abc import Callable, Iterable, Iterator, Mapping
 from pathlib import Path, PurePath
+from typing import TypeAlias
 
-import click
 import libcst as cst
 
+from .bytecode import NO_BYTECODE, NoBytecode
 from .config import Config
-from .model import conv_cst, python
+from .costs import NO_COST_REPORT, NoCostReport
+from .memory import NO_ACCOUNTING, NoAccounting
+from .model import conv_cst, conv_text, python
+from .output import Output
 
 logger = logging.getLogger(__name__)
 
+Renderer: TypeAlias = Callable[[python.AbstractModule], Iterable[str] | None]
+"""Return module code in chunks, or None if the module should not be written."""
+
 
 def mk_module(module: python.AbstractModule) -> cst.Module | None:
     match module:
@@ -29,48 +37,93 @@ def mk_module(module: python.AbstractModule) -> cst.Module | None:
             raise TypeError(type(module))
 
 
+def render_module(module: python.AbstractModule) -> Iterable[str] | None:
+    """Render module code with libcst. The client module is serialized method by method."""
+    if isinstance(module, python.ClientModule):
+        return conv_cst.mk_client_module_code(module)
+    cst_module = mk_module(module)
+    return (cst_module.code,) if cst_module else None
+
+
+RENDERERS: Mapping[str, Renderer] = {
+    'libcst': render_module,
+    'text': conv_text.render_module,
+}
+
+
 def update_project(
     modules: Iterable[python.AbstractModule],
-    target_root: Path,
+    output: Output,
     root_package: str,
     update_progress: Callable[[python.AbstractModule], None],
-):
-    target_root.mkdir(parents=True, exist_ok=True)
-    written: list[Path] = []
-    package_extras = PurePath(root_package) / 'extras'
-    for module in modules:
+    render: Renderer = render_module,
+    memory: NoAccounting = NO_ACCOUNTING,
+    threads: int = 1,
+    costs: NoCostReport = NO_COST_REPORT,
+    bytecode: NoBytecode = NO_BYTECODE,
+    previous: Mapping[PurePath, str] | None = None,
+) -> Mapping[str, str]:
+    """
+    Write modules and complete the output. Return hashes of written files, by path relative to the source root.
+
+    :param threads: number of threads rendering and writing modules; files are listed in the order of modules anyway.
+    Outputs that aren't concurrent are written from the calling thread
+    :param costs: report of generated classes and lines by document location
+    :param bytecode: compile written modules, while the following ones are rendered
+    :param previous: hashes of files rendered before from the same modules. Modules of files that the output still
+    has with the same content aren't rendered again
+    """
+    written: dict[PurePath, str] = {}
+    unchanged = output.unchanged(previous) if previous else {}
+
+    def write_module(module: python.AbstractModule) -> tuple[PurePath, str | Iterable[str]] | None:
+        path = module.path.to_path().with_suffix('.py')
+        if (hash_ := unchanged.get(path)) is not None:
+            return path, hash_
+        with memory.stage('render'):
+            code = render(module)
+            if code is None:
+                return None
+            code = costs.rendered(module, code)
+            return path, output.write(path, code) if output.concurrent else list(code)
+
+    results = map_threaded(write_module, modules, threads) if threads > 1 else map_eager(write_module, modules)
+    for module, result in results:
         update_progress(module)
-        cst_module = mk_module(module)
-        if not cst_module:
-            continue
-        path = module.path.to_path()
-        full_path = target_root / path.with_suffix('.py')
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-        full_path.write_text(cst_module.code)
-        written.append(full_path.relative_to(target_root))
-
-    root_module_path = Path(root_package) / '__init__.py'
-    (target_root / root_module_path).write_text(conv_cst.MODULE_ROOT.code)
-    written.append(root_module_path)
-
-    (target_root / root_package / 'py.typed').write_text('', newline='')
-    written.append(Path(root_package, 'py.typed'))
-
-    with click.progressbar(length=0, label='Removing stale files') as bar:
-        for parent, dirs, files in target_root.walk(False):
-            package = parent.relative_to(target_root)
-            files_ = set(files)
-            if package != package_extras:
-                for existing in files:
-                    path = (parent / existing).relative_to(target_root)
-
-                    if path not in written:
-                        bar.update(1, str(path))
-                        files_.remove(existing)
-                        (parent / existing).unlink()
-            if not files_ and not dirs:
-                bar.update(1, str(parent))
-                parent.rmdir()
+        if result is not None:
+            path, hash_or_code = result
+            written[path] = hash_or_code if isinstance(hash_or_code, str) else output.write(path, hash_or_code)
+            bytecode.compile(path)
+
+    root_module_path = PurePath(root_package, '__init__.py')
+    written[root_module_path] = output.write(root_module_path, [conv_cst.MODULE_ROOT.code])
+    bytecode.compile(root_module_path)
+
+    written[PurePath(root_package, 'py.typed')] = output.write(PurePath(root_package, 'py.typed'), [])
+
+    output.close(written.keys())
+    return {path.as_posix(): hash_ for path, hash_ in written.items()}
+
+
+def map_eager[T, R](fn: Callable[[T], R], items: Iterable[T]) -> Iterator[tuple[T, R]]:
+    for item in items:
+        yield item, fn(item)
+
+
+def map_threaded[T, R](fn: Callable[[T], R], items: Iterable[T], threads: int) -> Iterator[tuple[T, R]]:
+    """Like map_eager, but call fn in a thread pool. Items are consumed only a few ahead of results."""
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+    pending: collections.deque[tuple[T, Future[R]]] = collections.deque()
+    with ThreadPoolExecutor(threads) as executor:
+        for item in items:
+            pending.append((item, executor.submit(fn, item)))
+            if len(pending) >= threads * 2:
+                item, future = pending.popleft()
+                yield item, future.result()
+        while pending:
+            item, future = pending.popleft()
+            yield item, future.result()
 
 
 def write_gitignore(project_root: Path):
@@ -0,0 +1,44 @@
+import pytest
+
+from lapidary.render.model import conv_openapi, openapi, python
+
+
+def mk_operation(operation_id: str) -> dict:
+    return {
+        'operationId': operation_id,
+        'parameters': [{'name': 'X-Trace', 'in': 'header', 'schema': {'type': 'string'}}],
+        'responses': {
+            '200': {
+                'description': 'ok',
+                'headers': {'X-Rate-Limit': {'schema': {'type': 'integer'}}},
+            },
+        },
+    }
+
+
+@pytest.fixture
+def document() -> openapi.OpenAPI:
+    return openapi.OpenAPI.model_validate(
+        {
+            'openapi': '3.0.3',
+            'info': {'title': 'test', 'version': '1'},
+            'paths': {f'/{name}': {'get': mk_operation(f'get_{name}')} for name in 'abcdef'},
+        }
+    )
+
+
+def test_metadata_classes_shared(document: openapi.OpenAPI) -> None:
+    model = conv_openapi.OpenApi30Converter(python.ModulePath('test'), document, None).process()
+
+    metadata_modules = [module for module in model.model_modules if isinstance(module, python.MetadataModule)]
+    assert [module.body[0].name for module in metadata_modules] == ['RequestMetadata', 'ResponseMetadata']
+    assert len({method.responses['200'].headers_type for method in model.client.body.methods}) == 1
+
+
+@pytest.mark.parametrize('executor', ['process', 'thread'])
+def test_metadata_classes_shared_between_workers(document: openapi.OpenAPI, executor) -> None:
+    def convert(**kwargs) -> list[python.AbstractModule]:
+        converter = conv_openapi.OpenApi30Converter(python.ModulePath('test'), document, None, **kwargs)
+        return list(converter.iter_modules())
+
+    assert convert(jobs=3, executor=executor) == convert()
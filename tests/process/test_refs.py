@@ -0,0 +1,51 @@
+from lapidary.render.model import conv_openapi, openapi, python
+
+
+def mk_operation(operation_id: str) -> dict:
+    return {
+        'operationId': operation_id,
+        'parameters': [{'$ref': '#/components/parameters/trace'}, {'$ref': '#/components/parameters/alias'}],
+        'responses': {'200': {'$ref': '#/components/responses/Empty'}},
+    }
+
+
+def mk_document() -> openapi.OpenAPI:
+    return openapi.OpenAPI.model_validate(
+        {
+            'openapi': '3.0.3',
+            'info': {'title': 'test', 'version': '1'},
+            'paths': {
+                '/a': {'get': mk_operation('getA')},
+                '/b': {'get': mk_operation('getB')},
+            },
+            'components': {
+                'parameters': {
+                    'trace': {'name': 'trace', 'in': 'query', 'schema': {'type': 'string'}},
+                    'alias': {'$ref': '#/components/parameters/trace'},
+                },
+                'responses': {'Empty': {'description': 'empty'}},
+            },
+        }
+    )
+
+
+def test_referenced_objects_converted_once(monkeypatch) -> None:
+    calls = []
+    process_parameter = conv_openapi.OpenApi30Converter.process_parameter.__wrapped__
+
+    def counting(self, value, stack):
+        calls.append(str(stack))
+        return process_parameter(self, value, stack)
+
+    monkeypatch.setattr(
+        conv_openapi.OpenApi30Converter,
+        'process_parameter',
+        conv_openapi.resolve_ref_memoized(counting),
+    )
+
+    model = conv_openapi.OpenApi30Converter(python.ModulePath('test'), mk_document(), None).process()
+
+    assert calls == ['#/components/parameters/trace']
+    method_a, method_b = model.client.body.methods
+    assert method_a.params[0] is method_b.params[0]
+    assert method_a.responses['200'] is method_b.responses['200']
@@ -432,3 +432,158 @@ def test_process_union_object_int():
             python.AnnotatedType(python.NameRef('package.components.schemas.schema1.schema', 'schema1')),
         ),
     )
+
+
+def test_precompile_schemas_in_reference_order() -> None:
+    document = openapi.OpenAPI.model_validate(
+        {
+            'openapi': '3.0.3',
+            'info': {'title': 'test', 'version': '1'},
+            'paths': {
+                '/order': {
+                    'get': {
+                        'operationId': 'getOrder',
+                        'responses': {'200': {'$ref': '#/components/responses/Order'}},
+                    },
+                },
+            },
+            'components': {
+                'responses': {
+                    'Order': {
+                        'description': 'order',
+                        'content': {'application/json': {'schema': {'$ref': '#/components/schemas/Order'}}},
+                    },
+                },
+                'schemas': {
+                    'Order': {
+                        'type': 'object',
+                        'properties': {
+                            'item': {'$ref': '#/components/schemas/Item'},
+                            'items': {'type': 'array', 'items': {'$ref': '#/components/schemas/Item'}},
+                        },
+                    },
+                    'Item': {'type': 'object', 'properties': {'name': {'type': 'string'}}},
+                    'Unused': {'type': 'object', 'properties': {'name': {'type': 'string'}}},
+                },
+            },
+        }
+    )
+
+    models = conv_schema.precompile_schemas(document, python.ModulePath('test'), [document.paths])
+
+    assert list(models) == [
+        stack.Stack.from_str('#/components/schemas/Item'),
+        stack.Stack.from_str('#/components/schemas/Order'),
+    ]
+    item = models[stack.Stack.from_str('#/components/schemas/Item')]
+    order = models[stack.Stack.from_str('#/components/schemas/Order')]
+    assert order.properties['item'] is item
+    assert order.properties['items'].items is item
+
+
+def test_precompile_schemas_skips_circular_references() -> None:
+    def response(name: str) -> dict:
+        return {
+            'description': name,
+            'content': {'application/json': {'schema': {'$ref': f'#/components/schemas/{name}'}}},
+        }
+
+    document = openapi.OpenAPI.model_validate(
+        {
+            'openapi': '3.0.3',
+            'info': {'title': 'test', 'version': '1'},
+            'paths': {
+                '/order': {'get': {'operationId': 'getOrder', 'responses': {'200': response('Order')}}},
+                '/node': {
+                    'get': {
+                        'operationId': 'getNode',
+                        'responses': {'200': response('Node'), '201': response('Parent')},
+                    },
+                },
+            },
+            'components': {
+                'schemas': {
+                    'Order': {'type': 'object', 'properties': {'item': {'$ref': '#/components/schemas/Item'}}},
+                    'Item': {'type': 'object', 'properties': {'name': {'type': 'string'}}},
+                    'Node': {
+                        'type': 'object',
+                        'properties': {
+                            'item': {'$ref': '#/components/schemas/Item'},
+                            'children': {'type': 'array', 'items': {'$ref': '#/components/schemas/Node'}},
+                        },
+                    },
+                    'Parent': {'type': 'object', 'properties': {'child': {'$ref': '#/components/schemas/Child'}}},
+                    'Child': {'type': 'object', 'properties': {'parent': {'$ref': '#/components/schemas/Parent'}}},
+                },
+            },
+        }
+    )
+
+    models = conv_schema.precompile_schemas(document, python.ModulePath('test'), [document.paths])
+
+    # recursive schemas are left for on-demand conversion, the others are still precompiled in reference order
+    assert list(models) == [
+        stack.Stack.from_str('#/components/schemas/Item'),
+        stack.Stack.from_str('#/components/schemas/Order'),
+    ]
+    item = models[stack.Stack.from_str('#/components/schemas/Item')]
+    assert models[stack.Stack.from_str('#/components/schemas/Order')].properties['item'] is item
+
+
+ALIASES_DOCUMENT = """
+openapi: 3.0.3
+info: {title: test, version: '1'}
+paths:
+  /a:
+    get:
+      operationId: getA
+      responses:
+        '200':
+          description: a
+          content:
+            application/json:
+              schema: &error
+                type: object
+                properties:
+                  code: {type: integer}
+                  detail: &detail
+                    type: object
+                    properties:
+                      message: {type: string}
+  /b:
+    get:
+      operationId: getB
+      responses:
+        '200':
+          description: b
+          content:
+            application/json:
+              schema: *error
+        '404':
+          description: b
+          content:
+            application/json:
+              schema: *detail
+"""
+
+
+@pytest.mark.parametrize('options', [{}, {'lazy': True}], ids=['validated', 'lazy'])
+def test_yaml_aliases_converted_once(options: dict[str, bool]) -> None:
+    from lapidary.render.main import parse_document
+
+    document = parse_document(yaml.load(ALIASES_DOCUMENT), **options)
+    schema_a = document.paths.paths['/a'].get.responses.responses['200'].content['application/json'].media_type_schema
+    schema_b = document.paths.paths['/b'].get.responses.responses['200'].content['application/json'].media_type_schema
+    assert schema_a is schema_b
+
+    model = conv_openapi.OpenApi30Converter(python.ModulePath('test'), document, None).process()
+    method_a, method_b = model.client.body.methods
+    assert method_a.responses['200'] == method_b.responses['200']
+    # the shortest location of the detail schema
+    assert [str(module.path) for module in model.model_modules] == [
+        'test.paths.u_la.get.responses.u_o00.content.applicationu_ljson.schema.schema',
+        'test.paths.u_lb.get.responses.u_q04.content.applicationu_ljson.schema.schema',
+    ]
+
+    parallel = conv_openapi.OpenApi30Converter(python.ModulePath('test'), document, None, jobs=2, executor='thread')
+    assert parallel.process() == model
@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pytest
+
+from lapidary.render.config import Config, OperationFilter
+from lapidary.render.model import conv_openapi, openapi, python
+from lapidary.render.yaml import yaml
+
+document_path = Path(__file__).parent.parent / 'e2e/render/initial/petstore/lapidary/openapi/openapi.yaml'
+
+
+@pytest.fixture(scope='module')
+def document() -> openapi.OpenAPI:
+    return openapi.OpenAPI.model_validate(yaml.load(document_path.read_text()))
+
+
+def process(document: openapi.OpenAPI, config: Config) -> python.ClientModel:
+    return conv_openapi.OpenApi30Converter(
+        python.ModulePath('petstore'),
+        document,
+        None,
+        select_operation=config.selects_operation,
+    ).process()
+
+
+def test_select_by_tag_and_exclude_by_operation_id(document: openapi.OpenAPI) -> None:
+    config = Config(
+        document_path='openapi.yaml',
+        package='petstore',
+        include=OperationFilter(tags=['store']),
+        exclude=OperationFilter(operation_ids=['delete*']),
+    )
+    model = process(document, config)
+
+    assert [method.name for method in model.client.body.methods] == ['getInventory', 'placeOrder', 'getOrderById']
+    schema_modules = [str(module.path) for module in model.model_modules if isinstance(module, python.SchemaModule)]
+    assert 'petstore.components.schemas.Order.schema' in schema_modules
+    assert not any('Pet' in path or 'User' in path for path in schema_modules)
+
+
+def test_select_by_path_prefix(document: openapi.OpenAPI) -> None:
+    config = Config(document_path='openapi.yaml', package='petstore', include=OperationFilter(paths=['/user/']))
+    model = process(document, config)
+
+    assert {method.path for method in model.client.body.methods} == {
+        '/user',
+        '/user/createWithList',
+        '/user/login',
+        '/user/logout',
+        '/user/{username}',
+    }
+
+
+@pytest.mark.parametrize(
+    'path,expected',
+    [
+        ('/pet', True),
+        ('/pet/{petId}', True),
+        ('/petstore', False),
+        ('/store/pet', False),
+    ],
+)
+def test_path_prefix_matches_segments(path: str, expected: bool) -> None:
+    assert OperationFilter(paths=['/pet']).matches(path, None, ()) is expected
@@ -0,0 +1,78 @@
+import os
+import shutil
+import stat
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from lapidary.render.fingerprint import MANIFEST_FILE
+from lapidary.render.main import RenderOptions, render_project
+
+e2e_root = Path(__file__).parent / 'e2e'
+petstore = e2e_root / 'render/initial/petstore'
+expected_root = e2e_root / 'render/expected/petstore/src'
+
+
+def expected_files() -> dict[str, bytes]:
+    return {
+        path.relative_to(expected_root).as_posix(): path.read_bytes()
+        for path in expected_root.rglob('*')
+        if path.is_file() and path.name != MANIFEST_FILE
+    }
+
+
+@pytest.fixture
+def project_root(tmp_path: Path) -> Path:
+    project_root = tmp_path / 'project'
+    shutil.copytree(petstore, project_root)
+    return project_root
+
+
+def test_render_zip(project_root: Path, tmp_path: Path) -> None:
+    render_project(project_root, RenderOptions(output=tmp_path / 'first.zip'))
+    render_project(project_root, RenderOptions(output=tmp_path / 'second.zip', jobs=4, executor='thread'))
+
+    with zipfile.ZipFile(tmp_path / 'first.zip') as archive:
+        assert {name: archive.read(name) for name in archive.namelist()} == expected_files()
+        assert {info.date_time for info in archive.infolist()} == {(1980, 1, 1, 0, 0, 0)}
+    assert (tmp_path / 'first.zip').read_bytes() == (tmp_path / 'second.zip').read_bytes()
+    assert not (project_root / 'src').exists()
+
+
+def test_render_tar(project_root: Path, tmp_path: Path) -> None:
+    render_project(project_root, RenderOptions(output=tmp_path / 'client.tar.gz'))
+
+    with tarfile.open(tmp_path / 'client.tar.gz') as archive:
+        files = {member.name: archive.extractfile(member).read() for member in archive.getmembers()}
+        assert {member.mtime for member in archive.getmembers()} == {0}
+    assert files == expected_files()
+
+
+def test_render_wheel(project_root: Path, tmp_path: Path) -> None:
+    wheel_path = tmp_path / 'petstore-0.1.0-py3-none-any.whl'
+    render_project(project_root, RenderOptions(output=wheel_path))
+
+    with zipfile.ZipFile(wheel_path) as archive:
+        names = archive.namelist()
+        record = archive.read('petstore-0.1.0.dist-info/RECORD').decode().splitlines()
+        metadata = archive.read('petstore-0.1.0.dist-info/METADATA').decode()
+    assert [line.split(',')[0] for line in record] == names
+    assert 'Name: petstore\nVersion: 0.1.0\n' in metadata
+    assert set(names) - {name for name in names if '.dist-info/' in name} == set(expected_files())
+
+
+@pytest.mark.parametrize('name', ['client.zip', 'client.tar', 'petstore-0.1.0-py3-none-any.whl'])
+def test_archive_readable_by_others(project_root: Path, tmp_path: Path, name: str) -> None:
+    render_project(project_root, RenderOptions(output=tmp_path / name))
+
+    umask = os.umask(0o022)
+    os.umask(umask)
+    assert stat.S_IMODE((tmp_path / name).stat().st_mode) == 0o666 & ~umask
+
+
+def test_unsupported_archive(project_root: Path, tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        render_project(project_root, RenderOptions(output=tmp_path / 'client.rar'))
+    assert list(tmp_path.iterdir()) == [project_root]
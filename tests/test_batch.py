@@ -0,0 +1,70 @@
+import logging
+import shutil
+from pathlib import Path
+
+import pytest
+
+from lapidary.render.batch import LruCache, expand_project_roots, render_projects
+from lapidary.render.main import RenderOptions
+
+e2e_root = Path(__file__).parent / 'e2e'
+petstore = e2e_root / 'render/initial/petstore'
+expected_root = e2e_root / 'render/expected/petstore/src'
+
+
+@pytest.fixture
+def projects(tmp_path: Path) -> Path:
+    for name in ('a', 'b', 'c'):
+        shutil.copytree(petstore, tmp_path / name)
+    (tmp_path / 'broken').mkdir()
+    (tmp_path / 'broken/pyproject.toml').write_text('[tool.lapidary]\n')
+    (tmp_path / 'not-a-project').mkdir()
+    return tmp_path
+
+
+def test_expand_project_roots(projects: Path) -> None:
+    assert expand_project_roots([str(projects / '*'), str(projects / 'a')]) == [
+        projects / name for name in ('a', 'b', 'broken', 'c')
+    ]
+    with pytest.raises(ValueError):
+        expand_project_roots([str(projects / 'missing-*')])
+
+
+@pytest.mark.parametrize('jobs,executor', [(1, 'process'), (2, 'thread')])
+def test_render_projects(projects: Path, jobs: int, executor, caplog: pytest.LogCaptureFixture) -> None:
+    roots = [projects / name for name in ('a', 'broken', 'b', 'c')]
+    with caplog.at_level(logging.INFO, 'lapidary.render.batch'):
+        results = render_projects(roots, RenderOptions(jobs=jobs, executor=executor, progress='none'))
+
+    assert [result.project_root for result in results] == roots
+    assert [result.status for result in results] == ['rendered', 'failed', 'rendered', 'rendered']
+    assert results[1].error.startswith('ValidationError')
+    # the document is parsed once per worker
+    assert caplog.messages.count('Reusing parsed OpenAPI document') == 3 - jobs
+    for name in ('a', 'b', 'c'):
+        assert (projects / name / 'src/test_petstore/client.py').read_text() == (
+            expected_root / 'test_petstore/client.py'
+        ).read_text()
+
+    results = render_projects(
+        [projects / 'a', projects / 'b'], RenderOptions(jobs=jobs, executor=executor, progress='none')
+    )
+    assert [result.status for result in results] == ['up to date', 'up to date']
+
+
+def test_render_projects_memory_limit_in_threads(projects: Path) -> None:
+    options = RenderOptions(max_memory=1 << 30, jobs=2, executor='thread', progress='none')
+    with pytest.raises(ValueError, match='Memory limit'):
+        render_projects([projects / 'a', projects / 'b'], options)
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    cache = LruCache[str, int](2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.lookup('a') == 1
+    cache.put('c', 3)
+    assert cache.lookup('b') is None
+    assert cache.get('a', lambda: 0) == 1
+    assert cache.get('b', lambda: 4) == 4
+    assert cache.lookup('c') is None
@@ -0,0 +1,49 @@
+import importlib.util
+import shutil
+from pathlib import Path, PurePath
+
+import pytest
+
+from lapidary.render.bytecode import is_current, pyc_path
+from lapidary.render.main import RenderOptions, render_project
+
+petstore = Path(__file__).parent / 'e2e/render/initial/petstore'
+
+
+@pytest.fixture
+def project_root(tmp_path: Path) -> Path:
+    project_root = tmp_path / 'project'
+    shutil.copytree(petstore, project_root)
+    return project_root
+
+
+def test_compile_bytecode(project_root: Path) -> None:
+    target_root = project_root / 'src'
+    render_project(project_root, RenderOptions(compile_bytecode=True, jobs=2))
+
+    modules = [path.relative_to(target_root) for path in target_root.rglob('*.py')]
+    assert modules
+    for module in modules:
+        pyc = target_root / pyc_path(module)
+        assert is_current(pyc, (target_root / module).read_bytes())
+        # checked hash-based bytecode
+        assert pyc.read_bytes()[4:8] == (0b11).to_bytes(4, 'little')
+
+    stale = target_root / pyc_path(PurePath('test_petstore/removed.py'))
+    stale.write_bytes(b'')
+    mtimes = {module: (target_root / pyc_path(module)).stat().st_mtime_ns for module in modules}
+    render_project(project_root, RenderOptions(force=True, compile_bytecode=True, executor='thread'))
+
+    # unchanged modules keep their bytecode, bytecode of removed ones is removed
+    assert {module: (target_root / pyc_path(module)).stat().st_mtime_ns for module in modules} == mtimes
+    assert not stale.exists()
+
+
+def test_compile_bytecode_up_to_date(project_root: Path) -> None:
+    target_root = project_root / 'src'
+    render_project(project_root)
+    assert not list(target_root.rglob('*.pyc'))
+
+    render_project(project_root, RenderOptions(compile_bytecode=True))
+    assert len(list(target_root.rglob('*.pyc'))) == len(list(target_root.rglob('*.py')))
+    assert importlib.util.MAGIC_NUMBER == next(target_root.rglob('*.pyc')).read_bytes()[:4]
@@ -0,0 +1,102 @@
+import os
+import shutil
+import stat
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from lapidary.render import main
+from lapidary.render.cache import archive_path
+from lapidary.render.fingerprint import read_manifest
+from lapidary.render.main import RenderOptions, render_project
+
+e2e_root = Path(__file__).parent / 'e2e'
+e2e_tests = [path.name for path in (e2e_root / 'render/initial').iterdir() if path.is_dir()]
+petstore = e2e_root / 'render/initial/petstore'
+
+
+def dir_contents(root: Path) -> dict[Path, bytes]:
+    return {path.relative_to(root): path.read_bytes() for path in root.rglob('*') if path.is_file()}
+
+
+def copy_project(tmp_path: Path, name: str, source: Path = petstore) -> Path:
+    project_root = tmp_path / name
+    shutil.copytree(source, project_root)
+    return project_root
+
+
+def test_restore_from_cache(tmp_path: Path, monkeypatch) -> None:
+    cache_dir = tmp_path / 'cache'
+    first = copy_project(tmp_path, 'first')
+    render_project(first, RenderOptions(cache_dir=cache_dir))
+    manifest = read_manifest(first / 'src')
+    assert manifest is not None
+    assert archive_path(cache_dir, manifest.fingerprint).is_file()
+
+    def fail(*_):
+        raise AssertionError('Document parsed')
+
+    monkeypatch.setattr(main, 'parse_document_text', fail)
+    second = copy_project(tmp_path, 'second')
+    (second / 'src/test_petstore').mkdir(parents=True)
+    (second / 'src/test_petstore/stale.py').write_text('')
+    render_project(second, RenderOptions(cache_dir=cache_dir))
+
+    assert dir_contents(second) == dir_contents(first)
+
+
+def test_cache_entry_readable_by_others(tmp_path: Path) -> None:
+    cache_dir = tmp_path / 'cache'
+    project_root = copy_project(tmp_path, 'project')
+    render_project(project_root, RenderOptions(cache_dir=cache_dir))
+    manifest = read_manifest(project_root / 'src')
+    assert manifest is not None
+
+    umask = os.umask(0o022)
+    os.umask(umask)
+    mode = stat.S_IMODE(archive_path(cache_dir, manifest.fingerprint).stat().st_mode)
+    assert mode == 0o666 & ~umask
+
+
+def test_invalid_cache_entry_renders(tmp_path: Path) -> None:
+    cache_dir = tmp_path / 'cache'
+    first = copy_project(tmp_path, 'first')
+    render_project(first, RenderOptions(cache_dir=cache_dir))
+    manifest = read_manifest(first / 'src')
+    assert manifest is not None
+    archive_path(cache_dir, manifest.fingerprint).write_bytes(b'garbage')
+
+    second = copy_project(tmp_path, 'second')
+    render_project(second, RenderOptions(cache_dir=cache_dir))
+
+    assert dir_contents(second) == dir_contents(first)
+
+
+RENDER_SCRIPT = """
+import sys
+from pathlib import Path
+from lapidary.render.main import RenderOptions, render_project
+render_project(Path(sys.argv[1]), RenderOptions(cache_dir=Path(sys.argv[2])))
+"""
+
+
+@pytest.mark.parametrize('project_name', e2e_tests, ids=e2e_tests)
+def test_output_is_byte_stable(project_name: str, tmp_path: Path) -> None:
+    """Cache entries must not depend on hash randomization, so the same inputs always produce the same archive."""
+    archives = []
+    for seed in ('1', '2'):
+        project_root = copy_project(tmp_path, f'project{seed}', e2e_root / 'render/initial' / project_name)
+        cache_dir = tmp_path / f'cache{seed}'
+        subprocess.run(
+            [sys.executable, '-c', RENDER_SCRIPT, str(project_root), str(cache_dir)],
+            env={**os.environ, 'PYTHONHASHSEED': seed, 'PYTHONPATH': os.pathsep.join(sys.path)},
+            check=True,
+            capture_output=True,
+        )
+        manifest = read_manifest(project_root / 'src')
+        assert manifest is not None
+        archives.append(archive_path(cache_dir, manifest.fingerprint).read_bytes())
+
+    assert archives[0] == archives[1]
@@ -0,0 +1,49 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from lapidary.render.costs import CostReport, location
+from lapidary.render.main import RenderOptions, render_project
+from lapidary.render.model.stack import Stack
+
+petstore = Path(__file__).parent / 'e2e/render/initial/petstore'
+
+
+@pytest.mark.parametrize(
+    'pointer,expected',
+    [
+        ('#/components/schemas/Order/properties/status', '#/components/schemas/Order'),
+        ('#/paths/~1pet~1{petId}/get/responses/200', '#/paths/~1pet~1{petId}/get'),
+        ('#/components/schemas/Order', '#/components/schemas/Order'),
+    ],
+)
+def test_location(pointer: str, expected: str) -> None:
+    assert location(Stack.from_str(pointer)) is Stack.from_str(expected)
+
+
+def test_nested_schema_time_not_counted_in_outer() -> None:
+    costs = CostReport()
+    with costs.schema(Stack.from_str('#/paths/~1a/get/responses/200')):
+        with costs.schema(Stack.from_str('#/components/schemas/A')):
+            pass
+    assert set(costs.costs) == {'#/paths/~1a/get', '#/components/schemas/A'}
+
+
+@pytest.mark.parametrize('jobs', [1, 2])
+def test_render_cost_report(tmp_path: Path, jobs: int) -> None:
+    project_root = tmp_path / 'project'
+    shutil.copytree(petstore, project_root)
+    report_path = tmp_path / 'costs.json'
+
+    render_project(project_root, RenderOptions(jobs=jobs, executor='thread', cost_report=report_path))
+
+    report = {item['location']: item for item in json.loads(report_path.read_text())}
+    pet = report['#/components/schemas/Pet']
+    assert pet['classes'] == 1
+    assert pet['nodes'] > 1
+    assert pet['time'] > 0
+    pet_module = project_root / 'src/test_petstore/components/schemas/Pet/schema.py'
+    assert pet['lines'] == pet_module.read_text().count('\n')
+    assert report['#/paths/~1pet/put']['lines'] > 0
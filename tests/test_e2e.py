@@ -1,28 +1,42 @@
 import shutil
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
 import pytest
 
-from lapidary.render.main import init_project, render_project
+from lapidary.render.config import load_config
+from lapidary.render.fingerprint import MANIFEST_FILE
+from lapidary.render.load import load_document
+from lapidary.render.main import (
+    Executor,
+    RenderOptions,
+    init_project,
+    mk_converter,
+    parse_document,
+    prepare_python_model,
+    render_project,
+)
+from lapidary.render.model import conv_cst, conv_text
+from lapidary.render.writer import render_module
 
 e2e_root = Path(__file__).parent / 'e2e'
 e2e_tests = [path.name for path in (e2e_root / 'render/initial').iterdir() if path.is_dir()]
 
 
+@pytest.mark.parametrize('jobs,executor', [(1, 'process'), (4, 'thread')], ids=['sequential', 'threads'])
 @pytest.mark.parametrize(
     'project_name',
     e2e_tests,
     ids=e2e_tests,
 )
-def test_generate(project_name: Path, tmp_path: Path) -> None:
+def test_generate(project_name: Path, jobs: int, executor: Executor, tmp_path: Path) -> None:
     init_root = e2e_root / 'render/initial' / project_name
     project_root = tmp_path / 'project'
 
     shutil.copytree(init_root, project_root)
     assert project_root.is_dir()
 
-    render_project(project_root)
+    render_project(project_root, RenderOptions(jobs=jobs, executor=executor))
 
     expected = e2e_root / 'render/expected' / project_name
 
@@ -31,7 +45,8 @@ def test_generate(project_name: Path, tmp_path: Path) -> None:
 
 def dir_contents_stream(root: Path) -> Iterator[tuple[Path, str]]:
     for path in root.rglob('*'):
-        if not path.is_dir():
+        # the manifest holds lapidary-render version, see test_fingerprint
+        if not path.is_dir() and path.name != MANIFEST_FILE:
             try:
                 yield path.relative_to(root), path.read_text()
             except UnicodeDecodeError as e:
@@ -47,3 +62,57 @@ def test_init(tmp_path: Path) -> None:
     init_project(str(expected / 'lapidary/openapi/dummy.yaml'), project_root, 'dummy_package', True)
 
     assert set(dir_contents_stream(project_root)) == set(dir_contents_stream(expected))
+
+
+@pytest.mark.parametrize(
+    'project_name',
+    e2e_tests,
+    ids=e2e_tests,
+)
+def test_text_emitter_same_as_libcst(project_name: str) -> None:
+    project_root = e2e_root / 'render/initial' / project_name
+    config = load_config(project_root)
+    model = prepare_python_model(load_document(project_root, config), config)
+
+    for module in model.modules:
+        assert conv_text.render_module_str(module) == join(render_module(module)), module.path
+        assert join(conv_text.render_module(module)) == join(render_module(module)), module.path
+    assert conv_text.MODULE_ROOT == conv_cst.MODULE_ROOT.code
+
+
+def join(code: Iterable[str] | None) -> str | None:
+    return ''.join(code) if code is not None else None
+
+
+@pytest.mark.parametrize(
+    'project_name',
+    e2e_tests,
+    ids=e2e_tests,
+)
+def test_iter_modules_same_as_process(project_name: str) -> None:
+    project_root = e2e_root / 'render/initial' / project_name
+    config = load_config(project_root)
+    oa_model = parse_document(load_document(project_root, config))
+
+    streamed = {module.path: module for module in mk_converter(oa_model, config).iter_modules()}
+    model = mk_converter(oa_model, config).process()
+
+    assert streamed == model.module_index
+
+
+@pytest.mark.parametrize('executor', ['process', 'thread'])
+@pytest.mark.parametrize(
+    'project_name',
+    e2e_tests,
+    ids=e2e_tests,
+)
+def test_parallel_same_as_sequential(project_name: str, executor: Executor) -> None:
+    project_root = e2e_root / 'render/initial' / project_name
+    config = load_config(project_root)
+    oa_model = parse_document(load_document(project_root, config))
+
+    sequential = list(mk_converter(oa_model, config).iter_modules())
+    parallel = list(mk_converter(oa_model, config, jobs=2, executor=executor).iter_modules())
+
+    assert [module.path for module in parallel] == [module.path for module in sequential]
+    assert parallel == sequential
@@ -0,0 +1,69 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from lapidary.render import main
+from lapidary.render.fingerprint import MANIFEST_FILE, read_manifest
+from lapidary.render.main import RenderOptions, check_project, render_project
+
+petstore = Path(__file__).parent / 'e2e/render/initial/petstore'
+
+
+@pytest.fixture
+def project_root(tmp_path: Path) -> Path:
+    project_root = tmp_path / 'project'
+    shutil.copytree(petstore, project_root)
+    render_project(project_root)
+    return project_root
+
+
+def test_render_writes_manifest(project_root: Path) -> None:
+    manifest = read_manifest(project_root / 'src')
+    assert manifest is not None
+    assert 'test_petstore/client.py' in manifest.files
+    assert check_project(project_root) == []
+
+
+def test_render_skips_current_project(project_root: Path, monkeypatch) -> None:
+    def fail(*_):
+        raise AssertionError('Document parsed')
+
+    monkeypatch.setattr(main, 'parse_document_text', fail)
+    render_project(project_root)
+
+    with pytest.raises(AssertionError):
+        render_project(project_root, RenderOptions(force=True))
+
+
+def test_render_restores_missing_file(project_root: Path) -> None:
+    client = project_root / 'src/test_petstore/client.py'
+    client.unlink()
+    render_project(project_root)
+    assert client.is_file()
+
+
+def test_check_modified_and_unexpected_files(project_root: Path) -> None:
+    target = project_root / 'src'
+    with (target / 'test_petstore/client.py').open('a') as file:
+        file.write('# edited\n')
+    (target / 'test_petstore/stale.py').write_text('')
+    (target / 'test_petstore/extras').mkdir()
+    (target / 'test_petstore/extras/custom.py').write_text('')
+
+    assert check_project(project_root) == [
+        'Modified: test_petstore/client.py',
+        'Unexpected: test_petstore/stale.py',
+    ]
+
+
+def test_check_config_changed(project_root: Path) -> None:
+    pyproject = project_root / 'pyproject.toml'
+    pyproject.write_text(pyproject.read_text().replace('[tool.lapidary]\n', "[tool.lapidary]\nemitter = 'text'\n"))
+
+    assert len(check_project(project_root)) == 1
+
+
+def test_check_not_rendered(tmp_path: Path) -> None:
+    shutil.copytree(petstore, tmp_path / 'project')
+    assert check_project(tmp_path / 'project') == [f'{MANIFEST_FILE} not found, project was not rendered']
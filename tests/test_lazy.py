@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import pydantic
+import pytest
+
+from lapidary.render.config import load_config
+from lapidary.render.load import load_document
+from lapidary.render.main import mk_converter, parse_document
+
+e2e_root = Path(__file__).parent / 'e2e'
+e2e_tests = [path.name for path in (e2e_root / 'render/initial').iterdir() if path.is_dir()]
+petstore = e2e_root / 'render/initial/petstore'
+
+
+@pytest.mark.parametrize('project_name', e2e_tests, ids=e2e_tests)
+def test_lazy_same_as_validated(project_name: str) -> None:
+    project_root = e2e_root / 'render/initial' / project_name
+    config = load_config(project_root)
+    oa_doc = load_document(project_root, config)
+
+    lazy_model = parse_document(oa_doc, lazy=True)
+    oa_model = parse_document(oa_doc)
+    assert lazy_model == oa_model
+    assert list(mk_converter(lazy_model, config).iter_modules()) == list(mk_converter(oa_model, config).iter_modules())
+
+
+def test_lazy_validates_used_objects() -> None:
+    oa_doc = load_document(petstore, load_config(petstore))
+    oa_doc['components']['schemas']['Unused'] = {'type': 'invalid'}
+    oa_doc['paths']['/pet']['post']['requestBody'] = 'invalid'
+
+    with pytest.raises(pydantic.ValidationError):
+        parse_document(oa_doc)
+
+    oa_model = parse_document(oa_doc, lazy=True, select_operation=lambda path, *_: path != '/pet')
+    with pytest.raises(pydantic.ValidationError) as exc_info:
+        oa_model.components.schemas['Unused']
+    assert exc_info.value.__notes__ == ['in #/components/schemas/Unused']
+    assert oa_model.paths.paths['/pet'].post is None
@@ -0,0 +1,63 @@
+import shutil
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from lapidary.render.main import RenderOptions, render_project
+from lapidary.render.memory import MemoryAccounting, MemoryLimitExceeded, parse_size
+
+petstore = Path(__file__).parent / 'e2e/render/initial/petstore'
+
+
+@pytest.mark.parametrize(
+    'value,expected',
+    [
+        ('1024', 1024),
+        ('512M', 512 << 20),
+        ('4GiB', 4 << 30),
+        ('2 kb', 2048),
+    ],
+)
+def test_parse_size(value: str, expected: int) -> None:
+    assert parse_size(value) == expected
+
+
+def test_parse_size_invalid() -> None:
+    with pytest.raises(ValueError):
+        parse_size('many')
+
+
+def test_nested_stage_not_counted_in_outer() -> None:
+    with MemoryAccounting() as memory:
+        with memory.stage('outer'):
+            with memory.stage('inner'):
+                data = bytearray(1 << 20)
+    assert memory.stages['inner'] >= 1 << 20
+    assert memory.stages['outer'] < 1 << 20
+    del data
+
+
+def test_render_max_memory_exceeded(tmp_path: Path) -> None:
+    project_root = tmp_path / 'project'
+    shutil.copytree(petstore, project_root)
+
+    with pytest.raises(MemoryLimitExceeded) as e:
+        render_project(project_root, RenderOptions(max_memory=1 << 10))
+    assert e.value.stage == 'document'
+    assert str(e.value).startswith('Memory limit of 1.0 KiB exceeded in stage document')
+
+
+def test_cli_render_max_memory(tmp_path: Path) -> None:
+    from lapidary.render.cli import app
+
+    project_root = tmp_path / 'project'
+    shutil.copytree(petstore, project_root)
+
+    result = CliRunner().invoke(app, ('render', '--max-memory', '1K', str(project_root)))
+    assert result.exit_code == 1
+
+    result = CliRunner().invoke(app, ('render', '--max-memory', '1G', str(project_root)))
+    if result.exception:
+        raise result.exception
+    assert (project_root / 'src/test_petstore/client.py').is_file()
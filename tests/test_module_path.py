@@ -5,3 +5,11 @@ def test_relative_to():
     parent = ModulePath('a.b')
     child = ModulePath('a.b.c')
     assert child @ parent == ModulePath('c')
+
+
+def test_interned():
+    path = ModulePath('a.b.c')
+    assert path is ModulePath(('a', 'b', 'c'))
+    assert path.parent() is ModulePath(['a', 'b'], False)
+    assert path.parent() == ModulePath('a.b')
+    assert hash(path.parent()) == hash(ModulePath('a.b'))
@@ -0,0 +1,75 @@
+import re
+import typing
+
+import pydantic
+import pytest
+
+from lapidary.render.model import openapi
+from lapidary.render.model.openapi.base import PropertyPattern, pattern_fields, split_pattern_properties
+from lapidary.render.pydantic_utils import find_annotation_optional
+
+RESPONSE = {'description': 'ok'}
+
+
+def split_per_call(cls: type[pydantic.BaseModel], value: dict[str, typing.Any]) -> dict[str, typing.Any]:
+    """The split before patterns were precompiled: patterns compiled on every call, the value changed in place."""
+    for field_name, field_info in cls.model_fields.items():
+        pattern_anno = find_annotation_optional(field_info.metadata, PropertyPattern)
+        if not pattern_anno:
+            continue
+
+        pattern = re.compile(pattern_anno.pattern)
+
+        pattern_props = {}
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise ValueError(key)
+            if pattern.search(key):
+                pattern_props[key] = item
+        for key in pattern_props:
+            del value[key]
+        value[field_name] = pattern_props
+
+    return value
+
+
+@pytest.mark.parametrize(
+    'cls,value',
+    [
+        (openapi.Responses, {'200': RESPONSE, 'default': RESPONSE}),
+        (openapi.Responses, {'200': RESPONSE, '4XX': RESPONSE, 'x-lapidary-ignored': True, 'x-other': {}}),
+        (openapi.Paths, {'/a': {}, '/b': {}}),
+        (openapi.Paths, {'/a': {}, 'x-extension': {'/b': {}}}),
+        (openapi.Paths, {}),
+    ],
+    ids=['responses', 'responses-extensions', 'paths', 'paths-extensions', 'empty'],
+)
+def test_split_pattern_properties(cls: type[pydantic.BaseModel], value: dict[str, typing.Any]) -> None:
+    original = dict(value)
+
+    assert split_pattern_properties(cls, value) == split_per_call(cls, dict(value))
+    assert value == original
+
+
+def test_extensions_left_to_validation() -> None:
+    value = {'200': RESPONSE, 'x-extension': True}
+
+    assert split_pattern_properties(openapi.Responses, value) == {'x-extension': True, 'responses': {'200': RESPONSE}}
+    assert list(openapi.Responses.model_validate({'200': RESPONSE}).responses) == ['200']
+    with pytest.raises(pydantic.ValidationError):
+        openapi.Responses.model_validate(value)
+
+
+def test_pattern_fields_compiled_once() -> None:
+    fields = pattern_fields(openapi.Responses)
+
+    assert [name for name, _ in fields] == ['responses']
+    assert pattern_fields(openapi.Responses) is fields
+    assert pattern_fields(openapi.PathItem) == []
+
+
+def test_split_pattern_properties_invalid_key() -> None:
+    with pytest.raises(ValueError):
+        split_pattern_properties(openapi.Paths, {1: {}})
+    # left for pydantic to report
+    assert split_pattern_properties(openapi.Paths, ['/a']) == ['/a']
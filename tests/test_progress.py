@@ -0,0 +1,48 @@
+import io
+import json
+import shutil
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from lapidary.render.progress import NO_PROGRESS, JsonProgress
+
+petstore = Path(__file__).parent / 'e2e/render/initial/petstore'
+
+
+def test_no_progress_has_no_update() -> None:
+    with NO_PROGRESS.stage('paths', 2, label='Rendering paths') as update:
+        assert update is None
+
+
+def test_json_progress() -> None:
+    file = io.StringIO()
+    with JsonProgress(file).stage('paths', 2) as update:
+        assert update is not None
+        update('/a')
+        update('/b')
+
+    events = [json.loads(line) for line in file.getvalue().splitlines()]
+    assert [(event['event'], event.get('item'), event['count']) for event in events] == [
+        ('start', None, 0),
+        ('item', '/a', 1),
+        ('item', '/b', 2),
+        ('end', None, 2),
+    ]
+    assert all(event['stage'] == 'paths' and event['total'] == 2 for event in events)
+    assert [event['elapsed'] for event in events] == sorted(event['elapsed'] for event in events)
+
+
+def test_cli_render_progress_json(tmp_path: Path) -> None:
+    from lapidary.render.cli import app
+
+    project_root = tmp_path / 'project'
+    shutil.copytree(petstore, project_root)
+
+    result = CliRunner().invoke(app, ('render', '--progress', 'json', str(project_root)))
+    if result.exception:
+        raise result.exception
+    events = [json.loads(line) for line in result.stdout.splitlines()]
+    ends = {event['stage']: event for event in events if event['event'] == 'end'}
+    assert ends['paths']['count'] == ends['paths']['total'] == 13
+    assert ends['modules']['count'] > 0
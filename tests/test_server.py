@@ -0,0 +1,88 @@
+import gc
+import logging
+import shutil
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from lapidary.render.model import conv_cst, conv_text
+from lapidary.render.model.python import AnnotatedType, ModulePath, NameRef
+from lapidary.render.model.stack import Stack
+from lapidary.render.server import RenderServer, request_render
+from lapidary.render.yaml import yaml
+
+e2e_root = Path(__file__).parent / 'e2e'
+petstore = e2e_root / 'render/initial/petstore'
+expected_root = e2e_root / 'render/expected/petstore/src'
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> Iterator[Path]:
+    socket_path = tmp_path / 'sock'
+    with RenderServer(socket_path, cache_size=2) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            yield socket_path
+        finally:
+            server.shutdown()
+            thread.join()
+
+
+def test_render_server(socket_path: Path, tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    project_root = tmp_path / 'project'
+    shutil.copytree(petstore, project_root)
+    client_path = project_root / 'src/test_petstore/client.py'
+
+    assert request_render(socket_path, project_root)['status'] == 'rendered'
+    assert request_render(socket_path, project_root)['status'] == 'up to date'
+
+    client_path.write_text('')
+    with caplog.at_level(logging.INFO, 'lapidary.render'):
+        assert request_render(socket_path, project_root, force=True)['status'] == 'rendered'
+    assert 'Reusing python model' in caplog.messages
+    assert client_path.read_text() == (expected_root / 'test_petstore/client.py').read_text()
+
+
+def test_render_server_failure(socket_path: Path, tmp_path: Path) -> None:
+    response = request_render(socket_path, tmp_path / 'missing')
+    assert response['status'] == 'failed'
+    assert response['error'].startswith('FileNotFoundError')
+
+    response = request_render(socket_path, tmp_path, output='archive.zip')
+    assert response == {'status': 'failed', 'error': "ValueError: ('Unsupported options', ['output'])"}
+
+
+def test_render_server_releases_evicted_models(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    # captured debug records would keep the stacks they log
+    caplog.set_level(logging.INFO, 'lapidary')
+
+    def render(idx: int) -> tuple[int, ...]:
+        project_root = tmp_path / f'project{idx}'
+        shutil.copytree(petstore, project_root)
+        document_path = project_root / 'lapidary/openapi/openapi.yaml'
+        document = yaml.load(document_path.read_text())
+        document['paths'] = {f'/v{idx}{path}': path_item for path, path_item in document['paths'].items()}
+        with document_path.open('w') as file:
+            yaml.dump(document, file)
+
+        assert server.render({'project_root': str(project_root)})['status'] == 'rendered'
+        # the bounded caches of rendered type hints keep the last ones, whatever model they're from
+        for conv in (conv_cst, conv_text):
+            conv.mk_simple_type_name.cache_clear()
+            conv._mk_annotated_type_cached.cache_clear()
+        gc.collect()
+        return (
+            len(Stack._children),
+            len(Stack._by_pointer),
+            len(ModulePath._instances),
+            len(NameRef._instances),
+            len(AnnotatedType._instances),
+        )
+
+    with RenderServer(tmp_path / 'sock', cache_size=1) as server:
+        first = render(0)
+        for idx in range(1, 4):
+            assert render(idx) == first
@@ -6,3 +6,22 @@ def test_resolve_type_hint():
     expected = AnnotatedType(python.NameRef('pkg.paths.u_lpathu_l.get.parameters.u_m', 'schema'))
     type_hint = metamodel.resolve_type_name('pkg', stack.Stack.from_str('#/paths/~1path~1/get/parameters/0/schema'))
     assert type_hint == expected
+
+
+def test_stack_interned():
+    pushed = stack.Stack().push('paths', '/path/', 'get')
+    assert pushed is stack.Stack.from_str('#/paths/~1path~1/get')
+    assert pushed is stack.Stack(('#', 'paths', '/path/', 'get'))
+    assert repr(pushed) == '#/paths/~1path~1/get'
+    assert pushed.path == ('#', 'paths', '/path/', 'get')
+    assert pushed[-2] == '/path/'
+    assert pushed.push('x') is not pushed.push('y')
+
+
+def test_stack_interned_across_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    names = [str(idx) for idx in range(100)]
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(lambda _: [stack.Stack().push('threads', name) for name in names], range(16)))
+    assert all(all(a is b for a, b in zip(result, results[0])) for result in results)
@@ -0,0 +1,22 @@
+import pytest
+
+from lapidary.render import names
+from lapidary.render.model import python
+from lapidary.render.model.stack import Stack
+from lapidary.render.model.symbols import SymbolTable
+
+
+def test_resolve_type_name_memoized():
+    symbols = SymbolTable('pkg')
+    stack = Stack.from_str('#/components/schemas/class')
+    typ = symbols.resolve_type_name(stack)
+    assert typ == python.AnnotatedType(python.NameRef('pkg.components.schemas', names.maybe_mangle_name('class')))
+    assert symbols.resolve_type_name(Stack.from_str('#/components/schemas/class')) is typ
+
+
+def test_mangled_name_collision(monkeypatch):
+    monkeypatch.setattr(names, 'maybe_mangle_name', str.lower)
+    symbols = SymbolTable('pkg')
+    symbols.mangle('Name')
+    with pytest.raises(ValueError):
+        symbols.mangle('name')
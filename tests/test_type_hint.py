@@ -0,0 +1,25 @@
+import copy
+import pickle
+
+from lapidary.render.model.python import AnnotatedType, NameRef, NoneMetaType, optional, union_of
+
+
+def test_type_hints_interned():
+    assert NameRef('pkg.mod', 'Name') is NameRef('pkg.mod', 'Name')
+    typ = AnnotatedType(NameRef('builtins', 'list'), (AnnotatedType.from_type(int, ()),))
+    assert typ is AnnotatedType(NameRef('builtins', 'list'), [AnnotatedType(NameRef('builtins', 'int'))])
+    assert copy.deepcopy(typ) is typ
+    assert pickle.loads(pickle.dumps(typ)) is typ
+
+
+def test_int_and_float_constraints_differ():
+    assert AnnotatedType.from_type(int) is not AnnotatedType(NameRef('builtins', 'int'), gt=1)
+    assert AnnotatedType(NameRef('builtins', 'float'), gt=1) != AnnotatedType(NameRef('builtins', 'float'), gt=1.0)
+
+
+def test_union_order_is_stable():
+    types = [AnnotatedType.from_type(typ) for typ in (str, int, float, bool)]
+    expected = union_of(*types)
+    assert expected.generic_args == tuple(sorted(types, key=str))
+    assert union_of(*reversed(types)) is expected
+    assert optional(expected).generic_args == tuple(sorted([*types, NoneMetaType], key=str))